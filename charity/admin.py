@@ -48,22 +48,26 @@ class CategoryAdmin(admin.ModelAdmin):
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "members_count_admin", "created_at", "updated_at")
     list_filter = ("category",)
+    list_select_related = ("category",)
     search_fields = ("title", "description")
 
     def members_count_admin(self, obj):
-        return obj.memberships.count()
+        return obj.members_count
     members_count_admin.short_description = "Members"
+    members_count_admin.admin_order_field = "members_count"
 
 
 @admin.register(ProjectDetails)
 class ProjectDetailsAdmin(admin.ModelAdmin):
     list_display = ("project", "updated_at")
+    list_select_related = ("project",)
     search_fields = ("project__title", "challenge", "solution", "key_objectives")
 
 
 @admin.register(ProjectMembershipRequest)
 class ProjectMembershipRequestAdmin(admin.ModelAdmin):
     list_display = ("project", "user", "role", "status", "requested_at", "processed_at")
+    list_select_related = ("project", "user")
     list_filter = ("status", "role", "requested_at", "processed_at")
     search_fields = ("project__title", "user__username", "user__email", "message")
     list_editable = ("status",)
@@ -106,6 +110,7 @@ class ProjectMembershipRequestAdmin(admin.ModelAdmin):
 @admin.register(ProjectMembership)
 class ProjectMembershipAdmin(admin.ModelAdmin):
     list_display = ("project", "user", "role", "joined_at")
+    list_select_related = ("project", "user")
     list_filter = ("role", "joined_at")
     search_fields = ("project__title", "user__username", "user__email")
 
@@ -113,25 +118,27 @@ class ProjectMembershipAdmin(admin.ModelAdmin):
 @admin.register(ProjectPhoto)
 class ProjectPhotoAdmin(admin.ModelAdmin):
     list_display = ("project", "uploaded_at", "caption")
+    list_select_related = ("project",)
     search_fields = ("project__title", "caption")
 
 
 @admin.register(ProjectAchievement)
 class ProjectAchievementAdmin(admin.ModelAdmin):
     list_display = ("project", "title", "value", "achieved_on", "created_at")
+    list_select_related = ("project",)
     list_filter = ("achieved_on",)
     search_fields = ("project__title", "title", "description", "value")
 
 
 @admin.register(School)
 class SchoolAdmin(admin.ModelAdmin):
-    list_display = ('name', 'location', 'student_population', 'partnership_date', 'clubs_count_display', 'is_active', 'created_at')
+    list_display = ('name', 'location', 'student_population', 'partnership_date', 'clubs_count_display', 'club_members_count', 'is_active', 'created_at')
     list_filter = ('is_active', 'partnership_date', 'created_at', 'location')
     search_fields = ('name', 'location', 'contact_person', 'contact_email')
-    readonly_fields = ('created_at', 'updated_at', 'clubs_count_display')
+    readonly_fields = ('created_at', 'updated_at', 'clubs_count_display', 'club_members_count')
     list_editable = ('is_active',)
     ordering = ('name',)
-    
+
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'location', 'description', 'is_active')
@@ -150,14 +157,14 @@ class SchoolAdmin(admin.ModelAdmin):
             'description': 'School photo and badge/logo'
         }),
         ('System Information', {
-            'fields': ('created_at', 'updated_at', 'clubs_count_display'),
+            'fields': ('created_at', 'updated_at', 'clubs_count_display', 'club_members_count'),
             'classes': ('collapse',),
             'description': 'Read-only system information'
         })
     )
     
     def clubs_count_display(self, obj):
-        count = obj.clubs.count()
+        count = obj.clubs_count
         if count == 0:
             return "No clubs"
         elif count == 1:
@@ -165,12 +172,13 @@ class SchoolAdmin(admin.ModelAdmin):
         else:
             return f"{count} clubs"
     clubs_count_display.short_description = 'Associated Clubs'
-    clubs_count_display.admin_order_field = 'clubs__count'
+    clubs_count_display.admin_order_field = 'clubs_count'
 
 
 @admin.register(Club)
 class ClubAdmin(admin.ModelAdmin):
     list_display = ("title", "school", "coordinator", "member_count", "is_active", "created_at")
+    list_select_related = ("school",)
     list_filter = ("is_active", "school", "created_at")
     search_fields = ("title", "description", "coordinator", "school__name")
     list_editable = ("is_active", "member_count")
@@ -207,6 +215,7 @@ class OpportunityAdmin(admin.ModelAdmin):
 @admin.register(OpportunityApplication)
 class OpportunityApplicationAdmin(admin.ModelAdmin):
     list_display = ("opportunity", "full_name", "email", "submitted_at")
+    list_select_related = ("opportunity",)
     list_filter = ("submitted_at",)
     search_fields = ("opportunity__title", "full_name", "email", "phone")
     readonly_fields = ("submitted_at",)
@@ -275,6 +284,7 @@ class DonationAdmin(admin.ModelAdmin):
 class ProgramAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "created_at", "updated_at")
     list_filter = ("category",)
+    list_select_related = ("category",)
     search_fields = ("title", "description")
 
 
@@ -334,6 +344,7 @@ class SpotlightCategoryAdmin(admin.ModelAdmin):
 class SpotlightItemAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "created_at", "updated_at")
     list_filter = ("category",)
+    list_select_related = ("category",)
     search_fields = ("title", "description")
 
 
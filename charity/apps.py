@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CharityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'charity'
+
+    def ready(self):
+        # Connect cache invalidation receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,363 @@
+"""CSS/JS bundles and per-page critical CSS.
+
+``BUNDLES`` lists, in cascade order, the static files each bundle joins.
+``manage.py build_bundles`` concatenates and minifies them (with
+``rcssmin``/``rjsmin`` when installed) into ``assets/bundles/<name>.<hash>.<ext>``
+and records the hashed names in ``assets/bundles/bundles.json``. With
+``--critical`` it also renders each page in ``CRITICAL_PAGES`` and keeps
+the rules of that page's CSS bundles that can match the markup before
+its ``CRITICAL_SECTIONS``-th ``<section>``. That is a selector-level
+approximation of above-the-fold CSS which needs no headless browser. The
+result is written to ``assets/bundles/critical/<url name>.css``.
+
+``{% bundle %}`` (``charity.templatetags.bundles``) emits one tag per
+bundle once it is built and ``BUNDLES_ENABLED`` is on. On pages with
+critical CSS it inlines that CSS and loads the stylesheets without
+blocking render. Otherwise, e.g. in development before a build, it emits
+the original files one by one.
+"""
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover - optional dependency
+    rcssmin = None
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - optional dependency
+    rjsmin = None
+
+# Bundle name -> static files, in cascade/execution order
+BUNDLES = {
+    'site.css': (
+        'assets/css/base-icons.css',
+        'assets/css/bootstrap.min.css',
+        'assets/css/magnific-popup.min.css',
+        'assets/css/swiper-bundle.min.css',
+        'assets/css/style.css',
+        'assets/css/mobile-nav.css',
+        'assets/css/mentor-styles.css',
+        'assets/css/custom-social.css',
+        'assets/css/clubs-custom.css',
+        'assets/css/mentor-cards.css',
+        'assets/css/custom-spacing.css',
+        'assets/css/nav-fixed.css',
+        'assets/css/layout-overrides.css',
+        'assets/css/custom.css',
+        'assets/css/base-header.css',
+    ),
+    # Linked after each page's own styles, so these rules keep winning ties
+    'layout.css': ('assets/css/base-layout.css',),
+    'site.js': (
+        'assets/js/vendor/jquery-3.7.1.min.js',
+        'assets/js/swiper-bundle.min.js',
+        'assets/js/bootstrap.min.js',
+        'assets/js/jquery.magnific-popup.min.js',
+        'assets/js/jquery.counterup.min.js',
+        'assets/js/jquery-ui.min.js',
+        'assets/js/imagesloaded.pkgd.min.js',
+        'assets/js/isotope.pkgd.min.js',
+        'assets/js/main.js',
+    ),
+    # Runs last, after the Bootstrap bundle with Popper
+    'layout.js': ('assets/js/base-layout.js',),
+    # Home and about pages
+    'home.css': (
+        'assets/css/impact-styles.css',
+        'assets/css/spotlight-styles.css',
+        'assets/css/sdg-styles.css',
+        'assets/css/resources-styles.css',
+        'assets/css/clubs-custom.css',
+        'assets/css/custom-index.css',
+    ),
+    'home.js': (
+        'assets/js/impact-animations.js',
+        'assets/js/spotlight-animations.js',
+        'assets/js/sdg-animations.js',
+    ),
+    'impact.css': ('assets/css/impact-styles.css',),
+    'impact.js': ('assets/js/impact-animations.js',),
+    'spotlight.css': ('assets/css/spotlight-styles.css',),
+    'spotlight.js': ('assets/js/spotlight-animations.js',),
+}
+
+# URL names (without the ``charity:`` namespace) whose critical CSS is inlined
+CRITICAL_PAGES = (
+    'home', 'about', 'projects', 'programs', 'clubs', 'partner_schools',
+    'opportunities', 'articles', 'impact', 'spotlight', 'team', 'contact',
+)
+# Markup before this <section> counts as above the fold
+CRITICAL_SECTIONS = 2
+
+BUNDLE_DIR = 'assets/bundles'
+MANIFEST_NAME = 'bundles.json'
+CRITICAL_DIR = 'critical'
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+# Also matches the second hash ManifestStaticFilesStorage adds in production
+BUNDLE_HREF = re.compile(r"""assets/bundles/([\w-]+)\.[0-9a-f]{12}(?:\.[0-9a-f]{12})?\.css""")
+
+_manifest = None
+_critical = {}
+
+
+def enabled() -> bool:
+    return getattr(settings, 'BUNDLES_ENABLED', not settings.DEBUG)
+
+
+def bundle_root() -> Path:
+    return Path(getattr(settings, 'BUNDLE_ROOT', Path(settings.BASE_DIR) / 'static' / BUNDLE_DIR))
+
+
+def manifest() -> dict:
+    """``{'bundles': {name: static path}, 'critical': [url names]}`` from the last build (cached per process)."""
+    global _manifest
+    if _manifest is None:
+        try:
+            _manifest = json.loads((bundle_root() / MANIFEST_NAME).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            _manifest = {'bundles': {}, 'critical': []}
+    return _manifest
+
+
+def bundle_path(name: str):
+    """Static path of the built bundle ``name``, or None when bundles are off or not built."""
+    if not enabled():
+        return None
+    return manifest()['bundles'].get(name)
+
+
+def critical_css(url_name: str) -> str:
+    """Critical CSS for the page ``url_name``, or '' when there is none."""
+    if not enabled() or url_name not in manifest()['critical']:
+        return ''
+    if url_name not in _critical:
+        try:
+            _critical[url_name] = (bundle_root() / CRITICAL_DIR / f'{url_name}.css').read_text(encoding='utf-8')
+        except OSError:
+            _critical[url_name] = ''
+    return _critical[url_name]
+
+
+def _is_relative(url: str) -> bool:
+    return not url.startswith(('data:', 'http:', 'https:', '//', '/', '#', '%23'))
+
+
+def rebase_css(css: str, source: str, target_dir: str) -> str:
+    """Rewrite relative ``url()``s in ``css`` (from static path ``source``) to be relative to ``target_dir``."""
+    source_dir = posixpath.dirname(source)
+
+    def rebase(match):
+        quote, url = match.groups()
+        if not _is_relative(url.strip()):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(source_dir, url.strip()))
+        return f'url({quote}{posixpath.relpath(resolved, target_dir)}{quote})'
+
+    return CSS_URL.sub(rebase, css)
+
+
+def absolute_css_urls(css: str, css_path: str) -> str:
+    """Rewrite relative ``url()``s in the static file ``css_path`` to static URLs, for inlining in HTML."""
+    directory = posixpath.dirname(css_path)
+
+    def absolute(match):
+        quote, url = match.groups()
+        if not _is_relative(url.strip()):
+            return match.group(0)
+        # Unhashed names: the manifest may not exist yet, and collectstatic keeps the originals too
+        url = settings.STATIC_URL + posixpath.normpath(posixpath.join(directory, url.strip()))
+        return f'url({quote}{url}{quote})'
+
+    return CSS_URL.sub(absolute, css)
+
+
+def _read(path: str) -> str:
+    found = finders.find(path)
+    if not found:
+        raise FileNotFoundError(f'Bundle source {path} not found in static files')
+    return Path(found).read_text(encoding='utf-8')
+
+
+def build_bundle(name: str) -> str:
+    """Write bundle ``name`` with a content hash in its file name; return its static path."""
+    extension = name.rsplit('.', 1)[1]
+    parts = []
+    for source in BUNDLES[name]:
+        content = _read(source)
+        if extension == 'css':
+            content = rebase_css(content, source, BUNDLE_DIR)
+            parts.append(rcssmin.cssmin(content) if rcssmin else content)
+        else:
+            minify = rjsmin and not source.endswith('.min.js')
+            # The leading ; stops a file without a trailing one from swallowing the next
+            parts.append(';' + (rjsmin.jsmin(content) if minify else content))
+    content = '\n'.join(parts)
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+    stem = name.rsplit('.', 1)[0]
+    filename = f'{stem}.{digest}.{extension}'
+    root = bundle_root()
+    root.mkdir(parents=True, exist_ok=True)
+    (root / filename).write_text(content, encoding='utf-8')
+    return f'{BUNDLE_DIR}/{filename}'
+
+
+def write_manifest(bundles: dict, critical: list) -> None:
+    global _manifest
+    data = {'bundles': bundles, 'critical': sorted(critical)}
+    (bundle_root() / MANIFEST_NAME).write_text(json.dumps(data, indent=2, sort_keys=True), encoding='utf-8')
+    _manifest = data
+    _critical.clear()
+
+
+def remove_stale(keep) -> int:
+    """Delete bundle files that are not in ``keep`` (static paths) or the previous build.
+
+    The previous build stays because cached pages may still link to it.
+    """
+    keep = set(keep) | set(manifest()['bundles'].values())
+    removed = 0
+    for path in bundle_root().glob('*.*.*'):
+        if f'{BUNDLE_DIR}/{path.name}' not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+# -- Critical CSS -----------------------------------------------------------
+
+_PSEUDO = re.compile(r'::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?')
+_ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+_CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+_ID = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+_TYPE = re.compile(r'(?:^|[\s>+~(])([a-zA-Z][\w-]*)')
+_TAG = re.compile(r'<([a-zA-Z][\w-]*)')
+_CLASS_ATTR = re.compile(r'''\sclass\s*=\s*["']([^"']*)["']''')
+_ID_ATTR = re.compile(r'''\sid\s*=\s*["']([^"']*)["']''')
+_SECTION = re.compile(r'<section[\s>]')
+# At-rules whose blocks hold style rules to filter; other block at-rules are dropped
+_GROUPING_AT_RULES = ('media', 'supports')
+
+
+def above_the_fold(html: str) -> str:
+    body = html.split('<body', 1)[-1]
+    sections = list(_SECTION.finditer(body))
+    if len(sections) >= CRITICAL_SECTIONS:
+        body = body[:sections[CRITICAL_SECTIONS - 1].start()]
+    return body
+
+
+def used_selectors(html: str) -> dict:
+    """Element names, classes and ids present in ``html``."""
+    return {
+        'types': {tag.lower() for tag in _TAG.findall(html)} | {'html', 'body'},
+        'classes': {name for value in _CLASS_ATTR.findall(html) for name in value.split()},
+        'ids': set(_ID_ATTR.findall(html)),
+    }
+
+
+def _skip_string(css: str, start: int) -> int:
+    quote = css[start]
+    position = start + 1
+    while position < len(css) and css[position] != quote:
+        position += 2 if css[position] == '\\' else 1
+    return position + 1
+
+
+def css_rules(css: str):
+    """Yield ``(prelude, block)`` for each top-level rule; ``block`` is None for ``@import``-style statements."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    position, length = 0, len(css)
+    while position < length:
+        end = position
+        while end < length and css[end] not in '{;}':
+            end = _skip_string(css, end) if css[end] in '"\'' else end + 1
+        if end >= length:
+            return
+        prelude = css[position:end].strip()
+        if css[end] != '{':
+            if prelude:
+                yield prelude, None
+            position = end + 1
+            continue
+        depth, cursor = 1, end + 1
+        while cursor < length and depth:
+            char = css[cursor]
+            if char in '"\'':
+                cursor = _skip_string(css, cursor)
+                continue
+            depth += {'{': 1, '}': -1}.get(char, 0)
+            cursor += 1
+        yield prelude, css[end + 1:cursor - 1]
+        position = cursor
+
+
+def split_selectors(prelude: str):
+    parts, depth, current = [], 0, []
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and not depth:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current).strip())
+    return [part for part in parts if part]
+
+
+def selector_used(selector: str, used: dict) -> bool:
+    simple = _ATTRIBUTE.sub('', _PSEUDO.sub('', selector))
+    return (
+        all(name in used['classes'] for name in _CLASS.findall(simple))
+        and all(name in used['ids'] for name in _ID.findall(simple))
+        and all(name.lower() in used['types'] for name in _TYPE.findall(_CLASS.sub('', _ID.sub('', simple))))
+    )
+
+
+def critical_rules(css: str, used: dict) -> str:
+    """Return the rules of ``css`` whose selectors can match markup described by ``used``."""
+    kept = []
+    for prelude, block in css_rules(css):
+        if block is None:
+            continue
+        if prelude.startswith('@'):
+            at_rule = prelude[1:].split(None, 1)[0].lower() if len(prelude) > 1 else ''
+            if at_rule in _GROUPING_AT_RULES:
+                inner = critical_rules(block, used)
+                if inner:
+                    kept.append(f'{prelude}{{{inner}}}')
+            elif at_rule == 'font-face':
+                kept.append(f'{prelude}{{{block.strip()}}}')
+            continue
+        selectors = [selector for selector in split_selectors(prelude) if selector_used(selector, used)]
+        if selectors:
+            kept.append(f'{",".join(selectors)}{{{block.strip()}}}')
+    return ''.join(kept)
+
+
+def build_critical(url_name: str, html: str, bundles: dict) -> bool:
+    """Write the critical CSS of the page ``url_name`` rendered as ``html``; return whether any was found."""
+    used = used_selectors(above_the_fold(html))
+    parts = []
+    for stem in dict.fromkeys(BUNDLE_HREF.findall(html)):
+        path = bundles.get(f'{stem}.css')
+        if path:
+            css = (bundle_root() / posixpath.basename(path)).read_text(encoding='utf-8')
+            parts.append(critical_rules(absolute_css_urls(css, path), used))
+    content = ''.join(parts)
+    if not content:
+        return False
+    directory = bundle_root() / CRITICAL_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f'{url_name}.css').write_text(content, encoding='utf-8')
+    return True
@@ -0,0 +1,196 @@
+"""Per-view HTTP caching for browsers and the nginx micro-cache.
+
+``CACHE_POLICIES`` says, per URL name, how long browsers and nginx may
+keep a page. ``charity.middleware.CachePolicyMiddleware`` turns the policy
+into ``Cache-Control``/``Vary`` headers, plus ``X-Accel-Expires`` for nginx,
+on 200 responses for anonymous visitors. A visitor with a session or
+flash-message cookie, and any response that sets a cookie (a CSRF token
+rendered into a form, say), gets ``private, no-cache`` instead. nginx only
+stores what Django marks public, so personal pages never reach the
+shared cache.
+
+``manage.py build_nginx_cache`` writes the nginx ``proxy_cache`` config
+from the same registry, along with a loopback-only refresh server. After a
+save, ``refresh_model`` asks that server to fetch the changed pages again,
+so nginx drops the old copy before its TTL runs out (see
+``charity.signals``).
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from . import page_cache
+from .models import Article, Club, Opportunity, Program, Project, School
+
+logger = logging.getLogger(__name__)
+
+# max_age: browsers; shared_max_age: nginx; stale_while_revalidate: how long a stale copy
+# may be served while it is refreshed; vary: request headers the page depends on
+LIST_POLICY = {'public': True, 'max_age': 60, 'shared_max_age': 300, 'stale_while_revalidate': 600, 'vary': ()}
+# Browsers revalidate detail pages every time (cheap: they send ETags, see charity.conditional)
+DETAIL_POLICY = {'public': True, 'max_age': 0, 'shared_max_age': 60, 'stale_while_revalidate': 300, 'vary': ()}
+PRIVATE_POLICY = {'public': False}
+
+# URL name (without the ``charity:`` namespace) -> policy; other views send no caching headers
+CACHE_POLICIES = {
+    'home': LIST_POLICY,
+    'about': LIST_POLICY,
+    'projects': LIST_POLICY,
+    'clubs': LIST_POLICY,
+    'programs': LIST_POLICY,
+    'partner_schools': LIST_POLICY,
+    'impact': LIST_POLICY,
+    'spotlight': LIST_POLICY,
+    'opportunities': LIST_POLICY,
+    'articles': LIST_POLICY,
+    'project_detail': DETAIL_POLICY,
+    'club_detail': DETAIL_POLICY,
+    'program_detail': DETAIL_POLICY,
+    'school_detail': DETAIL_POLICY,
+    'opportunity_detail': DETAIL_POLICY,
+    'article_details': DETAIL_POLICY,
+    'search_suggest': {'public': True, 'max_age': 30, 'shared_max_age': 30, 'stale_while_revalidate': 60, 'vary': ()},
+    # Forms with a per-visitor CSRF token
+    'contact': PRIVATE_POLICY,
+    'donate_now': PRIVATE_POLICY,
+}
+
+# Detail URL name -> (model, URL kwarg), for refreshing an object's own page when it is saved
+DETAIL_OBJECTS = {
+    'project_detail': (Project, 'project_id'),
+    'club_detail': (Club, 'club_id'),
+    'program_detail': (Program, 'program_id'),
+    'school_detail': (School, 'school_id'),
+    'opportunity_detail': (Opportunity, 'opp_id'),
+    'article_details': (Article, 'post_id'),
+}
+
+REFRESH_TIMEOUT = 10
+
+_executor = None
+
+
+def policy_for(url_name: str):
+    return CACHE_POLICIES.get(url_name)
+
+
+def is_personal(request, response) -> bool:
+    """Whether ``response`` belongs to one visitor and must stay out of shared caches."""
+    cookies = request.COOKIES
+    return (
+        settings.SESSION_COOKIE_NAME in cookies
+        or 'messages' in cookies
+        or bool(response.cookies)
+    )
+
+
+def apply(policy: dict, request, response) -> None:
+    """Add the caching headers ``policy`` asks for to ``response``."""
+    if not policy['public'] or is_personal(request, response):
+        patch_cache_control(response, private=True, no_cache=True)
+        return
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=policy['max_age'],
+        s_maxage=policy['shared_max_age'],
+        stale_while_revalidate=policy['stale_while_revalidate'],
+    )
+    # nginx takes its TTL from here and does not pass the header on
+    response['X-Accel-Expires'] = str(policy['shared_max_age'])
+    if policy['vary']:
+        patch_vary_headers(response, policy['vary'])
+
+
+def url_patterns():
+    """Yield ``(url name, nginx location)`` for every public policy, e.g. ``('projects', '= /projects/')``."""
+    prefix = ''
+    patterns = []
+    for entry in get_resolver().url_patterns:
+        if isinstance(entry, URLResolver) and entry.namespace == 'charity':
+            prefix = str(entry.pattern)
+            patterns = entry.url_patterns
+            break
+    for pattern in patterns:
+        policy = CACHE_POLICIES.get(pattern.name)
+        if not policy or not policy['public']:
+            continue
+        converters = getattr(pattern.pattern, 'converters', None)
+        if converters == {}:
+            yield pattern.name, f'= /{prefix}{pattern.pattern}'
+            continue
+        regex = pattern.pattern.regex.pattern.lstrip('^').replace(r'\Z', '$')
+        # nginx would turn named groups into variables; only the match matters here
+        regex = re.sub(r'\(\?P<\w+>', '(?:', regex)
+        yield pattern.name, f'~ ^/{re.escape(prefix)}{regex}'
+
+
+def refresh_hosts() -> list:
+    hosts = getattr(settings, 'NGINX_CACHE_REFRESH_HOSTS', None)
+    if hosts:
+        return list(hosts)
+    return [host for host in settings.ALLOWED_HOSTS if host not in ('*', 'localhost', '127.0.0.1') and not host.startswith('.')]
+
+
+def paths_for(model, pk=None) -> list:
+    """Paths of the publicly cached pages that render ``model`` (and the detail page of ``pk``)."""
+    paths = [
+        reverse(f'charity:{group}') for group in page_cache.groups_for_model(model)
+        if CACHE_POLICIES.get(group, PRIVATE_POLICY)['public']
+    ]
+    for url_name, (detail_model, kwarg) in DETAIL_OBJECTS.items():
+        if detail_model is model and pk is not None:
+            paths.append(reverse(f'charity:{url_name}', kwargs={kwarg: pk}))
+    return paths
+
+
+def refresh(paths) -> None:
+    """Have nginx fetch ``paths`` again, for every site host, replacing the cached copies."""
+    base = getattr(settings, 'NGINX_CACHE_REFRESH_URL', '').rstrip('/')
+    for host in refresh_hosts():
+        for path in paths:
+            request = Request(f'{base}{path}', headers={'Host': host})
+            try:
+                with urlopen(request, timeout=REFRESH_TIMEOUT) as response:
+                    response.read()
+            except OSError as exc:
+                logger.warning('Could not refresh %s%s in the nginx cache: %s', host, path, exc)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nginx-cache-refresh')
+    return _executor
+
+
+def refresh_model(model, pk=None) -> None:
+    """Refresh the pages of ``model`` in a background thread; a no-op unless ``NGINX_CACHE_REFRESH_URL`` is set."""
+    if not getattr(settings, 'NGINX_CACHE_REFRESH_URL', ''):
+        return
+    paths = paths_for(model, pk)
+    if paths:
+        _get_executor().submit(refresh, paths)
+
+
+def refresh_objects(model, pks) -> None:
+    """Like ``refresh_model`` for several rows at once, fetching the shared listings only once."""
+    if not getattr(settings, 'NGINX_CACHE_REFRESH_URL', ''):
+        return
+    paths = dict.fromkeys(paths_for(model))
+    for pk in pks:
+        paths.update(dict.fromkeys(paths_for(model, pk)))
+    if paths:
+        _get_executor().submit(refresh, list(paths))
+
+
+def refresh_listen_address() -> str:
+    """``host:port`` the nginx refresh server listens on, from ``NGINX_CACHE_REFRESH_URL``."""
+    parts = urlsplit(getattr(settings, 'NGINX_CACHE_REFRESH_URL', '') or 'http://127.0.0.1:8081')
+    return f'{parts.hostname}:{parts.port or 80}'
@@ -0,0 +1,140 @@
+"""Conditional GET (ETag / Last-Modified) support for detail pages.
+
+Each validator reads the object's ``updated_at`` plus the latest timestamp
+and row count of the related rows the page renders, in a single query, and
+``conditional_page`` answers ``If-None-Match`` / ``If-Modified-Since`` with a
+304 before the view or template engine runs. Row counts are part of the ETag
+so deleting a related row changes the validator too.
+
+Only anonymous requests are validated: logged-in visitors see per-user
+content (membership buttons, edit links) that these validators don't cover.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Func, IntegerField, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+from .models import (
+    Article,
+    Category,
+    Club,
+    Opportunity,
+    Program,
+    Project,
+    ProjectAchievement,
+    ProjectDetails,
+    ProjectMembership,
+    ProjectPhoto,
+    School,
+)
+
+
+def _related_state(prefix, model, fk, timestamp, outer='pk'):
+    """Subquery annotations for the newest ``timestamp`` and row count of ``model``."""
+    rows = model.objects.filter(**{fk: OuterRef(outer)}).order_by().values(fk)
+    return {
+        f'{prefix}_latest': Subquery(rows.annotate(v=Max(timestamp)).values('v')),
+        f'{prefix}_rows': Subquery(rows.annotate(v=Count('pk')).values('v')),
+    }
+
+
+def _table_state(prefix, model, timestamp):
+    """Subquery annotations for the newest ``timestamp`` and row count of a whole table."""
+    field = model._meta.get_field(timestamp)
+    rows = model.objects.order_by()
+    return {
+        f'{prefix}_latest': Subquery(rows.values(v=Func(timestamp, function='MAX', output_field=field)).values('v')),
+        f'{prefix}_rows': Subquery(rows.values(v=Func('pk', function='COUNT', output_field=IntegerField())).values('v')),
+    }
+
+
+def _state(queryset, *fields, **annotations):
+    return queryset.annotate(**annotations).values(*fields, *annotations).first()
+
+
+def project_state(project_id):
+    return _state(
+        Project.objects.filter(pk=project_id),
+        'updated_at',
+        'category__updated_at',
+        **_related_state('details', ProjectDetails, 'project', 'updated_at'),
+        **_related_state('photos', ProjectPhoto, 'project', 'updated_at'),
+        **_related_state('achievements', ProjectAchievement, 'project', 'updated_at'),
+        # Covers role changes and the members' names
+        **_related_state('members', ProjectMembership, 'project', 'updated_at'),
+    )
+
+
+def program_state(program_id):
+    return _state(
+        Program.objects.filter(pk=program_id),
+        'updated_at',
+        # Related programs share the category; the sidebar lists all categories
+        **_related_state('siblings', Program, 'category', 'updated_at', outer='category'),
+        **_table_state('categories', Category, 'updated_at'),
+    )
+
+
+def school_state(school_id):
+    return _state(
+        School.objects.filter(pk=school_id),
+        'updated_at',
+        **_related_state('clubs', Club, 'school', 'updated_at'),
+    )
+
+
+def club_state(club_id):
+    return _state(Club.objects.filter(pk=club_id), 'updated_at', 'school__name')
+
+
+def opportunity_state(opp_id):
+    return _state(Opportunity.objects.filter(pk=opp_id, is_published=True), 'updated_at')
+
+
+def article_state(post_id):
+    # author_name changes by QuerySet.update() when the author renames, leaving updated_at alone
+    return _state(Article.objects.filter(pk=post_id, is_published=True), 'updated_at', 'author_name')
+
+
+def _is_anonymous(request) -> bool:
+    cookies = request.COOKIES
+    return settings.SESSION_COOKIE_NAME not in cookies and 'messages' not in cookies
+
+
+def conditional_page(state_func):
+    """Serve 304s for unchanged detail pages to anonymous visitors.
+
+    ``state_func`` receives the view's URL kwargs and returns a dict of the
+    values the page depends on, or None when the object doesn't exist (the
+    view then runs and raises its usual 404).
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not _is_anonymous(request):
+                return view(request, *args, **kwargs)
+            state = state_func(**kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+
+            salt = getattr(settings, 'CONDITIONAL_GET_SALT', '')
+            raw = repr((salt, sorted(state.items())))
+            etag = quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+            timestamps = [v for v in state.values() if isinstance(v, datetime)]
+            last_modified = round(max(timestamps).timestamp()) if timestamps else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    response.headers.setdefault('ETag', etag)
+                    if last_modified and not response.has_header('Last-Modified'):
+                        response.headers['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return inner
+    return decorator
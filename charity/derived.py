@@ -0,0 +1,48 @@
+"""Values stored alongside the columns they are derived from.
+
+Each ``fill_*`` function sets one row's derived attributes from its source
+attributes. The models' ``fill_derived()`` and the backfill in migration
+0025 share them, so they read plain fields only: historical models have no
+custom methods.
+"""
+from . import text
+
+AUTHOR_NAME_LENGTH = 255
+
+
+def author_display_name(user) -> str:
+    """Full name or username of ``user``, as stored in ``Article.author_name``."""
+    full_name = f'{user.first_name} {user.last_name}'.strip()
+    return (full_name or user.username)[:AUTHOR_NAME_LENGTH]
+
+
+def fill_article(article) -> None:
+    article.excerpt = text.excerpt(article.content)
+    article.reading_time = text.reading_minutes(article.content)
+    if article.author_id:
+        article.author_name = author_display_name(article.author)
+
+
+def fill_resource(resource) -> None:
+    resource.file_size = "N/A"
+    if resource.file:
+        try:
+            # Uploads not yet saved report their own size; stored files ask the backend once here
+            if resource.file.size:
+                resource.file_size = text.file_size(resource.file.size)
+        except OSError:
+            pass
+    resource.file_type = text.file_type(resource.file.name if resource.file else '')[:10]
+
+
+def fill_donation(donation) -> None:
+    donation.progress_percent = 0
+    if donation.goal_amount and donation.goal_amount > 0:
+        try:
+            donation.progress_percent = max(0, min(100, int((donation.raised_amount / donation.goal_amount) * 100)))
+        except Exception:
+            pass
+
+
+def fill_spotlight_item(item) -> None:
+    item.achievements_list = text.lines(item.key_achievements)
@@ -0,0 +1,48 @@
+"""Cached facet counts for the opportunities board filters.
+
+One GROUP BY query counts published opportunities per ``opportunity_type``,
+with the open ones counted alongside. The result is cached under the
+page-cache version of the ``opportunities`` group, which every Opportunity
+edit replaces (see ``charity.signals``). The key also includes the date,
+so postings move from open to closed when their deadline passes.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from . import page_cache
+from .models import Opportunity, open_on
+
+FACETS_KEY = 'charity:facets:opportunities:{version}:{day}'
+FACETS_TIMEOUT = 60 * 60 * 24
+
+
+def _empty() -> dict:
+    return {'total': 0, 'open': 0, 'closed': 0}
+
+
+def opportunity_facets(day=None) -> dict:
+    """Return ``{type: {'total', 'open', 'closed'}}`` for published opportunities; key ``''`` covers all types."""
+    day = day or timezone.localdate()
+    key = FACETS_KEY.format(version=page_cache.group_version('opportunities'), day=day.isoformat())
+    facets = cache.get(key)
+    if facets is None:
+        rows = (
+            Opportunity.objects.published()
+            .order_by()
+            .values('opportunity_type')
+            .annotate(total=Count('id'), open=Count('id', filter=open_on(day)))
+        )
+        facets = {'': _empty()}
+        for row in rows:
+            counts = facets.setdefault(row['opportunity_type'], _empty())
+            for counter in (counts, facets['']):
+                counter['total'] += row['total']
+                counter['open'] += row['open']
+                counter['closed'] += row['total'] - row['open']
+        cache.set(key, facets, FACETS_TIMEOUT)
+    return facets
+
+
+def counts_for(facets: dict, opportunity_type: str = '') -> dict:
+    return facets.get(opportunity_type) or _empty()
@@ -0,0 +1,272 @@
+"""Font Awesome subset to the icons the site actually uses.
+
+The local Font Awesome fonts carry thousands of glyphs; the pages use a few
+dozen. ``build()`` collects every ``fa-*`` class in the templates, the
+bundled JS, the ``PYTHON_SOURCES`` that hand icon classes to templates and
+the ``ICON_FIELDS``/``SOCIAL_LINK_FIELDS`` of the database, plus the icon
+codepoints the bundled CSS puts in ``content:``. It then writes:
+
+- one WOFF2 font per style in ``FONT_STYLES``, holding just those glyphs;
+- a stylesheet with the ``@font-face`` rules and only the matching rules
+  of ``GLYPH_CSS``.
+
+Both go to ``default_storage`` under ``icons/`` with content-hashed names,
+so they can be rebuilt while the site runs. A manifest records the
+stylesheet and the icon names it covers. ``{% icon_stylesheet_url %}``
+(``charity.templatetags.icons``) links the subset once it exists; until
+then base.html links the full local and CDN fonts.
+
+``manage.py subset_icons`` builds the subset. Saving an ``ICON_FIELDS`` or
+``SOCIAL_LINK_FIELDS`` model with an icon the subset lacks rebuilds it in a background thread.
+Needs ``fonttools`` (and ``brotli`` for WOFF2).
+"""
+import hashlib
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from . import bundles, page_cache
+from .models import ImpactCounter, SpotlightCategory, SpotlightStats, TeamMember
+from .static_assets import template_files
+
+try:
+    from fontTools import subset
+except ImportError:  # pragma: no cover - optional dependency
+    subset = None
+
+logger = logging.getLogger(__name__)
+
+# Model -> field holding Font Awesome classes such as "fas fa-heart"
+ICON_FIELDS = {
+    ImpactCounter: 'icon_class',
+    SpotlightCategory: 'icon_class',
+    SpotlightStats: 'icon_class',
+}
+# Model -> JSON field whose keys pick brand icons (team_card.html falls back to "fab fa-{{ key }}")
+SOCIAL_LINK_FIELDS = {
+    TeamMember: 'social_links',
+}
+# Static file mapping every fa-* class to its codepoint (same release as the fonts)
+GLYPH_CSS = 'assets/css/fontawesome.min.css'
+# (family, weight, source font, classes that select it)
+FONT_STYLES = (
+    ('Font Awesome 6 Free', 900, 'assets/fonts/fontawesome/fa-solid-900.ttf', ('fa', 'fas', 'fa-solid')),
+    ('Font Awesome 6 Free', 400, 'assets/fonts/fontawesome/fa-regular-400.ttf', ('far', 'fa-regular')),
+    ('Font Awesome 6 Brands', 400, 'assets/fonts/fontawesome/fa-brands-400.ttf', ('fab', 'fa-brands')),
+)
+# Extra static files scanned for fa-* classes, besides the templates and bundled JS
+EXTRA_SOURCES = ('assets/js/search-suggest.js',)
+# Modules (relative to this package) whose constants pass icon classes to templates
+PYTHON_SOURCES = ('views.py',)
+
+ICONS_DIR = 'icons'
+MANIFEST_NAME = 'icons/icons.json'
+MANIFEST_KEY = 'charity:icons:manifest'
+
+ICON_CLASS = re.compile(r'(?<![\w-])(fa[srb]?|fa-[a-z0-9]+(?:-[a-z0-9]+)*)(?![\w-])')
+CSS_CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+CSS_PSEUDO = re.compile(r'::?[\w-]+(\([^)]*\))?')
+CONTENT_CODEPOINT = re.compile(r"""content\s*:\s*["']\\([0-9a-fA-F]{4,5})["']""")
+# Font Awesome glyphs live in the Private Use Area
+PRIVATE_USE = range(0xE000, 0xF900)
+
+_executor = None
+
+
+def _read_static(path: str) -> str:
+    found = finders.find(path)
+    if not found:
+        raise FileNotFoundError(f'{path} not found in static files')
+    return Path(found).read_text(encoding='utf-8', errors='ignore')
+
+
+def template_classes() -> set:
+    """``fa*`` classes used in the templates, in the JS they load and in ``PYTHON_SOURCES``."""
+    texts = [path.read_text(encoding='utf-8', errors='ignore') for path in template_files()]
+    texts.extend((Path(__file__).parent / name).read_text(encoding='utf-8') for name in PYTHON_SOURCES)
+    sources = [source for name, files in bundles.BUNDLES.items() if name.endswith('.js') for source in files]
+    texts.extend(_read_static(source) for source in (*sources, *EXTRA_SOURCES))
+    return {name for text in texts for name in ICON_CLASS.findall(text)}
+
+
+def social_link_classes(links) -> str:
+    """The ``fa-*`` classes the keys of a ``SOCIAL_LINK_FIELDS`` value render, space separated."""
+    return ' '.join(f'fa-{key}' for key in (links or {}) if isinstance(key, str))
+
+
+def instance_classes(instance) -> str:
+    """The icon classes a saved ``ICON_FIELDS`` or ``SOCIAL_LINK_FIELDS`` row renders."""
+    model = type(instance)
+    if model in SOCIAL_LINK_FIELDS:
+        return social_link_classes(getattr(instance, SOCIAL_LINK_FIELDS[model]))
+    return getattr(instance, ICON_FIELDS[model]) or ''
+
+
+def database_classes() -> set:
+    """``fa*`` classes stored in ``ICON_FIELDS`` or named by ``SOCIAL_LINK_FIELDS`` keys."""
+    classes = set()
+    for model, field_name in ICON_FIELDS.items():
+        for value in model.objects.values_list(field_name, flat=True):
+            classes.update(ICON_CLASS.findall(value or ''))
+    for model, field_name in SOCIAL_LINK_FIELDS.items():
+        for value in model.objects.values_list(field_name, flat=True):
+            classes.update(ICON_CLASS.findall(social_link_classes(value)))
+    return classes
+
+
+def css_codepoints() -> set:
+    """Icon codepoints the bundled CSS draws through ``content:`` (pseudo-element icons)."""
+    codepoints = set()
+    for name, files in bundles.BUNDLES.items():
+        if name.endswith('.css'):
+            for source in files:
+                codepoints.update(int(code, 16) for code in CONTENT_CODEPOINT.findall(_read_static(source)))
+    return {codepoint for codepoint in codepoints if codepoint in PRIVATE_USE}
+
+
+def _selector_classes(selector: str) -> list:
+    return CSS_CLASS.findall(CSS_PSEUDO.sub('', selector))
+
+
+def subset_rules(css: str, classes: set) -> tuple:
+    """Return ``(css, codepoints)``: the rules of ``css`` that only need ``classes``, and the glyphs they draw.
+
+    ``@font-face`` rules are dropped; ``@keyframes`` are kept for the animation classes.
+    """
+    kept, codepoints = [], set()
+    for prelude, block in bundles.css_rules(css):
+        if block is None:
+            continue
+        if prelude.startswith('@'):
+            at_rule = prelude[1:].split(None, 1)[0].lower()
+            if at_rule in ('media', 'supports'):
+                inner, inner_codepoints = subset_rules(block, classes)
+                if inner:
+                    kept.append(f'{prelude}{{{inner}}}')
+                    codepoints |= inner_codepoints
+            elif at_rule.endswith('keyframes'):
+                kept.append(f'{prelude}{{{block}}}')
+            continue
+        selectors = [
+            selector for selector in bundles.split_selectors(prelude)
+            if _selector_classes(selector) and all(name in classes for name in _selector_classes(selector))
+        ]
+        if selectors:
+            kept.append(f'{",".join(selectors)}{{{block.strip()}}}')
+            codepoints.update(int(code, 16) for code in CONTENT_CODEPOINT.findall(block))
+    return ''.join(kept), codepoints
+
+
+def subset_font(source: str, codepoints: set) -> bytes:
+    """WOFF2 copy of the static font ``source`` with only ``codepoints``."""
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.notdef_outline = True
+    font = subset.load_font(finders.find(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    output = BytesIO()
+    subset.save_font(font, output, options)
+    return output.getvalue()
+
+
+def _save_hashed(storage, stem: str, extension: str, content: bytes) -> str:
+    name = f'{ICONS_DIR}/{stem}.{hashlib.sha256(content).hexdigest()[:12]}.{extension}'
+    if not storage.exists(name):
+        storage.save(name, ContentFile(content))
+    return name
+
+
+def build(storage=default_storage) -> dict:
+    """Write the subset fonts and stylesheet for the icons in use; return the new manifest."""
+    if subset is None:
+        raise RuntimeError('fonttools is not installed')
+    classes = template_classes() | database_classes() | {'fa', 'fas', 'far', 'fab'}
+    rules, codepoints = subset_rules(_read_static(GLYPH_CSS), classes)
+    codepoints |= css_codepoints()
+
+    faces, family_rules = [], []
+    for family, weight, source, style_classes in FONT_STYLES:
+        font = _save_hashed(storage, Path(source).stem, 'woff2', subset_font(source, codepoints))
+        faces.append(
+            f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};font-display:block;'
+            f'src:url("{Path(font).name}") format("woff2")}}'
+        )
+        selector = ','.join(f'.{name}' for name in style_classes)
+        family_rules.append(f'{selector}{{font-family:"{family}";font-weight:{weight}}}')
+    # Family rules last: the glyph CSS names the Pro families, the fonts here are registered as Free
+    css = ''.join(faces) + rules + ''.join(family_rules) + ':root{--icon-font:"Font Awesome 6 Free"}'
+    stylesheet = _save_hashed(storage, 'icons', 'css', css.encode('utf-8'))
+
+    icons = sorted(name for name in classes if name.startswith('fa-'))
+    data = {'css': stylesheet, 'icons': icons, 'glyphs': len(codepoints)}
+    if storage.exists(MANIFEST_NAME):
+        storage.delete(MANIFEST_NAME)
+    storage.save(MANIFEST_NAME, ContentFile(json.dumps(data, indent=2).encode('utf-8')))
+    cache.set(MANIFEST_KEY, data, None)
+    # Cached pages still link the previous stylesheet
+    for group in page_cache.PAGE_CACHE_GROUPS:
+        page_cache.purge_group(group)
+    return data
+
+
+def manifest(storage=default_storage) -> dict:
+    """Return the current subset manifest, or ``{}`` before the first build."""
+    data = cache.get(MANIFEST_KEY)
+    if data is None:
+        data = {}
+        try:
+            if storage.exists(MANIFEST_NAME):
+                with storage.open(MANIFEST_NAME, 'rb') as fh:
+                    data = json.loads(fh.read())
+        except (OSError, ValueError):
+            data = {}
+        cache.set(MANIFEST_KEY, data, None)
+    return data
+
+
+def stylesheet_url(storage=default_storage) -> str:
+    """URL of the subset stylesheet, or '' before the first build."""
+    name = manifest(storage).get('css')
+    return storage.url(name) if name else ''
+
+
+def missing_classes(value: str) -> set:
+    """The ``fa-*`` classes in ``value`` that the current subset doesn't cover."""
+    data = manifest()
+    if not data:
+        return set()
+    return {name for name in ICON_CLASS.findall(value or '') if name.startswith('fa-')} - set(data['icons'])
+
+
+def _build_logged() -> None:
+    try:
+        build()
+    except Exception:
+        logger.exception('Could not rebuild the icon subset')
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # One thread: concurrent saves queue up behind a single rebuild
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='icon-subset')
+    return _executor
+
+
+def schedule() -> None:
+    """Rebuild the subset in a background thread once the current transaction commits."""
+    if subset is None:
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_build_logged))
@@ -0,0 +1,210 @@
+"""Responsive variants for uploaded images.
+
+Once an upload is committed, a background thread:
+
+- caps the original at ``IMAGE_MAX_DIMENSION`` pixels;
+- writes AVIF (when Pillow supports it) and WebP copies at each of
+  ``IMAGE_VARIANT_WIDTHS`` that is narrower than the image, plus one at
+  the image's own width, into a ``variants/`` folder beside it;
+- writes a JSON manifest listing the copies, the capped dimensions and,
+  for opaque images, a blurred ``PLACEHOLDER_SIZE`` px WebP data URI to
+  paint while the real image loads.
+
+``{% responsive_image %}`` (``charity.templatetags.images``) reads the
+manifest, cached, to emit ``srcset``/``sizes``, ``width``/``height`` and
+the placeholder. Until a manifest exists it
+falls back to the original, so uploads never wait for the encoder.
+``manage.py generate_image_variants`` backfills existing uploads and any
+job lost when a worker recycled.
+"""
+import base64
+import io
+import json
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import (
+    Article, Club, Impact, Mentor, Opportunity, Photo, Program, Project, ProjectPhoto, School,
+    SpotlightItem, TeamMember, VoiceOfChange,
+)
+
+logger = logging.getLogger(__name__)
+
+# Model -> image fields that get variants
+IMAGE_FIELDS = {
+    Article: ('image',),
+    Club: ('icon', 'image'),
+    Impact: ('section_image',),
+    Mentor: ('image',),
+    Opportunity: ('image',),
+    Photo: ('image',),
+    Program: ('image',),
+    Project: ('image',),
+    ProjectPhoto: ('image',),
+    School: ('image', 'badge'),
+    SpotlightItem: ('image',),
+    TeamMember: ('image',),
+    VoiceOfChange: ('image',),
+}
+
+# format -> (MIME type, Pillow save options); listed in order of preference
+FORMATS = {
+    'avif': ('image/avif', {'quality': 50}),
+    'webp': ('image/webp', {'quality': 75, 'method': 6}),
+}
+
+MANIFEST_KEY = 'charity:images:manifest:{name}'
+# Bump when the manifest gains fields; generate_image_variants redoes older ones
+MANIFEST_VERSION = 2
+PLACEHOLDER_SIZE = 16
+MISSING_MANIFEST_TIMEOUT = 60
+VARIANTS_DIR = 'variants'
+
+_executor = None
+
+
+def variant_widths() -> tuple:
+    return tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 960, 1280)))
+
+
+def max_dimension() -> int:
+    return getattr(settings, 'IMAGE_MAX_DIMENSION', 1920)
+
+
+def available_formats() -> list:
+    from PIL import features
+
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def variant_name(name: str, width: int, fmt: str) -> str:
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, VARIANTS_DIR, f'{filename}.{width}w.{fmt}')
+
+
+def manifest_name(name: str) -> str:
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, VARIANTS_DIR, f'{filename}.json')
+
+
+def _manifest_key(name: str) -> str:
+    return MANIFEST_KEY.format(name=name)
+
+
+def _replace(storage, name: str, content: bytes) -> None:
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def _encode(image, fmt: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def placeholder(image) -> str:
+    """Return a tiny blurred WebP data URI standing in for ``image``."""
+    from PIL import ImageFilter
+
+    thumb = image.copy()
+    thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    thumb = thumb.filter(ImageFilter.GaussianBlur(1))
+    return 'data:image/webp;base64,' + base64.b64encode(_encode(thumb, 'webp', quality=30)).decode('ascii')
+
+
+def generate(name: str, storage=default_storage) -> dict:
+    """Cap ``name`` and write its variants and manifest; return the manifest."""
+    from PIL import Image, ImageOps
+
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        original_format = image.format
+        animated = getattr(image, 'is_animated', False)
+        if not animated:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+    manifest = {'version': MANIFEST_VERSION, 'width': image.width, 'height': image.height, 'formats': {}}
+    if not animated:
+        limit = max_dimension()
+        if max(image.size) > limit:
+            image.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+            save_options = {'quality': 85, 'optimize': True} if original_format == 'JPEG' else {}
+            _replace(storage, name, _encode(image, original_format, **save_options))
+            manifest.update(width=image.width, height=image.height)
+
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        # A blurred square would show through transparent logos and badges
+        if image.mode == 'RGB':
+            manifest['placeholder'] = placeholder(image)
+        widths = sorted({width for width in variant_widths() if width < image.width} | {image.width})
+        for width in widths:
+            resized = image if width == image.width else image.resize(
+                (width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS
+            )
+            for fmt in available_formats():
+                _, options = FORMATS[fmt]
+                _replace(storage, variant_name(name, width, fmt), _encode(resized, fmt, **options))
+                manifest['formats'].setdefault(fmt, []).append(width)
+
+    _replace(storage, manifest_name(name), json.dumps(manifest).encode('utf-8'))
+    cache.set(_manifest_key(name), manifest, None)
+    return manifest
+
+
+def manifest(name: str, storage=default_storage) -> dict:
+    """Return the variant manifest for ``name``, or ``{}`` while it hasn't been generated."""
+    key = _manifest_key(name)
+    data = cache.get(key)
+    if data is None:
+        path = manifest_name(name)
+        data = {}
+        try:
+            if storage.exists(path):
+                with storage.open(path, 'rb') as fh:
+                    data = json.loads(fh.read())
+        except (OSError, ValueError):
+            data = {}
+        # Re-check soon while the background job may still be running
+        cache.set(key, data, None if data else MISSING_MANIFEST_TIMEOUT)
+    return data
+
+
+def _generate_logged(name: str) -> None:
+    try:
+        generate(name)
+    except Exception:
+        logger.exception('Could not generate image variants for %s', name)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_THREADS', 1),
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def schedule(name: str) -> None:
+    """Generate variants for ``name`` in a background thread once the current transaction commits."""
+    transaction.on_commit(lambda: _get_executor().submit(_generate_logged, name))
+
+
+def pending_names(obj):
+    """Yield the stored image names on ``obj`` that have no manifest yet."""
+    for field_name in IMAGE_FIELDS.get(type(obj), ()):
+        file = getattr(obj, field_name)
+        # Ask storage, not the cache: a deleted upload's name can be reused
+        if file and file.name and not file.storage.exists(manifest_name(file.name)):
+            yield file.name
@@ -0,0 +1,21 @@
+"""Index helpers shared by ``charity.models`` and its migrations."""
+from django.db import models
+
+
+class PostgresPartialIndex(models.Index):
+    """An ``Index`` whose ``condition`` only applies on PostgreSQL.
+
+    Other backends (SQLite in development, and MySQL, which would otherwise
+    skip a partial index entirely) get a plain composite index on the same
+    fields. Keep boolean flags in ``condition`` rather than ``fields``: Django
+    compiles ``is_active=True`` to a bare ``WHERE "is_active"`` on SQLite,
+    which can't seek on an index column, but an index in the listing's
+    ORDER BY still lets it stop after the first page of rows.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if self.condition is not None and schema_editor.connection.vendor != 'postgresql':
+            index = self.clone()
+            index.condition = None
+            return index.create_sql(model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
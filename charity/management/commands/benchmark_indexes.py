@@ -0,0 +1,147 @@
+import datetime
+import math
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from charity.models import (
+    Article, Category, Club, Impact, ImpactCounter, Opportunity, Project,
+    ProjectMembershipRequest, School, SpotlightCategory, SpotlightItem, SpotlightStats,
+)
+
+# Models whose Meta.indexes exist to serve the queries below
+INDEXED_MODELS = (
+    Opportunity, Article, Impact, ImpactCounter, SpotlightStats, SpotlightItem, Club, ProjectMembershipRequest,
+)
+
+BATCH_SIZE = 1000
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark's seeded rows and index changes."""
+
+
+class Command(BaseCommand):
+    help = 'Seed large tables and print EXPLAIN for hot queries without and with the charity indexes (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                          help='Rows to seed per table (default 10000)')
+
+    def handle(self, *args, **options):
+        if not connection.features.can_rollback_ddl:
+            raise CommandError('This benchmark needs a database that can roll back DDL (PostgreSQL or SQLite).')
+        rows = options['rows']
+        indexes = [(model, index) for model in INDEXED_MODELS for index in model._meta.indexes]
+
+        self.stdout.write(f'Backend: {connection.vendor}; seeding {rows} rows per table...')
+        # The schema editor wraps everything in one transaction; raising rolls it back
+        try:
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.remove_index(model, index)
+                fixtures = self.seed(rows)
+
+                self.explain('Without indexes', fixtures)
+                for model, index in indexes:
+                    editor.add_index(model, index)
+                self.explain('With indexes', fixtures)
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Done; seeded rows and index changes were rolled back.'))
+
+    def seed(self, rows):
+        """Create ``rows`` rows in each benchmarked table; return the objects the queries filter on."""
+        User = get_user_model()
+        today = timezone.localdate()
+        side = math.isqrt(rows) + 1
+
+        users = User.objects.bulk_create(
+            [User(username=f'benchmark-{i}', password='!') for i in range(side)], batch_size=BATCH_SIZE
+        )
+        category = Category.objects.create(name='Benchmark')
+        projects = Project.objects.bulk_create(
+            [Project(category=category, title=f'Project {i}') for i in range(side)], batch_size=BATCH_SIZE
+        )
+        schools = School.objects.bulk_create(
+            [School(name=f'School {i}') for i in range(max(rows // 20, 1))], batch_size=BATCH_SIZE
+        )
+        spotlight, _ = SpotlightCategory.objects.get_or_create(name='clubs', defaults={'title': 'Benchmark'})
+
+        Opportunity.objects.bulk_create(
+            [
+                # A mix of open, closed and open-ended opportunities, as the board's open_first ordering sees
+                Opportunity(title=f'Opportunity {i}', description='-', is_published=i % 10 != 0,
+                            deadline=None if i % 7 == 0 else today + datetime.timedelta(days=i % 60 - 30))
+                for i in range(rows)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Article.objects.bulk_create(
+            [
+                Article(title=f'Article {i}', author=users[i % side], content='-',
+                        date=today - datetime.timedelta(days=i % 3650), is_published=i % 10 != 0)
+                for i in range(rows)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Impact.objects.bulk_create(
+            [Impact(title=f'Impact {i}', description='-', order=i % 50, is_active=i % 10 != 0) for i in range(rows)],
+            batch_size=BATCH_SIZE,
+        )
+        ImpactCounter.objects.bulk_create(
+            [ImpactCounter(title=f'Counter {i}', target_number=i, order=i % 50, is_active=i % 10 != 0) for i in range(rows)],
+            batch_size=BATCH_SIZE,
+        )
+        SpotlightStats.objects.bulk_create(
+            [SpotlightStats(title=f'Stat {i}', value='1', description='-', order=i % 50, is_active=i % 10 != 0)
+             for i in range(rows)],
+            batch_size=BATCH_SIZE,
+        )
+        SpotlightItem.objects.bulk_create(
+            [
+                SpotlightItem(category=spotlight, title=f'Item {i}', description='-', order=i % 50,
+                              achievement_score=i % 100, is_active=i % 10 != 0)
+                for i in range(rows)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Club.objects.bulk_create(
+            [Club(school=schools[i % len(schools)], title=f'Club {i}') for i in range(rows)], batch_size=BATCH_SIZE
+        )
+        ProjectMembershipRequest.objects.bulk_create(
+            [
+                ProjectMembershipRequest(project=projects[i // side], user=users[i % side],
+                                         status='pending' if i % 3 == 0 else 'approved')
+                for i in range(min(rows, side * side))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return {'school': schools[0], 'spotlight': spotlight, 'today': today}
+
+    def queries(self, fixtures):
+        """The query shapes used by the public views, keyed by a short label."""
+        return {
+            'Opportunities listing': Opportunity.objects.published().open_first(fixtures['today'])[:10],
+            'Open opportunities': Opportunity.objects.published().open(fixtures['today']).open_first(fixtures['today'])[:10],
+            'Articles listing': Article.objects.filter(is_published=True).order_by('-date', '-created_at')[:20],
+            'Impact sections': Impact.objects.filter(is_active=True).order_by('order', 'title'),
+            'Impact counters': ImpactCounter.objects.filter(is_active=True).order_by('order', 'title'),
+            'Spotlight stats': SpotlightStats.objects.filter(is_active=True).order_by('order', 'title'),
+            'Spotlight items': SpotlightItem.objects.filter(
+                category=fixtures['spotlight'], is_active=True
+            ).order_by('order', '-achievement_score'),
+            'School clubs': Club.objects.filter(school=fixtures['school']).order_by('title'),
+            'Pending membership requests': ProjectMembershipRequest.objects.filter(status='pending').order_by('-requested_at')[:100],
+        }
+
+    def explain(self, heading, fixtures):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {heading} =='))
+        for label, queryset in self.queries(fixtures).items():
+            self.stdout.write(self.style.MIGRATE_LABEL(f'\n{label}'))
+            self.stdout.write(queryset.explain())
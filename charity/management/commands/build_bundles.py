@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, reverse
+
+from charity import bundles, page_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Concatenate and minify the CSS/JS bundles into content-hashed files; with --critical, '
+        'render the main pages and extract their above-the-fold CSS instead'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--critical', action='store_true',
+            help='Extract critical CSS from the built bundles (run after collectstatic; needs the database)',
+        )
+
+    def handle(self, *args, **options):
+        if options['critical']:
+            self.build_critical()
+            return
+        built = {name: bundles.build_bundle(name) for name in bundles.BUNDLES}
+        removed = bundles.remove_stale(built.values())
+        bundles.write_manifest(built, critical=[])
+        self.purge_pages()
+        for name, path in built.items():
+            self.stdout.write(f'  {name} -> {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {len(built)} bundles (removed {removed} stale files). '
+            f'Run `build_bundles --critical` after collectstatic to restore inlined critical CSS.'
+        ))
+
+    def build_critical(self):
+        built = bundles.manifest()['bundles']
+        if not built:
+            raise CommandError('No bundles built yet; run build_bundles first.')
+        host = next((host for host in settings.ALLOWED_HOSTS if not host.startswith('.') and host != '*'), 'localhost')
+        client = Client(HTTP_HOST=host)
+        # A session cookie keeps the anonymous page cache from answering with HTML from before this build
+        client.cookies[settings.SESSION_COOKIE_NAME] = 'build-critical-css'
+        critical = []
+        # Render with bundles on, whatever DEBUG says, so the pages link them
+        with override_settings(BUNDLES_ENABLED=True):
+            for url_name in bundles.CRITICAL_PAGES:
+                try:
+                    url = reverse(f'charity:{url_name}')
+                except NoReverseMatch:
+                    continue
+                response = client.get(url, secure=True)
+                if response.status_code != 200:
+                    self.stderr.write(f'  {url}: HTTP {response.status_code}, skipped')
+                    continue
+                if bundles.build_critical(url_name, response.content.decode('utf-8'), built):
+                    critical.append(url_name)
+                    size = (bundles.bundle_root() / bundles.CRITICAL_DIR / f'{url_name}.css').stat().st_size
+                    self.stdout.write(f'  {url_name}: {size / 1024:.1f} KB')
+        bundles.write_manifest(built, critical=critical)
+        self.purge_pages()
+        self.stdout.write(self.style.SUCCESS(f'Wrote critical CSS for {len(critical)} pages.'))
+
+    def purge_pages(self):
+        # Cached pages still link the previous bundles and critical CSS
+        for group in page_cache.PAGE_CACHE_GROUPS:
+            page_cache.purge_group(group)
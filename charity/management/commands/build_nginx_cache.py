@@ -0,0 +1,111 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from charity import cache_policy
+
+HEADER = (
+    '# Generated by `manage.py build_nginx_cache` from charity.cache_policy.CACHE_POLICIES;\n'
+    '# re-run it rather than editing this file.\n'
+)
+HTTP_FRAGMENT = HEADER + """# Include at the top of ycbn.org.conf (http context).
+proxy_cache_path {cache_path} levels=1:2 keys_zone=ycbn_pages:{zone_size} max_size={max_size} inactive=60m use_temp_path=off;
+
+# Visitors with a session or flash-message cookie always reach Django
+map $http_cookie $ycbn_cache_skip {{
+    default 0;
+    "~(^|;\\s*)({cookies})=" 1;
+}}
+
+# Loopback-only refresh server: after a save Django fetches the changed pages
+# here, which replaces nginx's copy (NGINX_CACHE_REFRESH_URL=http://{listen})
+server {{
+    listen {listen};
+    location / {{
+        proxy_pass http://ycbn_app;
+        proxy_set_header Host              $host;
+        proxy_set_header X-Forwarded-Proto https;
+        proxy_cache ycbn_pages;
+        proxy_cache_key $host$request_uri;
+        proxy_cache_bypass 1;
+        proxy_ignore_headers Vary;
+    }}
+}}
+"""
+SERVER_FRAGMENT = HEADER + """# Include inside the HTTPS server block of ycbn.org.conf. Django decides what is
+# cacheable (Cache-Control / X-Accel-Expires); these locations only switch the cache on.
+proxy_cache_key $host$request_uri;
+proxy_cache_bypass $ycbn_cache_skip;
+proxy_no_cache $ycbn_cache_skip;
+# Django adds Vary: Cookie; visitors with cookies that matter skip the cache anyway
+proxy_ignore_headers Vary;
+proxy_cache_lock on;
+proxy_cache_revalidate on;
+proxy_cache_background_update on;
+proxy_cache_use_stale updating error timeout http_500 http_502 http_503 http_504;
+add_header X-Cache-Status $upstream_cache_status always;
+{locations}"""
+LOCATION = """
+# {name}: {summary}
+location {match} {{
+    proxy_pass http://ycbn_app;
+    proxy_set_header Host              $host;
+    proxy_set_header X-Real-IP         $remote_addr;
+    proxy_set_header X-Forwarded-For   $proxy_add_x_forwarded_for;
+    proxy_set_header X-Forwarded-Proto $scheme;
+    proxy_redirect off;
+    proxy_cache ycbn_pages;{key}
+}}
+"""
+
+
+def _summary(policy: dict) -> str:
+    return (
+        f'browsers {policy["max_age"]}s, nginx {policy["shared_max_age"]}s, '
+        f'stale while revalidating {policy["stale_while_revalidate"]}s'
+    )
+
+
+class Command(BaseCommand):
+    help = 'Write the nginx proxy_cache config (micro-cache and refresh server) for the views in CACHE_POLICIES'
+
+    def add_arguments(self, parser):
+        nginx_dir = Path(settings.BASE_DIR) / 'deploy' / 'nginx'
+        parser.add_argument(
+            '--http-conf', default=str(nginx_dir / 'ycbn-cache-http.conf'),
+            help='Where to write the http-context fragment (cache zone, cookie map, refresh server)',
+        )
+        parser.add_argument(
+            '--server-conf', default=str(nginx_dir / 'ycbn-cache.conf'),
+            help='Where to write the server-context fragment (cached locations)',
+        )
+        parser.add_argument('--cache-path', default='/var/cache/nginx/ycbn', help='proxy_cache_path directory')
+        parser.add_argument('--max-size', default='512m', help='Disk the cache may use')
+
+    def handle(self, *args, **options):
+        locations = []
+        for name, match in cache_policy.url_patterns():
+            policy = cache_policy.CACHE_POLICIES[name]
+            # Pages that depend on request headers keep one copy per header value
+            key = ''.join(
+                f'$http_{header.lower().replace("-", "_")}'
+                for header in policy['vary'] if header.lower() not in ('cookie', 'accept-encoding')
+            )
+            locations.append(LOCATION.format(
+                name=name, summary=_summary(policy), match=match,
+                key=f'\n    proxy_cache_key $host$request_uri{key};' if key else '',
+            ))
+
+        http_fragment = HTTP_FRAGMENT.format(
+            cache_path=options['cache_path'],
+            zone_size='10m',
+            max_size=options['max_size'],
+            cookies='|'.join((settings.SESSION_COOKIE_NAME, 'messages')),
+            listen=cache_policy.refresh_listen_address(),
+        )
+        Path(options['http_conf']).write_text(http_fragment, encoding='utf-8')
+        Path(options['server_conf']).write_text(SERVER_FRAGMENT.format(locations=''.join(locations)), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {options["http_conf"]} and {options["server_conf"]} ({len(locations)} cached locations).'
+        ))
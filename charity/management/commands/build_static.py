@@ -0,0 +1,75 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from charity import icons, static_assets, storage
+
+NGINX_FRAGMENT = """# Generated by `manage.py build_static`; re-run it rather than editing this file.
+# Include inside the HTTPS server block of ycbn.org.conf, which defines the
+# $webp_suffix and $static_cache_control maps used below.
+location {static_url} {{
+    alias {static_root}/;
+    access_log off;
+    gzip_static on;
+{brotli}    add_header Cache-Control $static_cache_control;
+    add_header Vary "Accept-Encoding, Accept";
+    try_files $uri$webp_suffix $uri =404;
+}}
+
+# Font Awesome subset written by `manage.py subset_icons` (content-hashed names)
+location {icons_url} {{
+    alias {icons_root}/;
+    access_log off;
+    add_header Cache-Control $static_cache_control;
+}}
+"""
+BROTLI_LINE = '    brotli_static on;  # needs the ngx_brotli module\n'
+
+
+def _url_path(url: str) -> str:
+    return url if url.startswith('/') else f'/{url}'
+
+
+class Command(BaseCommand):
+    help = 'Collect, fingerprint and precompress static files, then write the nginx locations that serve them and the icon subset'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--nginx-conf', default=str(Path(settings.BASE_DIR) / 'deploy' / 'nginx' / 'ycbn-static.conf'),
+            help='Where to write the nginx location fragments',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        call_command('collectstatic', interactive=False, verbosity=options['verbosity'])
+        compressed = getattr(staticfiles_storage, 'compressed_count', 0)
+        webp = getattr(staticfiles_storage, 'webp_count', 0)
+        self.stdout.write(
+            f'Collected in {time.monotonic() - started:.1f}s; wrote {compressed} compressed siblings; '
+            f'{webp} images have a .webp sibling.'
+        )
+        self.check_template_references()
+
+        fragment = NGINX_FRAGMENT.format(
+            static_url=_url_path(settings.STATIC_URL),
+            static_root=Path(settings.STATIC_ROOT).resolve(),
+            brotli=BROTLI_LINE if storage.brotli is not None else '',
+            icons_url=f'{_url_path(settings.MEDIA_URL)}{icons.ICONS_DIR}/',
+            icons_root=Path(settings.MEDIA_ROOT).resolve() / icons.ICONS_DIR,
+        )
+        Path(options['nginx_conf']).write_text(fragment, encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {options["nginx_conf"]}.'))
+
+    def check_template_references(self):
+        # The manifest storage raises for these when a page renders; fail the deploy instead
+        missing = {
+            path: templates for path, templates in static_assets.template_references().items()
+            if not staticfiles_storage.exists(path)
+        }
+        if missing:
+            lines = [f'  {path} (in {", ".join(sorted(t.name for t in templates))})' for path, templates in sorted(missing.items())]
+            raise CommandError('Templates reference static files that were not collected:\n' + '\n'.join(lines))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from charity.models import Article, Donation, Resource, SpotlightItem
+from charity.signals import refresh_bulk_changes
+
+# Models whose save() stores values derived from other columns (see their fill_derived())
+DERIVED_MODELS = (Article, Resource, Donation, SpotlightItem)
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Recompute the columns models derive on save (file sizes, progress, author names, ...)'
+
+    def handle(self, *args, **options):
+        for model in DERIVED_MODELS:
+            sources = [model._meta.get_field(name) for name in model.DERIVED_FROM if not name.endswith('_id')]
+            queryset = (
+                model.objects.order_by('pk')
+                .select_related(*(field.name for field in sources if field.is_relation))
+                .only('pk', *(field.name for field in sources))
+            )
+            batch, total = [], 0
+            for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+                obj.fill_derived()
+                batch.append(obj)
+                if len(batch) == BATCH_SIZE:
+                    total += model.objects.bulk_update(batch, model.DERIVED_FIELDS)
+                    batch = []
+            total += model.objects.bulk_update(batch, model.DERIVED_FIELDS) if batch else 0
+            refresh_bulk_changes(model)
+            self.stdout.write(f'  {model.__name__}: {total} rows')
+        self.stdout.write(self.style.SUCCESS('Filled derived fields.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from charity import images
+
+
+class Command(BaseCommand):
+    help = 'Cap uploaded images and write their AVIF/WebP variants (only images without a current manifest, unless --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        for model, field_names in images.IMAGE_FIELDS.items():
+            for obj in model.objects.only('pk', *field_names).iterator():
+                for field_name in field_names:
+                    file = getattr(obj, field_name)
+                    if not file or not file.name:
+                        continue
+                    if not options['force'] and images.manifest(file.name).get('version') == images.MANIFEST_VERSION:
+                        continue
+                    try:
+                        images.generate(file.name)
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'{file.name}: {exc}')
+                    else:
+                        done += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated variants for {done} images ({failed} failed).')
+        )
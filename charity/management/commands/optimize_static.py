@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from charity import static_assets
+
+
+def _megabytes(size: int) -> str:
+    return f'{size / 1024 / 1024:.1f} MB'
+
+
+class Command(BaseCommand):
+    help = (
+        'Report static files no template, CSS or JS references; optionally record them so collectstatic '
+        'skips them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--write-prune-list', action='store_true',
+            help='Save the unreferenced paths to STATIC_PRUNE_LIST so collectstatic leaves them out',
+        )
+
+    def handle(self, *args, **options):
+        files = static_assets.source_files()
+        referenced = static_assets.referenced_files(files)
+        unreferenced = sorted(set(files) - referenced)
+        unreferenced_bytes = sum(files[path].stat().st_size for path in unreferenced)
+        total_bytes = sum(path.stat().st_size for path in files.values())
+        if options['verbosity'] > 1:
+            for path in unreferenced:
+                self.stdout.write(f'  unreferenced: {path}')
+        self.stdout.write(
+            f'{len(referenced)} of {len(files)} static files are referenced; '
+            f'{len(unreferenced)} unreferenced files hold {_megabytes(unreferenced_bytes)} of {_megabytes(total_bytes)}.'
+        )
+
+        if options['write_prune_list']:
+            path = static_assets.prune_list_path()
+            path.write_text(''.join(f'{name}\n' for name in unreferenced), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path}; collectstatic will skip those files.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from charity import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the site search index from projects, programs, clubs, schools, opportunities and articles'
+
+    def handle(self, *args, **options):
+        total = search_index.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {total} documents.')
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from charity.models import Project, School
+from charity.signals import refresh_bulk_changes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored member and club counters on projects and schools'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            projects = Project.objects.recount()
+            schools = School.objects.recount()
+        # Cached listings and the home page still show the old numbers
+        refresh_bulk_changes(Project)
+        refresh_bulk_changes(School)
+        self.stdout.write(self.style.SUCCESS(f'Recounted {projects} projects and {schools} schools.'))
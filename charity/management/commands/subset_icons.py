@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from charity import icons
+
+
+class Command(BaseCommand):
+    help = 'Subset the Font Awesome fonts and CSS to the icons used by the templates, bundled JS and icon fields'
+
+    def handle(self, *args, **options):
+        if icons.subset is None:
+            raise CommandError('fonttools is not installed (pip install fonttools brotli)')
+        data = icons.build()
+        self.stdout.write(f'  {data["css"]}: {len(data["icons"])} icon classes, {data["glyphs"]} glyphs')
+        if options['verbosity'] > 1:
+            self.stdout.write('  ' + ' '.join(data['icons']))
+        self.stdout.write(self.style.SUCCESS('Built the icon subset.'))
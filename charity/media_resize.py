@@ -0,0 +1,119 @@
+"""On-demand resizing of files already in ``MEDIA_ROOT``.
+
+``/media-resize/<w>x<h>/<path>?s=<signature>`` fits the image inside
+``w`` x ``h`` (``0`` leaves that side unbounded, and images are never
+upscaled). ``{% responsive_image %}`` points its ``srcset`` here for uploads
+that have no variants yet. Only URLs built by ``resize_url()`` (that tag,
+or the ``|resized`` filter) carry a valid signature, so outsiders can't
+make the server encode arbitrary sizes.
+
+The first request encodes the image into ``MEDIA_RESIZE_ROOT`` under a
+name hashed from the source's path, size and mtime plus the requested box
+and format. A replaced source therefore gets a fresh entry rather than a
+stale one. Every later request is a ``stat`` and a hash. The file is then
+handed to nginx with ``X-Accel-Redirect`` when ``MEDIA_RESIZE_ACCEL_PREFIX``
+is set (see ``deploy/nginx``), or streamed by Django otherwise.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+
+SIGNING_SALT = 'charity.media_resize'
+# Output format -> (Pillow format, MIME type, save options)
+OUTPUT_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 75, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', 'image/png', {'optimize': True}),
+}
+
+
+class InvalidResize(Exception):
+    """The request's size, path or signature is not acceptable."""
+
+
+def max_dimension() -> int:
+    return getattr(settings, 'MEDIA_RESIZE_MAX_DIMENSION', 2000)
+
+
+def cache_root() -> Path:
+    return Path(getattr(settings, 'MEDIA_RESIZE_ROOT', Path(settings.MEDIA_ROOT).parent / 'media_resize'))
+
+
+def accel_prefix() -> str:
+    return getattr(settings, 'MEDIA_RESIZE_ACCEL_PREFIX', '')
+
+
+def signature(width: int, height: int, path: str) -> str:
+    return signing.Signer(salt=SIGNING_SALT).signature(f'{width}x{height}/{path}')
+
+
+def resize_url(path: str, width: int, height: int = 0) -> str:
+    """Return the signed resize URL for the media file at ``path`` (relative to ``MEDIA_ROOT``)."""
+    url = reverse('charity:media_resize', kwargs={'width': width, 'height': height, 'path': path})
+    return f'{url}?s={quote(signature(width, height, path))}'
+
+
+def source_file(width: int, height: int, path: str, supplied_signature: str) -> Path:
+    """Validate a request and return the absolute path of its source image."""
+    if not constant_time_compare(supplied_signature, signature(width, height, path)):
+        raise InvalidResize('Bad signature')
+    if not (width or height) or max(width, height) > max_dimension():
+        raise InvalidResize('Unsupported size')
+    media_root = Path(settings.MEDIA_ROOT).resolve()
+    source = (media_root / posixpath.normpath(path)).resolve()
+    if media_root not in source.parents or not source.is_file():
+        raise InvalidResize('No such image')
+    return source
+
+
+def output_format(source: Path, accept: str) -> str:
+    if 'image/webp' in accept:
+        return 'webp'
+    return 'png' if source.suffix.lower() in ('.png', '.gif') else 'jpg'
+
+
+def cached_name(source: Path, width: int, height: int, fmt: str) -> str:
+    """Cache-relative name such as ``ab/abcdef….webp`` for this source version and box."""
+    stat = source.stat()
+    digest = hashlib.sha256(
+        f'{source}:{stat.st_size}:{stat.st_mtime_ns}:{width}x{height}'.encode('utf-8')
+    ).hexdigest()
+    return f'{digest[:2]}/{digest}.{fmt}'
+
+
+def ensure_resized(source: Path, width: int, height: int, fmt: str) -> str:
+    """Encode ``source`` into the disk cache unless it is already there; return the cached name."""
+    name = cached_name(source, width, height, fmt)
+    target = cache_root() / name
+    if target.exists():
+        return name
+
+    from PIL import Image, ImageOps
+
+    pillow_format, _, options = OUTPUT_FORMATS[fmt]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((width or image.width, height or image.height), Image.Resampling.LANCZOS)
+        if pillow_format == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = image.convert('RGBA')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so concurrent requests never serve a half-written file
+        fd, temporary = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                image.save(fh, format=pillow_format, **options)
+            os.replace(temporary, target)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    return name
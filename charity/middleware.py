@@ -0,0 +1,109 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.urls import Resolver404, resolve
+
+from . import cache_policy, page_cache
+
+_CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+class CachePolicyMiddleware:
+    """Add the ``charity.cache_policy`` caching headers for the view that answered.
+
+    Must sit above the session, CSRF and message middleware so it sees the
+    cookies they set. Views that set ``Cache-Control`` themselves are left alone.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD') or response.status_code not in (200, 304):
+            return response
+        if response.has_header('Cache-Control'):
+            return response
+        policy = cache_policy.policy_for(self._url_name(request))
+        if policy is not None:
+            cache_policy.apply(policy, request, response)
+        return response
+
+    def _url_name(self, request):
+        # Pages served by AnonymousPageCacheMiddleware never reached URL resolution
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return None
+        return match.url_name if match.namespace == 'charity' else None
+
+
+class AnonymousPageCacheMiddleware:
+    """Serve public pages to anonymous visitors from the page cache.
+
+    Requests carrying a session or flash-message cookie always go to the
+    view. Must sit below ``CsrfViewMiddleware`` so the CSRF cookie is set
+    for tokens substituted into cached pages.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        group = self._cache_group(request)
+        if group is None:
+            return self.get_response(request)
+
+        key = page_cache.page_key(request, group)
+        cached = cache.get(key)
+        if cached is not None:
+            return self._from_cache(request, cached)
+
+        response = self.get_response(request)
+        if request.method == 'GET' and self._is_cacheable(response):
+            cache.set(key, self._to_cache(response), page_cache.page_cache_timeout())
+        response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def _cache_group(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        cookies = request.COOKIES
+        if settings.SESSION_COOKIE_NAME in cookies or 'messages' in cookies:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.namespace != 'charity' or match.url_name not in page_cache.PAGE_CACHE_GROUPS:
+            return None
+        return match.url_name
+
+    def _is_cacheable(self, response) -> bool:
+        if response.status_code != 200 or response.streaming:
+            return False
+        # A view that started a session or set its own cookies is not anonymous output
+        return all(name == settings.CSRF_COOKIE_NAME for name in response.cookies)
+
+    def _to_cache(self, response) -> dict:
+        content = _CSRF_INPUT_RE.sub(
+            rf'\g<1>{page_cache.CSRF_PLACEHOLDER}\g<2>',
+            response.content.decode(response.charset),
+        )
+        return {
+            'content': content,
+            'content_type': response['Content-Type'],
+        }
+
+    def _from_cache(self, request, cached: dict) -> HttpResponse:
+        content = cached['content']
+        if page_cache.CSRF_PLACEHOLDER in content:
+            content = content.replace(page_cache.CSRF_PLACEHOLDER, get_token(request))
+        response = HttpResponse(content, content_type=cached['content_type'])
+        response['X-Page-Cache'] = 'HIT'
+        return response
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:45
+
+import charity.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0020_opportunityapplication'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('is_published', True)), fields=['-date', '-created_at'], name='article_published_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['school', 'title'], name='club_school_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='impact',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('is_active', True)), fields=['order', 'title'], name='impact_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='impactcounter',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('is_active', True)), fields=['order', 'title'], name='impactcounter_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('is_published', True)), fields=['-posted_at'], name='opp_published_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmembershiprequest',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('status', 'pending')), fields=['project', 'user', 'status'], name='memberreq_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spotlightitem',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('is_active', True)), fields=['category', 'order', '-achievement_score'], name='spotitem_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spotlightstats',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('is_active', True)), fields=['order', 'title'], name='spotstats_active_order_idx'),
+        ),
+    ]
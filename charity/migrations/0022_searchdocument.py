@@ -0,0 +1,100 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:46
+
+from django.db import migrations, models
+
+from charity import search_index
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE charity_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX charity_searchdocument_vector_idx ON charity_searchdocument USING gin (search_vector)',
+]
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS charity_searchdocument_vector_idx',
+    'ALTER TABLE charity_searchdocument DROP COLUMN IF EXISTS search_vector',
+]
+
+# External-content FTS5 table; the triggers keep it in step with the base table
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE charity_searchdocument_fts USING fts5(
+        title, body, content='charity_searchdocument', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER charity_searchdocument_fts_ai AFTER INSERT ON charity_searchdocument BEGIN
+        INSERT INTO charity_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER charity_searchdocument_fts_ad AFTER DELETE ON charity_searchdocument BEGIN
+        INSERT INTO charity_searchdocument_fts(charity_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER charity_searchdocument_fts_au AFTER UPDATE ON charity_searchdocument BEGIN
+        INSERT INTO charity_searchdocument_fts(charity_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO charity_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS charity_searchdocument_fts_ai',
+    'DROP TRIGGER IF EXISTS charity_searchdocument_fts_ad',
+    'DROP TRIGGER IF EXISTS charity_searchdocument_fts_au',
+    'DROP TABLE IF EXISTS charity_searchdocument_fts',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE})
+
+
+def fill_index(apps, schema_editor):
+    search_index.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0021_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=250)),
+                ('body', models.TextField(blank=True)),
+                ('url', models.CharField(max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(fill_index, migrations.RunPython.noop),
+    ]
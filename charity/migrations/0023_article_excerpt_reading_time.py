@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+from charity import text
+
+
+def fill_excerpts(apps, schema_editor):
+    Article = apps.get_model('charity', 'Article')
+    articles = []
+    for article in Article.objects.only('id', 'content').iterator(chunk_size=500):
+        article.excerpt = text.excerpt(article.content)
+        article.reading_time = text.reading_minutes(article.content)
+        articles.append(article)
+    Article.objects.bulk_update(articles, ['excerpt', 'reading_time'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0022_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=250),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, help_text='Estimated minutes to read'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Project = apps.get_model('charity', 'Project')
+    ProjectMembership = apps.get_model('charity', 'ProjectMembership')
+    School = apps.get_model('charity', 'School')
+    Club = apps.get_model('charity', 'Club')
+    members = ProjectMembership.objects.filter(project=OuterRef('pk')).order_by().values('project')
+    Project.objects.update(members_count=Coalesce(Subquery(members.annotate(n=Count('pk')).values('n')), 0))
+    clubs = Club.objects.filter(school=OuterRef('pk')).order_by().values('school')
+    School.objects.update(
+        clubs_count=Coalesce(Subquery(clubs.annotate(n=Count('pk')).values('n')), 0),
+        club_members_count=Coalesce(Subquery(clubs.annotate(n=Sum('member_count')).values('n')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0023_article_excerpt_reading_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='club_members_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Members across this school's clubs"),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='clubs_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of clubs at this school'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-members_count', 'title'], name='project_members_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['-clubs_count', 'name'], name='school_clubs_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='school',
+            index=models.Index(fields=['-club_members_count', 'name'], name='school_club_members_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+from charity import derived
+
+# model name -> (source fields to load, fill function, derived fields)
+DERIVED = (
+    ('Article', ('content', 'author'), derived.fill_article, ('excerpt', 'reading_time', 'author_name')),
+    ('Resource', ('file',), derived.fill_resource, ('file_size', 'file_type')),
+    ('Donation', ('goal_amount', 'raised_amount'), derived.fill_donation, ('progress_percent',)),
+    ('SpotlightItem', ('key_achievements',), derived.fill_spotlight_item, ('achievements_list',)),
+)
+
+
+def fill_derived(apps, schema_editor):
+    for model_name, sources, fill, fields in DERIVED:
+        model = apps.get_model('charity', model_name)
+        queryset = model.objects.only('id', *sources)
+        if 'author' in sources:
+            queryset = queryset.select_related('author')
+        rows = []
+        for row in queryset.iterator(chunk_size=500):
+            fill(row)
+            rows.append(row)
+        model.objects.bulk_update(rows, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0024_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='author_name',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='progress_percent',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='file_size',
+            field=models.CharField(default='N/A', editable=False, help_text='Human-readable file size', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='file_type',
+            field=models.CharField(default='FILE', editable=False, help_text='File extension', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='spotlightitem',
+            name='achievements_list',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(fill_derived, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created(apps, schema_editor):
+    apps.get_model('charity', 'Category').objects.update(updated_at=F('created_at'))
+    apps.get_model('charity', 'ProjectPhoto').objects.update(updated_at=F('uploaded_at'))
+    apps.get_model('charity', 'ProjectAchievement').objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0025_derived_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectphoto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectachievement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:40
+
+import charity.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0026_related_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='projectmembershiprequest',
+            name='memberreq_pending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='projectmembershiprequest',
+            index=charity.indexes.PostgresPartialIndex(condition=models.Q(('status', 'pending')), fields=['-requested_at'], name='memberreq_pending_recent_idx'),
+        ),
+    ]
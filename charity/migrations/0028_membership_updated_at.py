@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:55
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_joined(apps, schema_editor):
+    apps.get_model('charity', 'ProjectMembership').objects.update(updated_at=F('joined_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charity', '0027_membership_request_pending_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectmembership',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_joined, migrations.RunPython.noop),
+    ]
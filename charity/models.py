@@ -1,6 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.functional import cached_property
+
+from . import derived
+from .indexes import PostgresPartialIndex
 
 # 11. Programs
 class Program(models.Model):
@@ -17,7 +23,34 @@ class Program(models.Model):
     def __str__(self) -> str:
         return self.title
 
+def _derive_on_save(instance, kwargs) -> None:
+    """Refresh ``instance``'s derived columns before a save()."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None:
+        instance.fill_derived()
+    elif set(instance.DERIVED_FROM) & set(update_fields):
+        instance.fill_derived()
+        kwargs['update_fields'] = {*update_fields, *instance.DERIVED_FIELDS}
+
+
 # 12. Partner Schools
+class SchoolQuerySet(models.QuerySet):
+    def add_clubs(self, clubs: int, members: int) -> int:
+        """Shift ``clubs_count``/``club_members_count`` by the given amounts in one UPDATE."""
+        return self.update(
+            clubs_count=Greatest(F('clubs_count') + clubs, 0),
+            club_members_count=Greatest(F('club_members_count') + members, 0),
+        )
+
+    def recount(self) -> int:
+        """Rebuild both club counters from the clubs table in one UPDATE."""
+        clubs = Club.objects.filter(school=models.OuterRef('pk')).order_by().values('school')
+        return self.update(
+            clubs_count=Coalesce(models.Subquery(clubs.annotate(n=models.Count('pk')).values('n')), 0),
+            club_members_count=Coalesce(models.Subquery(clubs.annotate(n=models.Sum('member_count')).values('n')), 0),
+        )
+
+
 class School(models.Model):
     name = models.CharField(max_length=200, help_text="School name")
     location = models.CharField(max_length=300, blank=True, null=True, help_text="School location/address")
@@ -31,21 +64,25 @@ class School(models.Model):
     website = models.CharField(max_length=200, blank=True, help_text="School website (e.g., www.school.com or https://school.com)")
     student_population = models.PositiveIntegerField(blank=True, null=True, help_text="Approximate number of students")
     is_active = models.BooleanField(default=True, help_text="Is this partnership currently active")
+    # Kept in step by Club.save() and the Club post_delete signal; `manage.py recount` rebuilds them
+    clubs_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of clubs at this school")
+    club_members_count = models.PositiveIntegerField(default=0, editable=False, help_text="Members across this school's clubs")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SchoolQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-clubs_count', 'name'], name='school_clubs_count_idx'),
+            models.Index(fields=['-club_members_count', 'name'], name='school_club_members_idx'),
+        ]
         verbose_name_plural = 'Partner Schools'
 
     def __str__(self) -> str:
         return self.name
     
-    @property
-    def clubs_count(self) -> int:
-        """Return count of clubs at this school"""
-        return self.clubs.count()
-    
     @property
     def comment(self):
         """Backward compatibility with old field name"""
@@ -55,6 +92,7 @@ class School(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=150, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -64,24 +102,41 @@ class Category(models.Model):
         return self.name
 
 
+class ProjectQuerySet(models.QuerySet):
+    def add_members(self, members: int) -> int:
+        """Shift ``members_count`` by ``members`` in one UPDATE."""
+        return self.update(members_count=Greatest(F('members_count') + members, 0))
+
+    def recount(self) -> int:
+        """Rebuild ``members_count`` from the memberships table in one UPDATE."""
+        members = (
+            ProjectMembership.objects.filter(project=models.OuterRef('pk')).order_by()
+            .values('project').annotate(n=models.Count('pk')).values('n')
+        )
+        return self.update(members_count=Coalesce(models.Subquery(members), 0))
+
+
 class Project(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="projects")
     image = models.ImageField(upload_to="projects/images/", blank=True, null=True)
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
+    # Kept in step by ProjectMembership.save() and its post_delete signal; `manage.py recount` rebuilds it
+    members_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=['-members_count', 'title'], name='project_members_count_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
-    @property
-    def members_count(self) -> int:
-        return getattr(self, 'memberships', None).count() if hasattr(self, 'memberships') else 0
-
 
 class ProjectDetails(models.Model):
     project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name="details")
@@ -123,6 +178,10 @@ class ProjectMembershipRequest(models.Model):
     class Meta:
         ordering = ['-requested_at']
         unique_together = ['project', 'user']
+        indexes = [
+            # The pending queue, newest first; (project, user) lookups use the unique_together index
+            PostgresPartialIndex(fields=['-requested_at'], condition=Q(status='pending'), name='memberreq_pending_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.project.title} ({self.get_status_display()})"
@@ -166,6 +225,8 @@ class ProjectMembership(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="project_memberships")
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default="student")
     joined_at = models.DateTimeField(auto_now_add=True)
+    # Also touched when the member renames (see charity.signals), for the project page's ETag
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("project", "user")
@@ -176,6 +237,22 @@ class ProjectMembership(models.Model):
     def __str__(self) -> str:
         return f"{self.user} -> {self.project} ({self.role})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'project' not in update_fields and 'project_id' not in update_fields:
+            super().save(*args, **kwargs)
+            return
+        # Counter updates commit or roll back with the membership row
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = ProjectMembership.objects.filter(pk=self.pk).values_list('project_id', flat=True).first()
+            super().save(*args, **kwargs)
+            if previous != self.project_id:
+                if previous is not None:
+                    Project.objects.filter(pk=previous).add_members(-1)
+                Project.objects.filter(pk=self.project_id).add_members(1)
+
 
 # Project images gallery
 class ProjectPhoto(models.Model):
@@ -183,6 +260,7 @@ class ProjectPhoto(models.Model):
     image = models.ImageField(upload_to="projects/photos/")
     caption = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-uploaded_at"]
@@ -199,6 +277,7 @@ class ProjectAchievement(models.Model):
     achieved_on = models.DateField(blank=True, null=True)
     value = models.CharField(max_length=100, blank=True, help_text="Number/metric e.g., 50 kits, 200 students, 80% pass rate")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-achieved_on", "-created_at", "title"]
@@ -224,11 +303,33 @@ class Club(models.Model):
 
     class Meta:
         ordering = ["school__name", "title"]
+        indexes = [
+            models.Index(fields=['school', 'title'], name='club_school_title_idx'),
+        ]
 
     def __str__(self) -> str:
         if self.school:
             return f"{self.title} ({self.school.name})"
         return self.title
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'school', 'school_id', 'member_count'} & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+        # Counter updates commit or roll back with the club row
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Club.objects.filter(pk=self.pk).values('school_id', 'member_count').first()
+            super().save(*args, **kwargs)
+            if previous is None:
+                School.objects.filter(pk=self.school_id).add_clubs(1, self.member_count)
+            elif previous['school_id'] != self.school_id:
+                School.objects.filter(pk=previous['school_id']).add_clubs(-1, -previous['member_count'])
+                School.objects.filter(pk=self.school_id).add_clubs(1, self.member_count)
+            elif previous['member_count'] != self.member_count:
+                School.objects.filter(pk=self.school_id).add_clubs(0, self.member_count - previous['member_count'])
     
     @property
     def comment(self):
@@ -237,6 +338,31 @@ class Club(models.Model):
 
 
 # 3. Opportunities (Admin only)
+def open_on(day=None) -> Q:
+    """Opportunities still taking applications on ``day`` (default today): no deadline, or not yet passed."""
+    return Q(deadline__isnull=True) | Q(deadline__gte=day or timezone.localdate())
+
+
+class OpportunityQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_published=True)
+
+    def open(self, day=None):
+        return self.filter(open_on(day))
+
+    def closed(self, day=None):
+        return self.exclude(open_on(day))
+
+    def with_open_flag(self, day=None):
+        """Annotate ``open_now`` so ``Opportunity.is_open`` is decided in SQL."""
+        return self.annotate(
+            open_now=models.Case(models.When(open_on(day), then=True), default=False, output_field=models.BooleanField())
+        )
+
+    def open_first(self, day=None):
+        return self.with_open_flag(day).order_by('-open_now', '-posted_at', '-id')
+
+
 class Opportunity(models.Model):
     class OpportunityType(models.TextChoices):
         JOB = 'job', 'Job'
@@ -259,8 +385,13 @@ class Opportunity(models.Model):
     posted_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OpportunityQuerySet.as_manager()
+
     class Meta:
         ordering = ["-posted_at", "title"]
+        indexes = [
+            PostgresPartialIndex(fields=['-posted_at'], condition=Q(is_published=True), name='opp_published_posted_idx'),
+        ]
         verbose_name = "Opportunity"
         verbose_name_plural = "Opportunities"
 
@@ -269,9 +400,11 @@ class Opportunity(models.Model):
 
     @property
     def is_open(self) -> bool:
+        if 'open_now' in self.__dict__:
+            return self.open_now
         if self.deadline:
             try:
-                return timezone.now().date() <= self.deadline
+                return timezone.localdate() <= self.deadline
             except Exception:
                 return True
         return True
@@ -284,22 +417,36 @@ class Article(models.Model):
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="articles")
     date = models.DateField(default=timezone.now)
     content = models.TextField(help_text="Article content")
+    # Derived from content on save so listings can defer the full text
+    excerpt = models.CharField(max_length=250, blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False, help_text="Estimated minutes to read")
+    # Copied from the author on save (and when they rename) so listings don't join the user table
+    author_name = models.CharField(max_length=255, blank=True, editable=False)
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            PostgresPartialIndex(fields=['-date', '-created_at'], condition=Q(is_published=True), name='article_published_date_idx'),
+        ]
         verbose_name = "Article (Member)"
         verbose_name_plural = "Articles (Members)"
 
     def __str__(self) -> str:
         return self.title
 
-    @property
-    def author_name(self) -> str:
-        """Return full name or username of the author"""
-        return self.author.get_full_name() or self.author.username
+    # Columns fill_derived() reads and writes; `manage.py fill_derived_fields` backfills them
+    DERIVED_FROM = ('content', 'author', 'author_id')
+    DERIVED_FIELDS = ('excerpt', 'reading_time', 'author_name')
+
+    def fill_derived(self) -> None:
+        derived.fill_article(self)
+
+    def save(self, *args, **kwargs):
+        _derive_on_save(self, kwargs)
+        super().save(*args, **kwargs)
 
     @property
     def details(self):
@@ -375,35 +522,27 @@ class Resource(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     file = models.FileField(upload_to="resources/files/")
+    # Derived from the file on save so listings don't ask the storage backend
+    file_size = models.CharField(max_length=20, default="N/A", editable=False, help_text="Human-readable file size")
+    file_type = models.CharField(max_length=10, default="FILE", editable=False, help_text="File extension")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Columns fill_derived() reads and writes; `manage.py fill_derived_fields` backfills them
+    DERIVED_FROM = ('file',)
+    DERIVED_FIELDS = ('file_size', 'file_type')
+
     class Meta:
         ordering = ["title"]
 
     def __str__(self) -> str:
         return self.title
-    
-    @property
-    def file_size(self):
-        """Return a human-readable file size"""
-        if self.file and hasattr(self.file, 'size') and self.file.size:
-            size_bytes = self.file.size
-            if size_bytes < 1024:
-                return f"{size_bytes} B"
-            elif size_bytes < 1024 * 1024:
-                return f"{size_bytes / 1024:.1f} KB"
-            else:
-                return f"{size_bytes / (1024 * 1024):.1f} MB"
-        return "N/A"
-    
-    @property
-    def file_type(self):
-        """Return the file extension/type"""
-        if self.file and self.file.name:
-            import os
-            _, ext = os.path.splitext(self.file.name)
-            return ext.lstrip('.').upper() if ext else "FILE"
-        return "FILE"
+
+    def fill_derived(self) -> None:
+        derived.fill_resource(self)
+
+    def save(self, *args, **kwargs):
+        _derive_on_save(self, kwargs)
+        super().save(*args, **kwargs)
 
 
 # 9. Donations (info/cards)
@@ -413,22 +552,26 @@ class Donation(models.Model):
     description = models.TextField(blank=True)
     goal_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     raised_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Derived from the amounts on save
+    progress_percent = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Columns fill_derived() reads and writes; `manage.py fill_derived_fields` backfills them
+    DERIVED_FROM = ('goal_amount', 'raised_amount')
+    DERIVED_FIELDS = ('progress_percent',)
+
     class Meta:
         ordering = ["title"]
 
     def __str__(self) -> str:
         return self.title
 
-    @property
-    def progress_percent(self) -> int:
-        if self.goal_amount and self.goal_amount > 0:
-            try:
-                return max(0, min(100, int((self.raised_amount / self.goal_amount) * 100)))
-            except Exception:
-                return 0
-        return 0
+    def fill_derived(self) -> None:
+        derived.fill_donation(self)
+
+    def save(self, *args, **kwargs):
+        _derive_on_save(self, kwargs)
+        super().save(*args, **kwargs)
 
 
 # 10. Contact Messages
@@ -471,6 +614,9 @@ class Impact(models.Model):
 
     class Meta:
         ordering = ['order', 'title']
+        indexes = [
+            PostgresPartialIndex(fields=['order', 'title'], condition=Q(is_active=True), name='impact_active_order_idx'),
+        ]
         verbose_name = 'Impact Section'
         verbose_name_plural = 'Impact Sections'
 
@@ -511,6 +657,9 @@ class ImpactCounter(models.Model):
 
     class Meta:
         ordering = ['order', 'title']
+        indexes = [
+            PostgresPartialIndex(fields=['order', 'title'], condition=Q(is_active=True), name='impactcounter_active_order_idx'),
+        ]
         verbose_name = 'Impact Counter'
         verbose_name_plural = 'Impact Counters'
 
@@ -580,6 +729,8 @@ class SpotlightItem(models.Model):
     performance_level = models.CharField(max_length=20, choices=PERFORMANCE_LEVELS, default='excellent')
     achievement_score = models.PositiveIntegerField(default=0, help_text="Numeric score for ranking (higher = better)")
     key_achievements = models.TextField(blank=True, help_text="List key achievements (one per line)")
+    # key_achievements split into lines on save
+    achievements_list = models.JSONField(default=list, blank=True, editable=False)
     
     # Additional details
     location = models.CharField(max_length=200, blank=True, help_text="Location or school (for clubs/projects)")
@@ -592,15 +743,22 @@ class SpotlightItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Columns fill_derived() reads and writes; `manage.py fill_derived_fields` backfills them
+    DERIVED_FROM = ('key_achievements',)
+    DERIVED_FIELDS = ('achievements_list',)
+
     class Meta:
         ordering = ['category', 'order', '-achievement_score', 'title']
+        indexes = [
+            PostgresPartialIndex(fields=['category', 'order', '-achievement_score'], condition=Q(is_active=True), name='spotitem_active_order_idx'),
+        ]
         verbose_name = 'Spotlight Item'
         verbose_name_plural = 'Spotlight Items'
 
     def __str__(self):
         return f"{self.category.get_name_display()}: {self.title}"
 
-    @property
+    @cached_property
     def performance_badge_color(self):
         """Return color for performance level badge"""
         colors = {
@@ -611,12 +769,12 @@ class SpotlightItem(models.Model):
         }
         return colors.get(self.performance_level, '#28a745')
 
-    @property
-    def achievements_list(self):
-        """Return achievements as a list"""
-        if self.key_achievements:
-            return [achievement.strip() for achievement in self.key_achievements.split('\n') if achievement.strip()]
-        return []
+    def fill_derived(self) -> None:
+        derived.fill_spotlight_item(self)
+
+    def save(self, *args, **kwargs):
+        _derive_on_save(self, kwargs)
+        super().save(*args, **kwargs)
 
 
 class SpotlightStats(models.Model):
@@ -632,6 +790,9 @@ class SpotlightStats(models.Model):
 
     class Meta:
         ordering = ['order', 'title']
+        indexes = [
+            PostgresPartialIndex(fields=['order', 'title'], condition=Q(is_active=True), name='spotstats_active_order_idx'),
+        ]
         verbose_name = 'Spotlight Statistic'
         verbose_name_plural = 'Spotlight Statistics'
 
@@ -684,3 +845,27 @@ class NewsletterSubscription(models.Model):
         """Deactivate subscription (soft delete)"""
         self.is_active = False
         self.save()
+
+
+# 16. Site search index (one row per searchable object, kept in sync by charity.search_index)
+class SearchDocument(models.Model):
+    """Denormalised title/body of a Project, Program, Club, School, Opportunity or Article.
+
+    The full-text index lives outside the ORM (see migration 0022): a
+    generated ``tsvector`` column with a GIN index on PostgreSQL, and an
+    FTS5 table kept current by triggers on SQLite.
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=250)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=200)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
@@ -0,0 +1,113 @@
+"""Full-page response cache for anonymous visitors.
+
+Public listing pages render identical HTML for every anonymous visitor, so
+``charity.middleware.AnonymousPageCacheMiddleware`` stores whole responses
+and serves them without running the view. Pages are organised in URL groups;
+each group has a version token that is replaced when one of its models
+changes (see ``charity.signals``), which purges every cached page of the
+group at once.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import (
+    Article,
+    Category,
+    Club,
+    Donation,
+    Impact,
+    ImpactCounter,
+    Mentor,
+    Opportunity,
+    Photo,
+    Program,
+    Project,
+    ProjectMembership,
+    Resource,
+    School,
+    SpotlightCategory,
+    SpotlightItem,
+    SpotlightStats,
+    TeamMember,
+    VoiceOfChange,
+)
+
+# URL name (without the ``charity:`` namespace) -> models rendered on that page
+PAGE_CACHE_GROUPS = {
+    'home': (
+        Article, Category, Club, Donation, Impact, ImpactCounter, Mentor, Opportunity,
+        Photo, Program, Project, Resource, School, SpotlightCategory, SpotlightItem,
+        SpotlightStats, TeamMember, VoiceOfChange,
+    ),
+    'about': (
+        Category, Club, Donation, Impact, ImpactCounter, Mentor, Program, Project,
+        Resource, School, SpotlightStats, TeamMember, VoiceOfChange,
+    ),
+    'projects': (Project, Category, ProjectMembership),
+    'clubs': (Club, School),
+    'programs': (Program, Category),
+    'partner_schools': (School, Club),
+    'impact': (Impact, ImpactCounter),
+    'spotlight': (SpotlightCategory, SpotlightItem, SpotlightStats),
+    'opportunities': (Opportunity,),
+    'articles': (Article,),
+}
+
+# Only these query parameters change what the cached views render
+CACHEABLE_QUERY_PARAMS = ('page', 'cursor', 'type', 'status', 'category')
+
+# Stored in place of the per-visitor CSRF token; swapped back in on serve
+CSRF_PLACEHOLDER = '__charity_page_cache_csrf__'
+
+GROUP_VERSION_KEY = 'charity:page:version:{group}'
+PAGE_KEY = 'charity:page:{group}:{version}:{digest}'
+
+
+def page_cache_timeout() -> int:
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 10)
+
+
+def groups_for_model(model) -> list:
+    return [group for group, models in PAGE_CACHE_GROUPS.items() if model in models]
+
+
+def group_version(group: str) -> str:
+    key = GROUP_VERSION_KEY.format(group=group)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def purge_group(group: str) -> None:
+    """Drop every cached page of ``group`` by switching its version token."""
+    cache.set(GROUP_VERSION_KEY.format(group=group), uuid.uuid4().hex, None)
+
+
+def purge_model(model) -> None:
+    for group in groups_for_model(model):
+        purge_group(group)
+
+
+def normalized_query(request) -> str:
+    params = sorted(
+        (name, value)
+        for name in CACHEABLE_QUERY_PARAMS
+        for value in request.GET.getlist(name)
+    )
+    return '&'.join(f'{name}={value}' for name, value in params)
+
+
+def page_key(request, group: str) -> str:
+    raw = '|'.join((
+        request.get_host(),
+        getattr(request, 'LANGUAGE_CODE', ''),
+        request.path,
+        normalized_query(request),
+    ))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return PAGE_KEY.format(group=group, version=group_version(group), digest=digest)
@@ -0,0 +1,220 @@
+"""Shared data loaders for the home, about and testimonial pages.
+
+Each section queryset is built once per request and shared by every context
+key that aliases it (e.g. ``voices`` / ``testimonials`` / ``voices_of_change``),
+so a section is queried at most once no matter how many times the template
+iterates it. Querysets stay lazy: sections a template never touches cost
+nothing. Listing sections are sliced to what the templates display and load
+only the columns the card partials read.
+"""
+from django.db.models import Prefetch, QuerySet
+
+from .models import (
+    Article,
+    Category,
+    Club,
+    Donation,
+    Impact,
+    ImpactCounter,
+    Mentor,
+    Opportunity,
+    Photo,
+    Program,
+    Project,
+    Resource,
+    School,
+    SpotlightCategory,
+    SpotlightItem,
+    SpotlightStats,
+    TeamMember,
+    VoiceOfChange,
+)
+
+# How many rows each home/about section renders
+SCHOOLS_LIMIT = 6
+PROJECTS_LIMIT = 5
+CLUBS_LIMIT = 6
+PROGRAMS_PER_CATEGORY = 2
+MENTORS_LIMIT = 6
+ARTICLES_LIMIT = 6
+RESOURCES_LIMIT = 6
+PHOTOS_LIMIT = 8
+OPPORTUNITIES_LIMIT = 4
+
+# Columns read by includes/*_card.html
+PROJECT_CARD_FIELDS = ('id', 'title', 'description', 'image', 'category', 'category__name')
+SCHOOL_CARD_FIELDS = (
+    'id', 'name', 'location', 'description', 'image', 'badge',
+    'student_population', 'partnership_date', 'clubs_count',
+)
+CLUB_CARD_FIELDS = (
+    'id', 'title', 'description', 'image', 'icon', 'member_count',
+    'meeting_schedule', 'school', 'school__name',
+)
+PROGRAM_CARD_FIELDS = ('id', 'title', 'description', 'image', 'category')
+PERSON_CARD_FIELDS = ('id', 'name', 'title', 'image')
+
+
+def schools():
+    return School.objects.only(*SCHOOL_CARD_FIELDS)[:SCHOOLS_LIMIT]
+
+
+def projects():
+    return Project.objects.select_related('category').only(*PROJECT_CARD_FIELDS)[:PROJECTS_LIMIT]
+
+
+def clubs():
+    return Club.objects.select_related('school').only(*CLUB_CARD_FIELDS)[:CLUBS_LIMIT]
+
+
+def program_categories():
+    """Categories with at most ``PROGRAMS_PER_CATEGORY`` programs each, as ``preview_programs``."""
+    programs = Program.objects.only(*PROGRAM_CARD_FIELDS)[:PROGRAMS_PER_CATEGORY]
+    return Category.objects.prefetch_related(Prefetch('programs', queryset=programs, to_attr='preview_programs'))
+
+
+def team_members():
+    return TeamMember.objects.only(*PERSON_CARD_FIELDS, 'social_links')
+
+
+def voices():
+    return VoiceOfChange.objects.only(*PERSON_CARD_FIELDS, 'quote')
+
+
+def mentors():
+    return Mentor.objects.all()[:MENTORS_LIMIT]
+
+
+def donations():
+    return Donation.objects.all()
+
+
+def impact_sections():
+    return Impact.objects.filter(is_active=True).order_by('order', 'title')
+
+
+def impact_counters():
+    return ImpactCounter.objects.filter(is_active=True).order_by('order', 'title')
+
+
+def spotlight_categories():
+    """Active spotlight categories with their active items as ``active_items``.
+
+    Two queries in total. Each item's ``performance_badge_color`` is
+    stored here as ``badge_color``, so the value is kept when the list is
+    cached and templates only read attributes.
+    """
+    items = SpotlightItem.objects.filter(is_active=True).order_by('order', '-achievement_score', 'title')
+    categories = list(
+        SpotlightCategory.objects.filter(is_active=True)
+        .order_by('order', 'name')
+        .prefetch_related(Prefetch('items', queryset=items, to_attr='active_items'))
+    )
+    for category in categories:
+        for item in category.active_items:
+            item.badge_color = item.performance_badge_color
+    return categories
+
+
+def spotlight_stats():
+    return SpotlightStats.objects.filter(is_active=True).order_by('order', 'title')
+
+
+def latest_articles():
+    return (
+        Article.objects.filter(is_published=True)
+        .only('id', 'title', 'image', 'date', 'author_name')
+        .order_by('-date', '-created_at')[:ARTICLES_LIMIT]
+    )
+
+
+def resources():
+    return Resource.objects.only('id', 'title', 'description', 'file', 'file_size', 'file_type')[:RESOURCES_LIMIT]
+
+
+def photos():
+    return Photo.objects.only('id', 'title', 'description', 'image')[:PHOTOS_LIMIT]
+
+
+def latest_opportunities():
+    return (
+        Opportunity.objects.filter(is_published=True)
+        .defer('contact_email', 'updated_at')
+        .order_by('-posted_at')[:OPPORTUNITIES_LIMIT]
+    )
+
+
+def home_page_data() -> dict:
+    """Context for ``charity/index.html``."""
+    project_list = projects()
+    voice_list = voices()
+    return {
+        'youth_leaders': team_members(),
+        'youth_projects': project_list,
+        'testimonials': voice_list,
+        'mentors': mentors(),
+        'projects': project_list,
+        'clubs': clubs(),
+        'categories': program_categories(),
+        'schools': schools(),
+        'voices': voice_list,
+        'voices_of_change': voice_list,
+        'donations': donations(),
+        'impact': impact_sections(),
+        'impact_counter': impact_counters(),
+        'spotlight_categories': spotlight_categories(),
+        'spotlight_stats': spotlight_stats(),
+        'articles': latest_articles(),
+        'downloadable_resources': resources(),
+        'photos': photos(),
+        'opportunities': latest_opportunities(),
+    }
+
+
+def about_page_data() -> dict:
+    """Context for ``charity/about.html``."""
+    project_list = projects()
+    voice_list = voices()
+    return {
+        'youth_leaders': team_members(),
+        'testimonials': voice_list,
+        'youth_projects': project_list,
+        'voices': voice_list,
+        'voices_of_change': voice_list,
+        'mentors': mentors(),
+        'projects': project_list,
+        'clubs': clubs(),
+        'categories': program_categories(),
+        'schools': schools(),
+        'downloadable_resources': resources(),
+        'donations': donations(),
+        'spotlight_stats': spotlight_stats(),
+        'impact': impact_sections(),
+        'impact_counter': impact_counters(),
+    }
+
+
+def testimonial_page_data() -> dict:
+    """Context for ``charity/testimonial.html``."""
+    return {
+        'testimonials': voices(),
+        'youth_leaders': team_members(),
+        'youth_projects': projects(),
+    }
+
+
+def materialize(data: dict) -> dict:
+    """Evaluate every queryset in ``data`` into a list, once per distinct queryset.
+
+    Aliased keys keep pointing at the same list, so the result can be pickled
+    into the cache without repeating queries or duplicating rows.
+    """
+    evaluated = {}
+    result = {}
+    for key, value in data.items():
+        if isinstance(value, QuerySet):
+            if id(value) not in evaluated:
+                evaluated[id(value)] = list(value)
+            value = evaluated[id(value)]
+        result[key] = value
+    return result
@@ -0,0 +1,224 @@
+"""Keyset (cursor) pagination for public listings.
+
+``Paginator`` runs ``COUNT(*)`` plus an ``OFFSET`` query on every page view,
+and deep pages get slower as tables grow. ``KeysetPaginator`` instead
+continues from the sort key of the last (or first) row shown, which is
+encoded in the ``?cursor=`` query parameter, so every page is an indexed
+range scan of ``per_page + 1`` rows.
+
+The total shown in ``includes/pagination.html`` comes from a cached,
+approximate count. Old ``?page=N`` links still work: they are served with a
+one-off OFFSET query, and the links on that page continue with cursors.
+
+``CountedPaginator`` is an ordinary page-number ``Paginator`` for listings
+whose total is already known, such as the cached opportunity facet counts.
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+COUNT_CACHE_KEY = 'charity:pagination:count:{key}'
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision; ``DjangoJSONEncoder`` rounds times to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(direction: str, values, start_index: int) -> str:
+    payload = json.dumps({'d': direction, 'v': values, 'i': start_index}, cls=CursorEncoder)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str):
+    """Return ``(direction, values, start_index)``; raise ValueError on a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        direction, values, start_index = payload['d'], payload['v'], int(payload['i'])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if direction not in (NEXT, PREVIOUS) or (values is not None and not isinstance(values, list)):
+        raise ValueError('Invalid cursor')
+    return direction, values, start_index
+
+
+class KeysetPage(Sequence):
+    """One page of a keyset listing; duck-types the parts of ``Page`` the templates use."""
+
+    def __init__(self, object_list, paginator, start_index, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.start_index = start_index if object_list else 0
+        self.end_index = start_index + len(object_list) - 1 if object_list else 0
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return f'<KeysetPage {self.start_index}-{self.end_index}>'
+
+    @property
+    def number(self) -> int:
+        return (max(self.start_index, 1) - 1) // self.paginator.per_page + 1
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> str:
+        return encode_cursor(NEXT, self.paginator.key_for(self.object_list[-1]), self.end_index + 1)
+
+    @property
+    def previous_cursor(self) -> str:
+        start = max(self.start_index - self.paginator.per_page, 1)
+        return encode_cursor(PREVIOUS, self.paginator.key_for(self.object_list[0]), start)
+
+    @property
+    def last_cursor(self) -> str:
+        return encode_cursor(PREVIOUS, None, 0)
+
+
+class KeysetPaginator:
+    """Paginate ``queryset`` on ``ordering``, which must end with a unique field (e.g. ``id``).
+
+    ``count_key`` names the cached total for this listing; it should
+    identify the queryset, including any filters applied to it.
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_key, count_timeout=300):
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.count_key = count_key
+        self.count_timeout = count_timeout
+        self._fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    @cached_property
+    def count(self) -> int:
+        """Approximate total, cached for ``count_timeout`` seconds."""
+        return cache.get_or_set(
+            COUNT_CACHE_KEY.format(key=self.count_key), self.queryset.count, self.count_timeout
+        )
+
+    @property
+    def num_pages(self) -> int:
+        return max(1, -(-self.count // self.per_page))
+
+    def key_for(self, obj) -> list:
+        return [getattr(obj, name) for name, _ in self._fields]
+
+    def _parse_key(self, values) -> list:
+        model = self.queryset.model
+        parsed = []
+        for (name, _), value in zip(self._fields, values, strict=True):
+            field = model._meta.get_field(name)
+            parsed.append(field.to_python(value))
+        return parsed
+
+    def _after(self, values, backwards: bool) -> Q:
+        """Rows strictly after ``values`` in the listing order (before it if ``backwards``)."""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self._fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def first_page(self) -> KeysetPage:
+        rows = list(self.queryset[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], self, 1, len(rows) > self.per_page, False)
+
+    def page_after(self, values, start_index: int) -> KeysetPage:
+        rows = list(self.queryset.filter(self._after(values, False))[:self.per_page + 1])
+        if not rows:
+            return self.first_page()
+        return KeysetPage(rows[:self.per_page], self, start_index, len(rows) > self.per_page, True)
+
+    def page_before(self, values, start_index: int) -> KeysetPage:
+        queryset = self.queryset.reverse()
+        if values is not None:
+            queryset = queryset.filter(self._after(values, True))
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        if values is not None and not has_previous:
+            # Reached the start of the listing: show a full first page
+            return self.first_page()
+        rows = rows[:self.per_page]
+        rows.reverse()
+        if values is None:
+            # "Last page" link: position comes from the approximate count
+            start_index = max(self.count - len(rows) + 1, 1)
+        return KeysetPage(rows, self, start_index, values is not None, has_previous)
+
+    def legacy_page(self, number) -> KeysetPage:
+        """Serve an old ``?page=N`` link with OFFSET; out-of-range numbers get the last page."""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return self.first_page()
+        if number <= 1:
+            return self.first_page()
+        offset = (number - 1) * self.per_page
+        rows = list(self.queryset[offset:offset + self.per_page + 1])
+        if not rows:
+            return self.page_before(None, 0)
+        return KeysetPage(rows[:self.per_page], self, offset + 1, len(rows) > self.per_page, True)
+
+    def page_from_request(self, request) -> KeysetPage:
+        token = request.GET.get('cursor')
+        if token:
+            try:
+                direction, values, start_index = decode_cursor(token)
+                if values is not None:
+                    values = self._parse_key(values)
+            except (ValueError, ValidationError):
+                return self.first_page()
+            if direction == NEXT and values is not None:
+                return self.page_after(values, start_index)
+            if direction == PREVIOUS:
+                return self.page_before(values, start_index)
+            return self.first_page()
+        if 'page' in request.GET:
+            return self.legacy_page(request.GET['page'])
+        return self.first_page()
+
+
+class CountedPaginator(Paginator):
+    """``Paginator`` for a total that is already known (e.g. cached facet counts), skipping ``COUNT(*)``."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @property
+    def count(self) -> int:
+        return self._known_count
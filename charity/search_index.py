@@ -0,0 +1,163 @@
+"""Site-wide full-text search over ``SearchDocument``.
+
+Each searchable object has one ``SearchDocument`` row, written on save and
+removed on delete (see ``charity.signals``). Unpublished opportunities and
+articles are removed from the index as well. Migration 0022 adds the text
+index itself: a weighted ``tsvector`` with a GIN index on PostgreSQL, or an
+FTS5 table on SQLite. It then fills it from the existing rows. ``SearchResults``
+queries whichever one the database has. Other backends fall back to
+``icontains``.
+
+Run ``manage.py rebuild_search_index`` after bulk imports that bypass ``save()``.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils.html import strip_tags
+
+from .models import Article, Club, Opportunity, Program, Project, School, SearchDocument
+
+# kind -> (model, title field, body fields, URL name, URL kwarg, filter for public rows)
+SEARCH_SOURCES = {
+    'project': (Project, 'title', ('description',), 'charity:project_detail', 'project_id', {}),
+    'program': (Program, 'title', ('description',), 'charity:program_detail', 'program_id', {}),
+    'club': (Club, 'title', ('description', 'location', 'coordinator'), 'charity:club_detail', 'club_id', {}),
+    'school': (School, 'name', ('description', 'location'), 'charity:school_detail', 'school_id', {}),
+    'opportunity': (
+        Opportunity, 'title', ('organization', 'location', 'description'),
+        'charity:opportunity_detail', 'opp_id', {'is_published': True},
+    ),
+    'article': (Article, 'title', ('content',), 'charity:article_details', 'post_id', {'is_published': True}),
+}
+
+KIND_FOR_MODEL = {source[0]: kind for kind, source in SEARCH_SOURCES.items()}
+
+POSTGRES_TSQUERY = "websearch_to_tsquery('english', %s)"
+SQLITE_MATCH = 'SELECT rowid FROM charity_searchdocument_fts WHERE charity_searchdocument_fts MATCH %s'
+# bm25() is lower-is-better; the title column is weighted 10x the body
+SQLITE_RANKED = (
+    'SELECT rowid, bm25(charity_searchdocument_fts, 10.0, 1.0) AS score FROM charity_searchdocument_fts '
+    'WHERE charity_searchdocument_fts MATCH %s ORDER BY score, rowid LIMIT %s OFFSET %s'
+)
+QUERY_MAX_LENGTH = 200
+BATCH_SIZE = 500
+
+
+def _document(kind: str, obj, document_model=SearchDocument):
+    _, title_field, body_fields, url_name, url_kwarg, _ = SEARCH_SOURCES[kind]
+    body = '\n'.join(strip_tags(getattr(obj, name) or '') for name in body_fields)
+    return document_model(
+        kind=kind,
+        object_id=obj.pk,
+        title=getattr(obj, title_field)[:250],
+        body=body,
+        url=reverse(url_name, kwargs={url_kwarg: obj.pk}),
+    )
+
+
+def index_object(obj) -> None:
+    """Add, refresh or (if no longer public) remove ``obj``'s search document."""
+    kind = KIND_FOR_MODEL.get(type(obj))
+    if kind is None:
+        return
+    public = SEARCH_SOURCES[kind][5]
+    if any(getattr(obj, name) != value for name, value in public.items()):
+        remove_object(obj)
+        return
+    document = _document(kind, obj)
+    SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=obj.pk,
+        defaults={'title': document.title, 'body': document.body, 'url': document.url},
+    )
+
+
+def remove_object(obj) -> None:
+    kind = KIND_FOR_MODEL.get(type(obj))
+    if kind is not None:
+        SearchDocument.objects.filter(kind=kind, object_id=obj.pk).delete()
+
+
+@transaction.atomic
+def rebuild(apps=None) -> int:
+    """Recreate every search document from the source tables; return how many were written.
+
+    Migrations pass their ``apps`` so the historical models are used.
+    """
+    document_model = apps.get_model('charity', 'SearchDocument') if apps else SearchDocument
+    document_model.objects.all().delete()
+    total = 0
+    for kind, (model, title_field, body_fields, _, _, public) in SEARCH_SOURCES.items():
+        if apps:
+            model = apps.get_model('charity', model.__name__)
+        objects = model.objects.filter(**public).only('pk', title_field, *body_fields).order_by('pk')
+        documents = [_document(kind, obj, document_model) for obj in objects.iterator(chunk_size=BATCH_SIZE)]
+        document_model.objects.bulk_create(documents, batch_size=BATCH_SIZE)
+        total += len(documents)
+    return total
+
+
+def fts5_query(query: str) -> str:
+    """Turn free text into a safe FTS5 expression: every word required, last word as a prefix."""
+    words = re.findall(r'\w+', query)
+    if not words:
+        return ''
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+class SearchResults:
+    """Ranked documents matching ``query``; supports ``count()`` and slicing, so ``Paginator`` can page it."""
+
+    def __init__(self, query: str):
+        self.query = query.strip()[:QUERY_MAX_LENGTH]
+        self.vendor = connection.vendor
+        self._count = None
+
+    def _queryset(self):
+        documents = SearchDocument.objects.all()
+        if self.vendor == 'postgresql':
+            return documents.annotate(
+                rank=RawSQL(f'ts_rank_cd(search_vector, {POSTGRES_TSQUERY})', [self.query], output_field=FloatField()),
+            ).filter(
+                RawSQL(f'search_vector @@ {POSTGRES_TSQUERY}', [self.query], output_field=BooleanField()),
+            ).order_by(F('rank').desc(), 'id')
+        if self.vendor == 'sqlite':
+            return documents.filter(id__in=RawSQL(SQLITE_MATCH, [fts5_query(self.query)]))
+        return documents.filter(
+            Q(title__icontains=self.query) | Q(body__icontains=self.query)
+        ).annotate(rank=Value(0.0)).order_by('title', 'id')
+
+    def count(self) -> int:
+        if self._count is None:
+            if not self.query or (self.vendor == 'sqlite' and not fts5_query(self.query)):
+                self._count = 0
+            else:
+                self._count = self._queryset().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.count():
+            return []
+        if self.vendor != 'sqlite':
+            return list(self._queryset()[key])
+        # FTS5 ranks and limits in one pass; the page's documents are then fetched by id
+        start = key.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(SQLITE_RANKED, [fts5_query(self.query), key.stop - start, start])
+            ranked = cursor.fetchall()
+        documents = SearchDocument.objects.in_bulk([rowid for rowid, _ in ranked])
+        results = []
+        for rowid, score in ranked:
+            document = documents.get(rowid)
+            if document is not None:
+                document.rank = -score
+                results.append(document)
+        return results
@@ -0,0 +1,173 @@
+"""SEO metadata registry used by ``charity.context_processors.seo_defaults``.
+
+``PAGE_META`` is plain data built once at import; only the entry for the
+current view is turned into URLs, and static URLs are memoised per process.
+Detail pages get their description and image from the object itself via
+``object_meta``, which is cached and dropped when the object changes (see
+``charity.signals``).
+
+The site-wide Organization/WebSite JSON-LD depends only on the site's base
+URL, so ``site_jsonld`` serialises it once per host.
+"""
+import json
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from .models import Article, Opportunity, Program, Project
+
+DEFAULT_OG_IMAGE = 'assets/img/ycbn-logo.png'
+
+# view_name -> page title, meta description and OG image (static path)
+PAGE_META = {
+    'charity:home': {
+        'page_title': 'YCBN Uganda — Youth Capacity Building Network',
+        'meta_description': 'Empowering young people in Uganda through skills development, mentorship, and community projects.',
+        'og_image': 'assets/img/hero1.jpg',
+    },
+    'charity:about': {
+        'page_title': 'About YCBN Uganda — Our Mission and Team',
+        'meta_description': 'Learn about YCBN Uganda’s mission to empower youth through education, leadership, and community impact.',
+        'og_image': 'assets/img/hero2.jpg',
+    },
+    'charity:projects': {
+        'page_title': 'Projects — YCBN Uganda Community Impact',
+        'meta_description': 'Explore ongoing and past YCBN projects creating positive change in Ugandan communities.',
+        'og_image': 'assets/img/hero3.jpg',
+    },
+    'charity:programs': {
+        'page_title': 'Programs — Skills and Mentorship by YCBN Uganda',
+        'meta_description': 'Discover YCBN programs in skills development, mentorship, and youth leadership across Uganda.',
+        'og_image': 'assets/img/hero2.jpg',
+    },
+    'charity:opportunities': {
+        'page_title': 'Opportunities — Jobs, Scholarships, Grants | YCBN Uganda',
+        'meta_description': 'Curated jobs, scholarships, internships and grants for YCBN youth community in Uganda.',
+        'og_image': 'assets/img/hero3.jpg',
+    },
+    'charity:articles': {
+        'page_title': 'Articles — Youth Voices at YCBN Uganda',
+        'meta_description': 'Community-written articles from YCBN members on leadership, skills, and impact across Uganda.',
+        'og_image': 'assets/img/hero2.jpg',
+    },
+    'charity:donate_now': {
+        'page_title': 'Donate — Support YCBN Uganda',
+        'meta_description': 'Support youth empowerment in Uganda. Donate securely to YCBN’s programs and projects.',
+        'og_image': 'assets/img/hero3.jpg',
+    },
+    'charity:donations': {
+        'page_title': 'Our Campaigns — YCBN Uganda',
+        'meta_description': 'See current campaigns and how your donation drives youth impact in Uganda.',
+        'og_image': 'assets/img/hero3.jpg',
+    },
+    'charity:impact': {
+        'page_title': 'Our Impact — YCBN Uganda',
+        'meta_description': 'Highlights of YCBN’s measurable impact empowering youth and communities in Uganda.',
+        'og_image': 'assets/img/hero1.jpg',
+    },
+    'charity:contact': {
+        'page_title': 'Contact YCBN Uganda',
+        'meta_description': 'Reach YCBN Uganda for partnerships, volunteering, and questions about our programs.',
+        'og_image': 'assets/img/ycbn-logo.png',
+    },
+}
+
+# view_name -> (URL kwarg, model, description field, image field)
+OBJECT_META = {
+    'charity:project_detail': ('project_id', Project, 'description', 'image'),
+    'charity:program_detail': ('program_id', Program, 'description', 'image'),
+    'charity:opportunity_detail': ('opp_id', Opportunity, 'description', 'image'),
+    'charity:article_details': ('post_id', Article, 'content', 'image'),
+}
+
+# Organization/WebSite structured data; site_jsonld() adds the URLs
+ORGANIZATION = {
+    '@context': 'https://schema.org',
+    '@type': 'NGO',
+    'name': 'Youth Capacity Building Network (YCBN)',
+    'areaServed': {'@type': 'Country', 'name': 'Uganda', 'identifier': 'UG'},
+    'sameAs': [
+        'https://www.facebook.com/profile.php?id=61579627535321',
+        'https://x.com/YCBNetwork',
+        'https://youtube.com/@youthcapacitybuildingnetwork?si=m2gIte8HQjiVzrmr',
+        'https://www.linkedin.com/company/tiny-bit-wiser/',
+    ],
+    'contactPoint': {
+        '@type': 'ContactPoint',
+        'telephone': '+256772573781',
+        'email': 'info@ycbn.org',
+        'contactType': 'customer support',
+        'areaServed': 'UG',
+        'availableLanguage': ['en-UG', 'en'],
+    },
+}
+WEBSITE = {
+    '@context': 'https://schema.org',
+    '@type': 'WebSite',
+    'name': 'YCBN Uganda',
+}
+# Keeps the JSON from closing the <script> element it is inlined in
+JSON_SCRIPT_ESCAPES = {ord('<'): '\\u003c', ord('>'): '\\u003e', ord('&'): '\\u0026'}
+
+OBJECT_META_KEY = 'charity:seo:{model}:{pk}'
+DESCRIPTION_LENGTH = 160
+
+
+@lru_cache(maxsize=None)
+def static_url(path: str) -> str:
+    return static(path)
+
+
+@lru_cache(maxsize=32)
+def site_jsonld(base_url: str) -> tuple:
+    """Return the Organization and WebSite JSON-LD documents for the site at ``base_url``, serialised."""
+    organization = dict(ORGANIZATION, url=f'{base_url}/', logo=base_url + static_url(DEFAULT_OG_IMAGE))
+    website = dict(WEBSITE, url=f'{base_url}/', potentialAction={
+        '@type': 'SearchAction',
+        'target': base_url + reverse('charity:search') + '?q={search_term_string}',
+        'query-input': 'required name=search_term_string',
+    })
+    return tuple(
+        json.dumps(document, ensure_ascii=False).translate(JSON_SCRIPT_ESCAPES) for document in (organization, website)
+    )
+
+
+def _object_meta_key(model, pk) -> str:
+    return OBJECT_META_KEY.format(model=model._meta.label_lower, pk=pk)
+
+
+def object_meta(view_name: str, kwargs: dict):
+    """Return ``{'page_title', 'meta_description', 'og_image'}`` for a detail page, or None.
+
+    ``og_image`` is the media URL (not yet absolute) or empty.
+    """
+    entry = OBJECT_META.get(view_name)
+    if entry is None:
+        return None
+    kwarg, model, description_field, image_field = entry
+    pk = kwargs.get(kwarg)
+    if pk is None:
+        return None
+
+    key = _object_meta_key(model, pk)
+    meta = cache.get(key)
+    if meta is None:
+        obj = model.objects.filter(pk=pk).only('title', description_field, image_field).first()
+        if obj is None:
+            return None
+        image = getattr(obj, image_field)
+        meta = {
+            'page_title': obj.title,
+            'meta_description': Truncator(strip_tags(getattr(obj, description_field))).chars(DESCRIPTION_LENGTH),
+            'og_image': image.url if image else '',
+        }
+        cache.set(key, meta, None)
+    return meta
+
+
+def forget_object_meta(model, pk) -> None:
+    cache.delete(_object_meta_key(model, pk))
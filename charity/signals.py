@@ -0,0 +1,182 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import cache_policy, derived, icons, images, page_cache, search_index, seo, snapshots, suggest
+from .models import (
+    Article,
+    Category,
+    Club,
+    Donation,
+    Impact,
+    ImpactCounter,
+    Mentor,
+    Opportunity,
+    Photo,
+    Program,
+    Project,
+    ProjectMembership,
+    Resource,
+    School,
+    SpotlightCategory,
+    SpotlightItem,
+    SpotlightStats,
+    TeamMember,
+    VoiceOfChange,
+)
+
+# Models whose rows end up in the home page snapshot
+HOME_SNAPSHOT_MODELS = (
+    Article,
+    Category,
+    Club,
+    Donation,
+    Impact,
+    ImpactCounter,
+    Mentor,
+    Opportunity,
+    Photo,
+    Program,
+    Project,
+    Resource,
+    School,
+    SpotlightCategory,
+    SpotlightItem,
+    SpotlightStats,
+    TeamMember,
+    VoiceOfChange,
+)
+
+
+def invalidate_home_snapshot(sender, **kwargs):
+    # Wait for the commit so a rebuild never reads the pre-edit rows
+    transaction.on_commit(snapshots.bump_home_snapshot_version)
+
+
+for model in HOME_SNAPSHOT_MODELS:
+    post_save.connect(invalidate_home_snapshot, sender=model, dispatch_uid=f'home-snapshot-save-{model.__name__}')
+    post_delete.connect(invalidate_home_snapshot, sender=model, dispatch_uid=f'home-snapshot-delete-{model.__name__}')
+
+
+def refresh_bulk_changes(model, pks=()) -> None:
+    """Drop the cached copies of ``model`` after ``QuerySet.update()``/``bulk_update()``, which send no signals."""
+    page_cache.purge_model(model)
+    if model in HOME_SNAPSHOT_MODELS:
+        snapshots.bump_home_snapshot_version()
+    cache_policy.refresh_objects(model, pks)
+
+
+def purge_cached_pages(sender, **kwargs):
+    transaction.on_commit(lambda: page_cache.purge_model(sender))
+
+
+for model in {model for models in page_cache.PAGE_CACHE_GROUPS.values() for model in models}:
+    post_save.connect(purge_cached_pages, sender=model, dispatch_uid=f'page-cache-save-{model.__name__}')
+    post_delete.connect(purge_cached_pages, sender=model, dispatch_uid=f'page-cache-delete-{model.__name__}')
+
+
+def refresh_nginx_cache(sender, instance, **kwargs):
+    # Read the pk now: a deleted instance loses it before on_commit runs
+    pk = instance.pk
+    transaction.on_commit(lambda: cache_policy.refresh_model(sender, pk))
+
+
+for model in (
+    {model for models in page_cache.PAGE_CACHE_GROUPS.values() for model in models}
+    | {model for model, _ in cache_policy.DETAIL_OBJECTS.values()}
+):
+    post_save.connect(refresh_nginx_cache, sender=model, dispatch_uid=f'nginx-cache-save-{model.__name__}')
+    post_delete.connect(refresh_nginx_cache, sender=model, dispatch_uid=f'nginx-cache-delete-{model.__name__}')
+
+
+def forget_seo_meta(sender, instance, **kwargs):
+    transaction.on_commit(lambda: seo.forget_object_meta(sender, instance.pk))
+
+
+for _, model, _, _ in seo.OBJECT_META.values():
+    post_save.connect(forget_seo_meta, sender=model, dispatch_uid=f'seo-meta-save-{model.__name__}')
+    post_delete.connect(forget_seo_meta, sender=model, dispatch_uid=f'seo-meta-delete-{model.__name__}')
+
+
+def update_search_document(sender, instance, **kwargs):
+    # Same transaction as the edit, so the index never lags a committed row
+    search_index.index_object(instance)
+
+
+def delete_search_document(sender, instance, **kwargs):
+    search_index.remove_object(instance)
+
+
+for model, *_ in search_index.SEARCH_SOURCES.values():
+    post_save.connect(update_search_document, sender=model, dispatch_uid=f'search-index-save-{model.__name__}')
+    post_delete.connect(delete_search_document, sender=model, dispatch_uid=f'search-index-delete-{model.__name__}')
+
+
+def publish_suggestion_change(sender, instance, **kwargs):
+    # Build the record now: a deleted instance loses its pk before on_commit runs
+    change = suggest.change_for(instance, deleted=kwargs.get('signal') is post_delete)
+    transaction.on_commit(lambda: suggest.publish_change(change))
+
+
+for model, *_ in suggest.SUGGEST_SOURCES.values():
+    post_save.connect(publish_suggestion_change, sender=model, dispatch_uid=f'suggest-save-{model.__name__}')
+    post_delete.connect(publish_suggestion_change, sender=model, dispatch_uid=f'suggest-delete-{model.__name__}')
+
+
+def schedule_image_variants(sender, instance, **kwargs):
+    for name in images.pending_names(instance):
+        images.schedule(name)
+
+
+for model in images.IMAGE_FIELDS:
+    post_save.connect(schedule_image_variants, sender=model, dispatch_uid=f'image-variants-{model.__name__}')
+
+
+def rebuild_icon_subset(sender, instance, **kwargs):
+    if icons.missing_classes(icons.instance_classes(instance)):
+        icons.schedule()
+
+
+for model in (*icons.ICON_FIELDS, *icons.SOCIAL_LINK_FIELDS):
+    post_save.connect(rebuild_icon_subset, sender=model, dispatch_uid=f'icon-subset-{model.__name__}')
+
+
+# Deletes, including cascades and queryset deletes, run inside the collector's transaction
+def uncount_membership(sender, instance, **kwargs):
+    Project.objects.filter(pk=instance.project_id).add_members(-1)
+
+
+def uncount_club(sender, instance, **kwargs):
+    School.objects.filter(pk=instance.school_id).add_clubs(-1, -instance.member_count)
+
+
+post_delete.connect(uncount_membership, sender=ProjectMembership, dispatch_uid='counters-membership-delete')
+post_delete.connect(uncount_club, sender=Club, dispatch_uid='counters-club-delete')
+
+
+def _name_changed(update_fields) -> bool:
+    # Logins save last_login only; skip them
+    return update_fields is None or bool({'username', 'first_name', 'last_name'} & set(update_fields))
+
+
+def refresh_author_names(sender, instance, update_fields=None, **kwargs):
+    if not _name_changed(update_fields):
+        return
+    name = derived.author_display_name(instance)
+    pks = list(Article.objects.filter(author=instance).exclude(author_name=name).values_list('pk', flat=True))
+    if pks:
+        Article.objects.filter(pk__in=pks).update(author_name=name)
+        transaction.on_commit(lambda: refresh_bulk_changes(Article, pks))
+
+
+post_save.connect(refresh_author_names, sender=settings.AUTH_USER_MODEL, dispatch_uid='article-author-names')
+
+
+def touch_memberships(sender, instance, update_fields=None, **kwargs):
+    # Project pages list members by name; a newer updated_at changes their ETag
+    if _name_changed(update_fields):
+        ProjectMembership.objects.filter(user=instance).update(updated_at=timezone.now())
+
+
+post_save.connect(touch_memberships, sender=settings.AUTH_USER_MODEL, dispatch_uid='membership-member-names')
@@ -0,0 +1,71 @@
+"""Versioned, precomputed page snapshots stored in the Django cache.
+
+The home page is built from ~20 admin-managed tables that change only when
+somebody edits them in the admin. Instead of querying them on every hit, the
+materialised context is stored under a key that embeds a version token.
+Saving or deleting any contributing model replaces the token (see
+``charity.signals``), so the next request rebuilds the snapshot.
+
+While one worker rebuilds, the others keep serving the previous snapshot
+instead of all querying the database at once.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import page_data
+
+HOME_VERSION_KEY = 'charity:home:version'
+HOME_SNAPSHOT_KEY = 'charity:home:snapshot:{version}'
+HOME_STALE_KEY = 'charity:home:snapshot:stale'
+HOME_LOCK_KEY = 'charity:home:rebuild-lock'
+
+
+def _timeout() -> int:
+    return getattr(settings, 'HOME_SNAPSHOT_TIMEOUT', 60 * 60 * 24)
+
+
+def _lock_timeout() -> int:
+    return getattr(settings, 'HOME_SNAPSHOT_LOCK_TIMEOUT', 30)
+
+
+def home_snapshot_version() -> str:
+    """Return the current version token, creating one if the cache has none."""
+    version = cache.get(HOME_VERSION_KEY)
+    if version is None:
+        cache.add(HOME_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(HOME_VERSION_KEY)
+    return version
+
+
+def bump_home_snapshot_version() -> None:
+    """Invalidate the home snapshot by switching to a fresh version token."""
+    cache.set(HOME_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def build_home_snapshot() -> dict:
+    return page_data.materialize(page_data.home_page_data())
+
+
+def get_home_snapshot() -> dict:
+    """Return the home page context, rebuilding it at most once per version."""
+    version = home_snapshot_version()
+    key = HOME_SNAPSHOT_KEY.format(version=version)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    if cache.add(HOME_LOCK_KEY, version, _lock_timeout()):
+        try:
+            snapshot = build_home_snapshot()
+            cache.set_many({key: snapshot, HOME_STALE_KEY: snapshot}, _timeout())
+        finally:
+            cache.delete(HOME_LOCK_KEY)
+        return snapshot
+
+    # Another worker is rebuilding: serve the previous snapshot meanwhile
+    stale = cache.get(HOME_STALE_KEY)
+    if stale is not None:
+        return stale
+    return build_home_snapshot()
@@ -0,0 +1,142 @@
+"""Which theme files under ``STATICFILES_DIRS`` the site actually uses.
+
+The HTML template the theme came from ships far more images, masks and
+RTL copies than our pages reference. ``referenced_files()`` walks the graph
+from every ``{% static %}`` tag (and literal ``/static/`` URL) in the
+templates, and every file of ``charity.bundles.BUNDLES``, through the ``url()``/``@import`` references of the CSS files and
+the quoted asset paths of the JS and JSON (web manifest) files it reaches.
+Everything else is unreferenced.
+
+``manage.py optimize_static --write-prune-list`` stores the unreferenced
+paths in ``STATIC_PRUNE_LIST``. ``PrunedFileSystemFinder`` then leaves them
+out of ``collectstatic``, while ``runserver`` can still find them.
+"""
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+
+from . import bundles
+
+STATIC_TAG = re.compile(r"""\{%\s*static\s+['"]([^'"]+)['"]""")
+STATIC_URL_PATH = re.compile(r"""/static/([\w@./-]+)""")
+CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+?)['"]?\s*\)""")
+CSS_IMPORT = re.compile(r"""@import\s+['"]([^'"]+)['"]""")
+JS_ASSET = re.compile(r"""['"]([\w@./-]+\.(?:avif|css|gif|ico|jpe?g|js|json|png|svg|ttf|webp|woff2?))(?:\?[^'"]*)?['"]""")
+# Files whose contents can point at other static files
+LINKING_SUFFIXES = ('.css', '.js', '.json', '.webmanifest')
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+# Files requested by browsers and crawlers without any reference in our markup
+ALWAYS_KEEP = ('favicon.ico', 'robots.txt')
+
+
+def source_files() -> dict:
+    """Map every file under ``STATICFILES_DIRS`` to its absolute path, by static path (``assets/css/x.css``)."""
+    files = {}
+    for entry in settings.STATICFILES_DIRS:
+        prefix, root = entry if isinstance(entry, (list, tuple)) else ('', entry)
+        root = Path(root)
+        for path in root.rglob('*'):
+            if path.is_file():
+                files[posixpath.join(prefix, path.relative_to(root).as_posix())] = path
+    return files
+
+
+def template_files():
+    dirs = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', ())]
+    dirs += [Path(config.path) / 'templates' for config in apps.get_app_configs()]
+    for directory in dirs:
+        if directory.is_dir():
+            for path in directory.rglob('*'):
+                if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                    yield path
+
+
+def _clean(reference: str) -> str:
+    return reference.split('?', 1)[0].split('#', 1)[0].strip()
+
+
+def _is_external(reference: str) -> bool:
+    return not reference or reference.startswith(('data:', 'http:', 'https:', '//', '#', '%23', 'about:'))
+
+
+def _references(static_path: str, text: str):
+    """Yield static paths referenced from the CSS, JS or JSON file at ``static_path``."""
+    directory = posixpath.dirname(static_path)
+    if static_path.endswith('.css'):
+        candidates = CSS_URL.findall(text) + CSS_IMPORT.findall(text)
+    else:
+        candidates = JS_ASSET.findall(text)
+    for reference in candidates:
+        reference = _clean(reference)
+        if _is_external(reference):
+            continue
+        if reference.startswith('/static/'):
+            yield reference[len('/static/'):]
+        elif reference.startswith('/'):
+            continue
+        else:
+            # Relative to the file itself, or (in JS) to the static root
+            yield posixpath.normpath(posixpath.join(directory, reference))
+            yield posixpath.normpath(reference)
+
+
+def template_references() -> dict:
+    """Map every static path named in a ``{% static %}`` tag to the templates that name it."""
+    references = {}
+    for template in template_files():
+        text = template.read_text(encoding='utf-8', errors='ignore')
+        for path in STATIC_TAG.findall(text):
+            references.setdefault(_clean(path), []).append(template)
+    return references
+
+
+def referenced_files(files=None) -> set:
+    """Return the static paths reachable from the templates."""
+    files = source_files() if files is None else files
+    pending = set(ALWAYS_KEEP) | set(getattr(settings, 'STATIC_PRUNE_KEEP', ()))
+    # {% bundle %} links either the built bundle or its sources
+    pending.update(source for sources in bundles.BUNDLES.values() for source in sources)
+    pending.update(bundles.manifest()['bundles'].values())
+    for template in template_files():
+        text = template.read_text(encoding='utf-8', errors='ignore')
+        pending.update(_clean(path) for path in STATIC_TAG.findall(text))
+        pending.update(_clean(path) for path in STATIC_URL_PATH.findall(text))
+
+    found = set()
+    while pending:
+        static_path = pending.pop()
+        if static_path in found or static_path not in files:
+            continue
+        found.add(static_path)
+        if static_path.endswith(LINKING_SUFFIXES):
+            text = files[static_path].read_text(encoding='utf-8', errors='ignore')
+            pending.update(path for path in _references(static_path, text) if path not in found)
+    return found
+
+
+def prune_list_path() -> Path:
+    return Path(getattr(settings, 'STATIC_PRUNE_LIST', Path(settings.BASE_DIR) / 'static_prune.txt'))
+
+
+def load_prune_list() -> frozenset:
+    path = prune_list_path()
+    if not path.is_file():
+        return frozenset()
+    return frozenset(line.strip() for line in path.read_text(encoding='utf-8').splitlines() if line.strip())
+
+
+class PrunedFileSystemFinder(FileSystemFinder):
+    """``FileSystemFinder`` that leaves the paths in ``STATIC_PRUNE_LIST`` out of ``collectstatic``."""
+
+    def list(self, ignore_patterns):
+        pruned = load_prune_list()
+        for path, storage in super().list(ignore_patterns):
+            prefix = getattr(storage, 'prefix', None) or ''
+            if posixpath.join(prefix, path.replace(os.sep, '/')) not in pruned:
+                yield path, storage
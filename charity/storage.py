@@ -0,0 +1,218 @@
+"""Fingerprinted, precompressed static files for nginx.
+
+``PrecompressedManifestStaticFilesStorage`` is Django's manifest storage
+(every file also gets a content-hashed name such as
+``css/custom.3f2a9c1b7d4e.css``). With ``STATIC_OPTIMIZE_IMAGES`` it first
+recompresses the collected PNGs (and JPEGs, if ``jpegtran`` is installed)
+losslessly, so the hashes are taken from the final bytes, and after hashing
+writes a ``.webp`` sibling for every image where that is smaller. After
+collectstatic's post-processing it writes ``.gz`` and ``.br`` siblings for
+the text assets, spread across CPU cores. The content digest of every
+optimized image and compressed file is kept in ``STATIC_ROOT``, so a repeat
+deploy only reprocesses what actually changed. nginx serves the siblings
+directly with ``gzip_static``/``brotli_static`` and the ``$webp_suffix`` map
+(``manage.py build_static`` writes the config).
+
+A ``{% static %}`` reference to a file missing from the manifest raises,
+as in Django; ``manage.py build_static`` checks the templates for such
+references so they fail the build rather than a page.
+
+Brotli is optional: without the ``brotli`` package only ``.gz`` files are
+written.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_SUFFIXES = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html', '.ico', '.ttf', '.eot')
+# Smaller files gain too little to be worth a second copy
+MIN_COMPRESS_SIZE = 512
+# Content digest of every file already compressed, kept in STATIC_ROOT between deploys
+DIGESTS_NAME = 'staticfiles.compressed.json'
+# Content digest of every collected image after recompression
+IMAGE_DIGESTS_NAME = 'staticfiles.images.json'
+WEBP_SOURCES = ('.png', '.jpg', '.jpeg')
+# WebP copies of photos are lossy at this quality; PNGs convert losslessly
+WEBP_QUALITY = 85
+
+
+def _write_if_smaller(target: Path, data: bytes, original_size: int) -> bool:
+    # Keep the sibling only when it saves at least 5%
+    if len(data) >= original_size * 0.95:
+        target.unlink(missing_ok=True)
+        return False
+    temporary = target.with_name(target.name + '.tmp')
+    temporary.write_bytes(data)
+    os.replace(temporary, target)
+    return True
+
+
+def compress_file(path: str, known_digest: str = None):
+    """Write ``path.gz`` (and ``path.br``) unless the content matches ``known_digest``.
+
+    Returns ``(path, content digest, siblings written)``.
+    """
+    source = Path(path)
+    data = source.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_digest:
+        return path, digest, 0
+    written = _write_if_smaller(
+        source.with_name(source.name + '.gz'), gzip.compress(data, compresslevel=9, mtime=0), len(data)
+    )
+    if brotli is not None:
+        written += _write_if_smaller(
+            source.with_name(source.name + '.br'), brotli.compress(data, quality=11), len(data)
+        )
+    return path, digest, written
+
+
+def _keep_smaller(path: Path, candidate: Path) -> None:
+    if candidate.stat().st_size < path.stat().st_size:
+        os.replace(candidate, path)
+    else:
+        candidate.unlink()
+
+
+def optimize_image(path: str, known_digest: str = None, jpegtran: str = None):
+    """Losslessly recompress ``path`` in place unless its content matches ``known_digest``.
+
+    Returns ``(path, content digest)``.
+    """
+    from PIL import Image
+
+    source = Path(path)
+    if hashlib.sha256(source.read_bytes()).hexdigest() != known_digest:
+        optimized = source.with_name(source.name + '.tmp')
+        if source.suffix.lower() == '.png':
+            with Image.open(source) as image:
+                image.load()
+                image.save(optimized, format='PNG', optimize=True, icc_profile=image.info.get('icc_profile'))
+            _keep_smaller(source, optimized)
+        elif jpegtran:
+            subprocess.run(
+                [jpegtran, '-copy', 'icc', '-optimize', '-progressive', '-outfile', str(optimized), str(source)],
+                check=True,
+            )
+            _keep_smaller(source, optimized)
+    return path, hashlib.sha256(source.read_bytes()).hexdigest()
+
+
+def write_webp(path: str) -> bool:
+    """Write ``path.webp`` if it comes out smaller than ``path``; return whether a sibling exists."""
+    from PIL import Image
+
+    source = Path(path)
+    target = source.with_name(source.name + '.webp')
+    if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+        return True
+    with Image.open(source) as image:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+        if source.suffix.lower() == '.png':
+            image.save(target, format='WEBP', lossless=True, method=6)
+        else:
+            image.save(target, format='WEBP', quality=WEBP_QUALITY, method=6)
+    # nginx only prefers the sibling when it is actually smaller
+    if target.stat().st_size >= source.stat().st_size:
+        target.unlink()
+        return False
+    return True
+
+
+def _workers(workers=None) -> int:
+    return workers or getattr(settings, 'STATIC_COMPRESS_WORKERS', None) or os.cpu_count()
+
+
+def optimize_images(root: Path, paths, workers=None) -> int:
+    """Recompress the changed images among ``paths`` in parallel; return how many were checked."""
+    digests_path = root / IMAGE_DIGESTS_NAME
+    try:
+        known = json.loads(digests_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        known = {}
+    jpegtran = shutil.which('jpegtran')
+    if not jpegtran:
+        logger.info('jpegtran not found; collected JPEGs are not recompressed')
+    paths = list(paths)
+    with ProcessPoolExecutor(max_workers=_workers(workers)) as executor:
+        results = executor.map(
+            optimize_image, paths, [known.get(path) for path in paths], [jpegtran] * len(paths), chunksize=8
+        )
+        known.update(results)
+    digests_path.write_text(json.dumps(known, sort_keys=True), encoding='utf-8')
+    return len(paths)
+
+
+def write_webp_tree(root: Path, workers=None) -> int:
+    """Write ``.webp`` siblings for every image under ``root`` in parallel; return how many exist."""
+    paths = [str(path) for path in root.rglob('*') if path.suffix.lower() in WEBP_SOURCES and path.is_file()]
+    with ProcessPoolExecutor(max_workers=_workers(workers)) as executor:
+        return sum(executor.map(write_webp, paths, chunksize=8))
+
+
+def compressible_files(root: Path):
+    for path in root.rglob('*'):
+        if path.name == DIGESTS_NAME or path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        if path.is_file() and path.stat().st_size >= MIN_COMPRESS_SIZE:
+            yield str(path)
+
+
+def compress_tree(root: Path, workers=None) -> int:
+    """Precompress every changed text asset under ``root`` in parallel; return how many siblings were written."""
+    digests_path = root / DIGESTS_NAME
+    try:
+        known = json.loads(digests_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        known = {}
+    paths = list(compressible_files(root))
+    digests = {}
+    written = 0
+    with ProcessPoolExecutor(max_workers=_workers(workers)) as executor:
+        results = executor.map(compress_file, paths, [known.get(path) for path in paths], chunksize=8)
+        for path, digest, count in results:
+            digests[path] = digest
+            written += count
+    digests_path.write_text(json.dumps(digests, sort_keys=True), encoding='utf-8')
+    return written
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """``ManifestStaticFilesStorage`` that also writes ``.gz``/``.br`` siblings for nginx."""
+
+    # The theme's minified files point at .map files it never shipped
+    patterns = tuple(
+        (glob, tuple(pattern for pattern in file_patterns if 'sourceMappingURL' not in str(pattern)))
+        for glob, file_patterns in ManifestStaticFilesStorage.patterns
+    )
+
+    def post_process(self, paths, dry_run=False, **options):
+        optimize = not dry_run and getattr(settings, 'STATIC_OPTIMIZE_IMAGES', False)
+        if optimize:
+            # Before hashing, so the fingerprints and copies carry the recompressed bytes
+            images = [name for name in paths if Path(name).suffix.lower() in WEBP_SOURCES]
+            optimize_images(Path(self.location), [self.path(name) for name in images])
+            # Hashing reads each file from the storage it was found in; read the recompressed copies instead
+            paths = {**paths, **{name: (self, name) for name in images}}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            if optimize:
+                self.webp_count = write_webp_tree(Path(self.location))
+            self.compressed_count = compress_tree(Path(self.location))
@@ -0,0 +1,193 @@
+"""Per-worker prefix index behind ``/search/suggest/`` (header search type-ahead).
+
+Every worker holds a sorted list of ``(key, kind, pk)`` entries, one per
+word of each title, so ``bisect`` finds prefix matches at any word without
+touching the database. Edits are published to the cache as numbered change
+records (see ``charity.signals``). Each worker checks the shared version
+counter at most every ``SUGGEST_VERSION_CHECK_INTERVAL`` seconds and
+applies the records it missed. It rebuilds from the database only on first
+use, or when records have expired or the counter went backwards.
+"""
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Club, Mentor, Opportunity, Program, Project, School
+
+# kind -> (model, title field, URL name, URL kwarg or None, filter for public rows)
+SUGGEST_SOURCES = {
+    'project': (Project, 'title', 'charity:project_detail', 'project_id', {}),
+    'program': (Program, 'title', 'charity:program_detail', 'program_id', {}),
+    'club': (Club, 'title', 'charity:club_detail', 'club_id', {}),
+    'school': (School, 'name', 'charity:school_detail', 'school_id', {}),
+    'opportunity': (Opportunity, 'title', 'charity:opportunity_detail', 'opp_id', {'is_published': True}),
+    # Mentors have no page of their own; they are listed on the about page
+    'mentor': (Mentor, 'name', 'charity:about', None, {}),
+}
+
+KIND_FOR_MODEL = {source[0]: kind for kind, source in SUGGEST_SOURCES.items()}
+
+VERSION_KEY = 'charity:suggest:version'
+CHANGE_KEY = 'charity:suggest:change:{version}'
+CHANGE_TIMEOUT = 60 * 60 * 24
+MAX_RESULTS = 8
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Lower-case, strip accents and collapse punctuation to single spaces."""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def _keys(title: str):
+    """Yield the normalised title from each word onwards, e.g. ``solar water``, ``water``."""
+    words = normalize(title).split()
+    for start in range(len(words)):
+        yield ' '.join(words[start:])
+
+
+def _url(kind: str, pk) -> str:
+    _, _, url_name, url_kwarg, _ = SUGGEST_SOURCES[kind]
+    return reverse(url_name, kwargs={url_kwarg: pk}) if url_kwarg else reverse(url_name)
+
+
+def _check_interval() -> float:
+    return getattr(settings, 'SUGGEST_VERSION_CHECK_INTERVAL', 1.0)
+
+
+def current_version() -> int:
+    return cache.get(VERSION_KEY) or 0
+
+
+def change_for(obj, deleted: bool = False):
+    """Return the ``(kind, pk, title)`` record for an edit to ``obj`` (``title`` None removes it)."""
+    kind = KIND_FOR_MODEL.get(type(obj))
+    if kind is None:
+        return None
+    _, title_field, _, _, public = SUGGEST_SOURCES[kind]
+    hidden = deleted or any(getattr(obj, name) != value for name, value in public.items())
+    return (kind, obj.pk, None if hidden else getattr(obj, title_field))
+
+
+def publish_change(change) -> None:
+    """Store ``change`` under the next version number so every worker can apply it."""
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        # The counter was evicted between add() and incr(); workers will rebuild
+        cache.set(VERSION_KEY, 1, None)
+        version = 1
+    cache.set(CHANGE_KEY.format(version=version), change, CHANGE_TIMEOUT)
+
+
+class PrefixIndex:
+    """Sorted word-prefix entries plus the title and URL of every indexed object.
+
+    ``data`` holds ``(entries, documents)``. Writers build new copies under
+    ``lock`` and publish them with a single assignment, so ``lookup`` reads a
+    consistent pair without locking.
+    """
+
+    def __init__(self):
+        self.data = ([], {})
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _add(entries, documents, kind, pk, title) -> None:
+        documents[(kind, pk)] = (title, _url(kind, pk))
+        for key in _keys(title):
+            insort(entries, (key, kind, pk))
+
+    @staticmethod
+    def _remove(entries, documents, kind, pk) -> None:
+        document = documents.pop((kind, pk), None)
+        if document is None:
+            return
+        for key in _keys(document[0]):
+            position = bisect_left(entries, (key, kind, pk))
+            if position < len(entries) and entries[position] == (key, kind, pk):
+                del entries[position]
+
+    def rebuild(self, version: int) -> None:
+        documents = {}
+        for kind, (model, title_field, _, _, public) in SUGGEST_SOURCES.items():
+            for pk, title in model.objects.filter(**public).values_list('pk', title_field).iterator():
+                documents[(kind, pk)] = (title, _url(kind, pk))
+        entries = sorted(
+            (key, kind, pk) for (kind, pk), (title, _) in documents.items() for key in _keys(title)
+        )
+        self.data = (entries, documents)
+        self.version = version
+
+    def apply(self, changes) -> None:
+        """Apply ``(kind, pk, title)`` records to copies of the index, then publish them."""
+        entries, documents = self.data
+        entries, documents = list(entries), dict(documents)
+        for kind, pk, title in changes:
+            self._remove(entries, documents, kind, pk)
+            if title:
+                self._add(entries, documents, kind, pk, title)
+        self.data = (entries, documents)
+
+    def refresh(self) -> None:
+        """Bring the index up to the cache's version, at most once per check interval."""
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < _check_interval():
+            return
+        with self.lock:
+            self.checked_at = now
+            version = current_version()
+            if self.version == version:
+                return
+            if self.version is None or version < self.version:
+                self.rebuild(version)
+                return
+            keys = [CHANGE_KEY.format(version=number) for number in range(self.version + 1, version + 1)]
+            changes = cache.get_many(keys)
+            if len(changes) != len(keys):
+                self.rebuild(version)
+                return
+            self.apply(changes[key] for key in keys)
+            self.version = version
+
+    def lookup(self, query: str, limit: int = MAX_RESULTS) -> list:
+        """Return up to ``limit`` ``{'title', 'kind', 'url'}`` dicts whose title has a word starting with ``query``."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        entries, documents = self.data
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and len(results) < limit:
+            key, kind, pk = entries[position]
+            if not key.startswith(prefix):
+                break
+            position += 1
+            if (kind, pk) in seen:
+                continue
+            seen.add((kind, pk))
+            document = documents.get((kind, pk))
+            if document is not None:
+                results.append({'title': document[0], 'kind': kind, 'url': document[1]})
+        return results
+
+
+index = PrefixIndex()
+
+
+def suggestions(query: str, limit: int = MAX_RESULTS) -> list:
+    index.refresh()
+    return index.lookup(query, limit)
@@ -0,0 +1,55 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from charity import bundles
+
+register = template.Library()
+
+
+def _url_name(context) -> str:
+    request = context.get('request')
+    match = getattr(request, 'resolver_match', None)
+    return match.url_name if match else ''
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """
+    Inline the current page's critical CSS, if ``build_bundles --critical`` produced any.
+
+    Example:
+    {% critical_css %} -> "<style>…</style>"
+    """
+    css = bundles.critical_css(_url_name(context))
+    if not css:
+        return ''
+    context.render_context['critical_css_inlined'] = True
+    # Built from our own static files; only stop it from closing the element early
+    return mark_safe('<style>' + css.replace('</', '<\\/') + '</style>')
+
+
+@register.simple_tag(takes_context=True)
+def bundle(context, name):
+    """
+    Link a CSS or JS bundle from ``charity.bundles.BUNDLES``.
+
+    Example:
+    {% bundle 'site.css' %} -> '<link rel="stylesheet" href="/static/assets/bundles/site.3f2a9c1b7d4e.css">'
+
+    Falls back to one tag per source file until the bundle is built. After
+    ``{% critical_css %}`` has inlined a page's critical rules, stylesheets
+    load without blocking render.
+    """
+    path = bundles.bundle_path(name)
+    urls = [static(path)] if path else [static(source) for source in bundles.BUNDLES[name]]
+    if name.endswith('.js'):
+        return format_html_join('\n', '<script src="{}"></script>', ((url,) for url in urls))
+    if path and context.render_context.get('critical_css_inlined'):
+        return format_html(
+            '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+            urls[0],
+        )
+    return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((url,) for url in urls))
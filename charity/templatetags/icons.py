@@ -0,0 +1,16 @@
+from django import template
+
+from charity import icons
+
+register = template.Library()
+
+
+@register.simple_tag
+def icon_stylesheet_url():
+    """
+    URL of the Font Awesome subset built by ``manage.py subset_icons``, or '' before the first build.
+
+    Example:
+    {% icon_stylesheet_url as icon_css %} -> "/media/icons/icons.3f2a9c1b7d4e.css"
+    """
+    return icons.stylesheet_url()
@@ -0,0 +1,79 @@
+from django import template
+from django.core.files.storage import FileSystemStorage
+from django.utils.html import format_html, format_html_join
+
+from charity import images, media_resize
+
+register = template.Library()
+
+DEFAULT_SIZES = '100vw'
+
+
+def _srcset(file, widths, fmt):
+    return ', '.join(
+        f'{file.storage.url(images.variant_name(file.name, width, fmt))} {width}w' for width in widths
+    )
+
+
+def _resize_srcset(file):
+    return ', '.join(f'{media_resize.resize_url(file.name, width)} {width}w' for width in images.variant_widths())
+
+
+@register.simple_tag
+def responsive_image(file, sizes=DEFAULT_SIZES, **attrs):
+    """
+    Render an uploaded image with AVIF/WebP ``srcset`` candidates.
+
+    Example:
+    {% responsive_image project.image sizes="(max-width: 767px) 100vw, 33vw" alt=project.title class="project-main-image" %}
+
+    Extra keyword arguments become ``<img>`` attributes; ``loading="lazy"`` and
+    ``decoding="async"`` are the defaults (pass ``loading="eager"`` above the
+    fold). Once the variants exist the ``<img>`` also gets ``width``/``height``,
+    so the browser reserves its box, and a blurred placeholder background.
+    Until then (uploads from before variants existed, say) the ``<img>`` gets
+    a ``srcset`` of signed ``/media-resize/`` copies instead.
+    """
+    manifest = images.manifest(file.name)
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    if not manifest and isinstance(file.storage, FileSystemStorage):
+        attrs.setdefault('srcset', _resize_srcset(file))
+        attrs.setdefault('sizes', sizes)
+    if manifest:
+        attrs.setdefault('width', manifest['width'])
+        attrs.setdefault('height', manifest['height'])
+    if manifest.get('placeholder'):
+        attrs['style'] = f"background: center / cover no-repeat url({manifest['placeholder']}); {attrs.get('style', '')}".strip()
+    img = format_html(
+        '<img src="{}" {}>',
+        file.url,
+        format_html_join(' ', '{}="{}"', ((name, value) for name, value in attrs.items() if value is not None)),
+    )
+    formats = manifest.get('formats')
+    if not formats:
+        return img
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (images.FORMATS[fmt][0], _srcset(file, formats[fmt], fmt), sizes)
+            for fmt in images.FORMATS if formats.get(fmt)
+        ),
+    )
+    # display: contents keeps <picture> out of layout, so card CSS still sizes the <img>
+    return format_html('<picture style="display: contents">{}{}</picture>', sources, img)
+
+
+@register.filter
+def resized(file, size):
+    """
+    Signed URL for a resized copy of an existing media file.
+
+    Example:
+    {{ photo.image|resized:"640x0" }} -> "/media-resize/640x0/gallery/photo.jpg?s=..."
+    """
+    if not file:
+        return ''
+    width, _, height = str(size).partition('x')
+    return media_resize.resize_url(file.name, int(width), int(height or 0))
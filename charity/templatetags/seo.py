@@ -0,0 +1,23 @@
+from django import template
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+
+from charity import seo
+from charity.context_processors import absolute_url
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def site_jsonld(context):
+    """
+    Organization and WebSite JSON-LD for the current host, serialised once per host.
+
+    Example:
+    {% site_jsonld %} -> '<script type="application/ld+json">{"@context": …}</script>…'
+    """
+    base_url = absolute_url(context['request'], '')
+    return format_html_join(
+        '\n', '<script type="application/ld+json">{}</script>',
+        ((mark_safe(document),) for document in seo.site_jsonld(base_url)),
+    )
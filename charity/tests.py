@@ -1,3 +1,561 @@
-from django.test import TestCase
+import datetime
+import html
+import re
+import tempfile
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from PIL import Image
+
+from . import facets, icons, search_index, signals, snapshots, suggest
+from .models import Article, Category, Club, Opportunity, Photo, Project, ProjectAchievement, ProjectMembership, School, SpotlightCategory, TeamMember
+from .pagination import KeysetPaginator
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DetailPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('member', password='x')
+        cls.project = Project.objects.create(category=Category.objects.create(name='Health'), title='Clean Water')
+        ProjectMembership.objects.create(project=cls.project, user=cls.user)
+        cls.school = School.objects.create(name='Hill School')
+        Club.objects.create(school=cls.school, title='Science Club', member_count=12)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_pages_render_and_revalidate(self):
+        for url in (
+            reverse('charity:project_detail', args=[self.project.pk]),
+            reverse('charity:school_detail', args=[self.school.pk]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, secure=True)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('ETag'))
+                response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_editing_related_rows_changes_etag(self):
+        achievement = ProjectAchievement.objects.create(project=self.project, title='Wells dug', value='3')
+        url = reverse('charity:project_detail', args=[self.project.pk])
+        etag = self.client.get(url, secure=True)['ETag']
+        achievement.value = '4'
+        achievement.save()
+        response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_rendered_names_change_etag(self):
+        project_url = reverse('charity:project_detail', args=[self.project.pk])
+        article = Article.objects.create(title='Wells', author=self.user, content='-')
+        article_url = reverse('charity:article_details', args=[article.pk])
+        membership = ProjectMembership.objects.get(user=self.user)
+        category = self.project.category
+
+        def rename_member():
+            self.user.first_name = 'Ann'
+            self.user.save()
+
+        def change_role():
+            membership.role = 'mentor'
+            membership.save()
+
+        def rename_category():
+            category.name = 'Public Health'
+            category.save()
+
+        for edit in (rename_member, change_role, rename_category):
+            with self.subTest(edit=edit.__name__):
+                etag = self.client.get(project_url, secure=True)['ETag']
+                edit()
+                self.assertEqual(self.client.get(project_url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(article_url, secure=True)['ETag']
+        self.user.last_name = 'Lee'
+        self.user.save()
+        response = self.client.get(article_url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Ann Lee')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ResponsiveImageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.TemporaryDirectory()
+        resize_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.addCleanup(resize_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name, MEDIA_RESIZE_ROOT=resize_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        (Path(media_root.name) / 'photos').mkdir()
+        Image.new('RGB', (1200, 800), 'teal').save(Path(media_root.name) / 'photos' / 'legacy.jpg')
+
+    def test_upload_without_variants_uses_resize_endpoint(self):
+        photo = Photo(image='photos/legacy.jpg', title='Legacy')
+        rendered = Template('{% load images %}{% responsive_image photo.image alt=photo.title %}').render(
+            Context({'photo': photo})
+        )
+        srcset = html.unescape(re.search(r'srcset="([^"]+)"', rendered).group(1))
+        url = srcset.split(', ')[0].split(' ')[0]
+        self.assertIn('/media-resize/', url)
+        response = self.client.get(url, secure=True, HTTP_ACCEPT='image/webp')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        response.close()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Education')
+        cls.users = [get_user_model().objects.create_user(f'user{i}', password='x') for i in range(3)]
+
+    def assertCounts(self, obj, **expected):
+        obj.refresh_from_db()
+        self.assertEqual({name: getattr(obj, name) for name in expected}, expected)
+
+    def test_membership_create_delete_and_move(self):
+        first = Project.objects.create(category=self.category, title='Reading')
+        second = Project.objects.create(category=self.category, title='Maths')
+        memberships = [ProjectMembership.objects.create(project=first, user=user) for user in self.users]
+        self.assertCounts(first, members_count=3)
+
+        memberships[0].project = second
+        memberships[0].save()
+        self.assertCounts(first, members_count=2)
+        self.assertCounts(second, members_count=1)
+
+        memberships[1].role = 'mentor'
+        memberships[1].save(update_fields=['role'])
+        self.assertCounts(first, members_count=2)
+
+        memberships[2].delete()
+        self.assertCounts(first, members_count=1)
+        ProjectMembership.objects.filter(project=first).delete()
+        self.assertCounts(first, members_count=0)
+
+    def test_club_create_delete_move_and_member_count(self):
+        hill = School.objects.create(name='Hill')
+        vale = School.objects.create(name='Vale')
+        chess = Club.objects.create(school=hill, title='Chess', member_count=10)
+        Club.objects.create(school=hill, title='Drama', member_count=5)
+        Club.objects.create(title='Unattached', member_count=7)
+        self.assertCounts(hill, clubs_count=2, club_members_count=15)
+
+        chess.member_count = 12
+        chess.save()
+        self.assertCounts(hill, clubs_count=2, club_members_count=17)
+
+        chess.school = vale
+        chess.save()
+        self.assertCounts(hill, clubs_count=1, club_members_count=5)
+        self.assertCounts(vale, clubs_count=1, club_members_count=12)
+
+        Club.objects.filter(school=hill).delete()
+        self.assertCounts(hill, clubs_count=0, club_members_count=0)
+        chess.delete()
+        self.assertCounts(vale, clubs_count=0, club_members_count=0)
+
+    def test_recount_rebuilds_drifted_counters(self):
+        project = Project.objects.create(category=self.category, title='Science')
+        for user in self.users[:2]:
+            ProjectMembership.objects.create(project=project, user=user)
+        school = School.objects.create(name='Ridge')
+        Club.objects.create(school=school, title='Robotics', member_count=4)
+        # Queryset updates bypass save(), so the counters drift
+        Club.objects.update(member_count=9)
+        Project.objects.update(members_count=40)
+
+        call_command('recount', stdout=StringIO())
+        self.assertCounts(project, members_count=2)
+        self.assertCounts(school, clubs_count=1, club_members_count=9)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Arts')
+        Project.objects.bulk_create(Project(category=category, title=f'Project {i}') for i in range(11))
+        # Tied sort values: the trailing id keeps the order total
+        Project.objects.filter(pk__in=Project.objects.order_by('pk').values('pk')[:6]).update(
+            created_at=Project.objects.order_by('pk').first().created_at
+        )
+        cls.expected = list(Project.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def page(self, **params):
+        paginator = KeysetPaginator(Project.objects.all(), 4, ('-created_at', '-id'), count_key='test-projects')
+        return paginator.page_from_request(self.factory.get('/projects/', params))
+
+    def test_cursors_walk_every_row_once_in_order(self):
+        page = self.page()
+        seen, pages = [obj.pk for obj in page], [page]
+        while page.has_next():
+            page = self.page(cursor=page.next_cursor)
+            seen.extend(obj.pk for obj in page)
+            pages.append(page)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([p.start_index for p in pages], [1, 5, 9])
+        self.assertEqual(pages[-1].end_index, 11)
+
+        back = self.page(cursor=pages[-1].previous_cursor)
+        self.assertEqual([obj.pk for obj in back], self.expected[4:8])
+        self.assertEqual(back.start_index, 5)
+
+    def test_cursors_keep_microseconds(self):
+        # Rows less than a millisecond apart: a rounded cursor would skip or repeat some
+        base = Project.objects.order_by('pk').first().created_at.replace(microsecond=0)
+        for i, pk in enumerate(Project.objects.order_by('pk').values_list('pk', flat=True)):
+            Project.objects.filter(pk=pk).update(created_at=base + datetime.timedelta(microseconds=100 * i + 1))
+        expected = list(Project.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        page = self.page()
+        seen = [obj.pk for obj in page]
+        # Bounded: a cursor that rounds down can return the same page forever
+        for _ in range(len(expected)):
+            if not page.has_next():
+                break
+            page = self.page(cursor=page.next_cursor)
+            seen.extend(obj.pk for obj in page)
+        self.assertEqual(seen, expected)
+
+    def test_last_page_legacy_numbers_and_bad_cursors(self):
+        last = self.page(cursor=self.page().last_cursor)
+        self.assertEqual([obj.pk for obj in last], self.expected[-4:])
+        self.assertFalse(last.has_next())
+
+        self.assertEqual([obj.pk for obj in self.page(page='2')], self.expected[4:8])
+        self.assertEqual([obj.pk for obj in self.page(page='99')], self.expected[-4:])
+        for cursor in ('not-a-cursor', 'eyJkIjoibiJ9'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([obj.pk for obj in self.page(cursor=cursor)], self.expected[:4])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Environment')
+        cls.project = Project.objects.create(category=cls.category, title='Tree Planting')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('charity:projects')
+
+    def get(self, **extra):
+        return self.client.get(self.url, secure=True, **extra)
+
+    def test_anonymous_pages_are_cached_until_a_model_changes(self):
+        self.assertEqual(self.get()['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Page-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(category=self.category, title='Beach Cleanup')
+        response = self.get()
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Beach Cleanup')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        response = self.get()
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotContains(response, 'Tree Planting')
+
+    def test_visitors_with_a_session_skip_the_cache(self):
+        self.get()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = 'visitor'
+        self.assertFalse(self.get().has_header('X-Page-Cache'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DerivedFieldTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username='ann', first_name='Ann', last_name='Lee')
+        cls.article = Article.objects.create(title='Spring Update', author=cls.user, content='<p>Hello</p>')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_renaming_an_author_updates_articles_and_caches(self):
+        self.assertEqual(self.article.author_name, 'Ann Lee')
+        version = snapshots.home_snapshot_version()
+        url = reverse('charity:articles')
+        self.client.get(url, secure=True)
+        self.assertEqual(self.client.get(url, secure=True)['X-Page-Cache'], 'HIT')
+
+        self.user.last_name = 'Smith'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.author_name, 'Ann Smith')
+        self.assertNotEqual(snapshots.home_snapshot_version(), version)
+        self.assertEqual(self.client.get(url, secure=True)['X-Page-Cache'], 'MISS')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SUGGEST_VERSION_CHECK_INTERVAL=0)
+class SuggestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Environment')
+        cls.project = Project.objects.create(category=cls.category, title='Solar Water Pumps')
+        Opportunity.objects.create(title='Solar Technician', description='-', is_published=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, index, query):
+        return [result['title'] for result in index.lookup(query)]
+
+    def test_lookup_matches_the_start_of_any_word(self):
+        index = suggest.PrefixIndex()
+        index.refresh()
+        self.assertEqual(self.titles(index, 'sol'), ['Solar Water Pumps'])
+        self.assertEqual(self.titles(index, 'WÄTER p'), ['Solar Water Pumps'])
+        self.assertEqual(self.titles(index, 'olar'), [])
+        self.assertEqual(self.titles(index, '!!'), [])
+        self.assertEqual(index.lookup('pumps')[0]['url'], reverse('charity:project_detail', args=[self.project.pk]))
+
+    def test_workers_apply_published_changes(self):
+        index = suggest.PrefixIndex()
+        index.refresh()
+        entries, documents = index.data
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(category=self.category, title='Solar Lanterns')
+            self.project.title = 'Clean Water Pumps'
+            self.project.save()
+        index.refresh()
+        self.assertEqual(index.version, suggest.current_version())
+        self.assertEqual(self.titles(index, 'solar'), ['Solar Lanterns'])
+        self.assertEqual(self.titles(index, 'clean'), ['Clean Water Pumps'])
+        # Changes are applied to copies; readers of the old lists are unaffected
+        self.assertIn(('solar water pumps', 'project', self.project.pk), entries)
+        self.assertNotIn('solar lanterns', [key for key, _, _ in entries])
+        self.assertEqual(len(documents), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        index.refresh()
+        self.assertEqual(self.titles(index, 'water'), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IconSubsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.storage = FileSystemStorage(location=root.name, base_url='/media/')
+
+    def test_every_icon_the_pages_render_is_in_the_subset(self):
+        TeamMember.objects.create(name='Ann', title='Lead', social_links={'github': 'https://github.com/ann'})
+        data = icons.build(self.storage)
+        with self.storage.open(data['css']) as fh:
+            css = fh.read().decode('utf-8')
+        for name in ('about', 'opportunities'):
+            page = self.client.get(reverse(f'charity:{name}'), secure=True).content.decode('utf-8')
+            used = {name for name in icons.ICON_CLASS.findall(page) if name.startswith('fa-')}
+            self.assertEqual(used - set(data['icons']), set(), name)
+        for name in ('fa-hand-holding-usd', 'fa-user-graduate', 'fa-github'):
+            self.assertIn(f'.{name}', css)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class HomeSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        (Path(media_root.name) / 'photos').mkdir()
+        Image.new('RGB', (64, 48), 'teal').save(Path(media_root.name) / 'photos' / 'camp.jpg')
+
+    def required_fields(self, model):
+        """Minimal field values for a row of ``model``."""
+        category = Category.objects.get_or_create(name='Environment')[0]
+        return {
+            'Article': lambda: {'title': 'A', 'content': '-', 'author': get_user_model().objects.create(username='ann')},
+            'Category': lambda: {'name': 'Health'},
+            'Club': lambda: {'title': 'Chess'},
+            'Donation': lambda: {'title': 'Books'},
+            'Impact': lambda: {'title': 'Reach', 'description': '-'},
+            'ImpactCounter': lambda: {'title': 'Trees', 'target_number': 10},
+            'Mentor': lambda: {'title': 'Coach'},
+            'Opportunity': lambda: {'title': 'Intern', 'description': '-'},
+            'Photo': lambda: {'title': 'Camp', 'image': 'photos/camp.jpg'},
+            'Program': lambda: {'title': 'Reading', 'category': category},
+            'Project': lambda: {'title': 'Wells', 'category': category},
+            'Resource': lambda: {'title': 'Guide', 'file': 'resources/guide.pdf'},
+            'School': lambda: {'name': 'Hillside'},
+            'SpotlightCategory': lambda: {'name': 'clubs', 'title': 'Clubs'},
+            'SpotlightItem': lambda: {
+                'title': 'Debate', 'description': '-',
+                'category': SpotlightCategory.objects.create(name='schools', title='Schools'),
+            },
+            'SpotlightStats': lambda: {'title': 'Clubs', 'value': '12', 'description': '-'},
+            'TeamMember': lambda: {'name': 'Ann', 'title': 'Lead'},
+            'VoiceOfChange': lambda: {'name': 'Joy', 'title': 'Student'},
+        }[model.__name__]()
+
+    def assertBumps(self, action, msg):
+        version = snapshots.home_snapshot_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            action()
+        self.assertNotEqual(snapshots.home_snapshot_version(), version, msg)
+
+    def test_saving_or_deleting_any_snapshot_model_bumps_the_version(self):
+        for model in signals.HOME_SNAPSHOT_MODELS:
+            with self.subTest(model=model.__name__):
+                obj = model(**self.required_fields(model))
+                self.assertBumps(obj.save, f'{model.__name__} created')
+                self.assertBumps(obj.save, f'{model.__name__} saved')
+                self.assertBumps(obj.delete, f'{model.__name__} deleted')
+
+    def test_home_page_shows_saved_rows(self):
+        self.client.get(reverse('charity:home'), secure=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            TeamMember.objects.create(name='Grace Auma', title='Volunteer lead')
+        self.assertContains(self.client.get(reverse('charity:home'), secure=True), 'Grace Auma')
+
+    def test_bulk_write_commands_bump_the_version(self):
+        for command in ('fill_derived_fields', 'recount'):
+            version = snapshots.home_snapshot_version()
+            call_command(command, stdout=StringIO())
+            self.assertNotEqual(snapshots.home_snapshot_version(), version, command)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Environment')
+        cls.project = Project.objects.create(
+            category=cls.category, title='Solar Water Pumps', description='<p>Clean <b>water</b> for villages</p>',
+        )
+
+    def titles(self, query):
+        return [document.title for document in search_index.SearchResults(query)[0:20]]
+
+    def test_saves_and_deletes_keep_the_index_current(self):
+        self.assertEqual(self.titles('villages'), ['Solar Water Pumps'])
+        self.assertEqual(self.titles('sol'), ['Solar Water Pumps'])
+        document = search_index.SearchResults('villages')[0]
+        self.assertEqual(document.body, 'Clean water for villages')
+        self.assertEqual(document.url, reverse('charity:project_detail', args=[self.project.pk]))
+
+        self.project.title = 'Wind Pumps'
+        self.project.save()
+        self.assertEqual(self.titles('solar'), [])
+        self.assertEqual(self.titles('wind'), ['Wind Pumps'])
+
+        opportunity = Opportunity.objects.create(title='Wind Technician', description='-')
+        self.assertEqual(self.titles('wind technician'), ['Wind Technician'])
+        opportunity.is_published = False
+        opportunity.save()
+        self.assertEqual(self.titles('technician'), [])
+
+        self.project.delete()
+        self.assertEqual(self.titles('wind'), [])
+
+    def test_results_count_rank_and_slice(self):
+        Project.objects.bulk_create(
+            Project(category=self.category, title=f'Garden {i}', description='Solar lamps') for i in range(5)
+        )
+        self.assertEqual(search_index.rebuild(), 6)
+        results = search_index.SearchResults('solar')
+        self.assertEqual(results.count(), 6)
+        self.assertEqual(len(results), 6)
+        # Title matches outrank body matches
+        self.assertEqual(results[0].title, 'Solar Water Pumps')
+        first, second = results[0:4], results[4:8]
+        self.assertEqual((len(first), len(second)), (4, 2))
+        self.assertEqual(len({document.pk for document in first + second}), 6)
+        for query in ('', '  ', '"*', 'nothing-like-this'):
+            with self.subTest(query=query):
+                self.assertEqual(search_index.SearchResults(query).count(), 0)
+                self.assertEqual(list(search_index.SearchResults(query)[0:10]), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OpportunityFacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        day = datetime.timedelta(days=1)
+        rows = (
+            ('Closed yesterday', 'job', cls.today - day),
+            ('Closes today', 'job', cls.today),
+            ('Closes tomorrow', 'grant', cls.today + day),
+            ('No deadline', 'grant', None),
+        )
+        now = timezone.now()
+        for age, (title, kind, deadline) in enumerate(rows):
+            opportunity = Opportunity.objects.create(title=title, opportunity_type=kind, description='-', deadline=deadline)
+            Opportunity.objects.filter(pk=opportunity.pk).update(posted_at=now - datetime.timedelta(hours=age))
+        Opportunity.objects.create(title='Draft', description='-', is_published=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, queryset):
+        return list(queryset.values_list('title', flat=True))
+
+    def test_counts_split_at_the_deadline_day(self):
+        counts = facets.opportunity_facets(self.today)
+        self.assertEqual(counts[''], {'total': 4, 'open': 3, 'closed': 1})
+        self.assertEqual(counts['job'], {'total': 2, 'open': 1, 'closed': 1})
+        self.assertEqual(counts['grant'], {'total': 2, 'open': 2, 'closed': 0})
+        self.assertEqual(facets.counts_for(counts, 'internship'), {'total': 0, 'open': 0, 'closed': 0})
+
+        # A deadline of today stays open until the day after
+        tomorrow = facets.opportunity_facets(self.today + datetime.timedelta(days=1))
+        self.assertEqual(tomorrow['job'], {'total': 2, 'open': 0, 'closed': 2})
+        self.assertEqual(tomorrow['grant'], {'total': 2, 'open': 2, 'closed': 0})
+
+    def test_edits_replace_the_cached_counts(self):
+        self.assertEqual(facets.opportunity_facets(self.today)['']['total'], 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            Opportunity.objects.filter(title='Draft').get().delete()
+            Opportunity.objects.create(title='Open role', description='-')
+        self.assertEqual(facets.opportunity_facets(self.today)[''], {'total': 5, 'open': 4, 'closed': 1})
+
+    def test_open_closed_and_open_first_ordering(self):
+        published = Opportunity.objects.published()
+        self.assertEqual(self.titles(published.open(self.today).order_by('-posted_at')),
+                         ['Closes today', 'Closes tomorrow', 'No deadline'])
+        self.assertEqual(self.titles(published.closed(self.today)), ['Closed yesterday'])
+        # Open postings first, newest first within each group
+        self.assertEqual(self.titles(published.open_first(self.today)),
+                         ['Closes today', 'Closes tomorrow', 'No deadline', 'Closed yesterday'])
+        self.assertEqual(self.titles(published.open_first(self.today + datetime.timedelta(days=1))),
+                         ['Closes tomorrow', 'No deadline', 'Closed yesterday', 'Closes today'])
+        self.assertEqual([o.is_open for o in published.open_first(self.today)], [True, True, True, False])
+
+    def test_board_filters_by_status(self):
+        url = reverse('charity:opportunities')
+        response = self.client.get(url, {'status': 'closed'}, secure=True)
+        self.assertEqual([o.title for o in response.context['opportunities']], ['Closed yesterday'])
+        response = self.client.get(url, {'status': 'open', 'type': 'job'}, secure=True)
+        self.assertEqual([o.title for o in response.context['opportunities']], ['Closes today'])
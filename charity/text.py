@@ -0,0 +1,43 @@
+"""Plain-text helpers for values stored alongside rich content fields."""
+import math
+import os
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 220
+WORDS_PER_MINUTE = 200
+
+
+def plain_text(html: str) -> str:
+    """``html`` without tags, with runs of whitespace collapsed."""
+    return ' '.join(strip_tags(html or '').split())
+
+
+def excerpt(html: str, length: int = EXCERPT_LENGTH) -> str:
+    return Truncator(plain_text(html)).chars(length)
+
+
+def reading_minutes(html: str) -> int:
+    """Estimated minutes to read ``html``, at least one."""
+    return max(1, math.ceil(len(plain_text(html).split()) / WORDS_PER_MINUTE))
+
+
+def file_size(size_bytes: int) -> str:
+    """``size_bytes`` as e.g. "512 B", "3.4 KB" or "1.2 MB"."""
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    if size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+def file_type(name: str) -> str:
+    """Upper-case extension of ``name``, or "FILE" when it has none."""
+    ext = os.path.splitext(name or '')[1].lstrip('.')
+    return ext.upper() if ext else "FILE"
+
+
+def lines(value: str) -> list:
+    """Non-blank lines of ``value``, stripped."""
+    return [line.strip() for line in (value or '').split('\n') if line.strip()]
@@ -34,6 +34,9 @@ urlpatterns = [
     path('error/', views.error_page, name='error'),
     path('impact/', views.impact, name='impact'),
     path('spotlight/', views.spotlight, name='spotlight'),
+    path('search/', views.search, name='search'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
+    path('media-resize/<int:width>x<int:height>/<path:path>', views.resized_media, name='media_resize'),
     
     # Opportunities (Admin managed)
     path('opportunities/', views.opportunities, name='opportunities'),
@@ -2,14 +2,19 @@
 from .models import Project, Club, Category, Program, School, VoiceOfChange, TeamMember, Donation, Mentor, Impact, ImpactCounter, ContactMessage, Article, Opportunity, SpotlightCategory, SpotlightItem, SpotlightStats, ProjectMembership, ProjectPhoto, ProjectAchievement, NewsletterSubscription, Resource, Photo
 from .forms import ProjectForm, ClubForm, ProgramForm, SchoolForm, NewsletterSubscriptionForm, OpportunityApplicationForm
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.contrib import messages
 from .forms import ArticleForm
+from . import conditional, facets, media_resize, page_data, search_index, snapshots, suggest
+from .conditional import conditional_page
+from .pagination import CountedPaginator, KeysetPaginator
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import Group
 from django.contrib.auth import login as auth_login
 from .forms import RegistrationForm
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.core.paginator import Paginator
+from django.utils import timezone
+from django.utils.http import urlencode
 
 def _is_member(user) -> bool:
     """Return True if user belongs to 'member' group."""
@@ -26,20 +31,11 @@ def about_us(request):
     return render(request, 'charity/about_us.html', context)
 
 def projects(request):
-    projects_list = Project.objects.all().prefetch_related('memberships').order_by('-created_at', 'title')
+    projects_list = Project.objects.select_related('category')
     
-    # Pagination - 6 projects per page
-    paginator = Paginator(projects_list, 6)
-    page = request.GET.get('page')
-    
-    try:
-        projects = paginator.page(page)
-    except PageNotAnInteger:
-        # If page is not an integer, deliver first page
-        projects = paginator.page(1)
-    except EmptyPage:
-        # If page is out of range, deliver last page
-        projects = paginator.page(paginator.num_pages)
+    # Keyset pagination - 6 per page, old ?page=N links still work
+    paginator = KeysetPaginator(projects_list, 6, ('-created_at', '-id'), count_key='projects')
+    projects = paginator.page_from_request(request)
     
     context = {
         'projects': projects,
@@ -47,6 +43,7 @@ def projects(request):
     }
     return render(request, 'charity/projects.html', context)
 
+@conditional_page(conditional.project_state)
 def project_detail(request, project_id):
     """Project details page"""
     project = get_object_or_404(Project, id=project_id)
@@ -96,20 +93,11 @@ def add_project(request):
     return render(request, 'charity/add_project.html', {'form': form})
 
 def clubs(request):
-    clubs_list = Club.objects.all().order_by('title')
+    clubs_list = Club.objects.select_related('school')
     
-    # Pagination - 6 clubs per page
-    paginator = Paginator(clubs_list, 6)
-    page = request.GET.get('page')
-    
-    try:
-        clubs = paginator.page(page)
-    except PageNotAnInteger:
-        # If page is not an integer, deliver first page
-        clubs = paginator.page(1)
-    except EmptyPage:
-        # If page is out of range, deliver last page
-        clubs = paginator.page(paginator.num_pages)
+    # Keyset pagination - 6 per page, old ?page=N links still work
+    paginator = KeysetPaginator(clubs_list, 6, ('title', 'id'), count_key='clubs')
+    clubs = paginator.page_from_request(request)
     
     context = {
         'clubs': clubs,
@@ -128,6 +116,7 @@ def add_club(request):
     return render(request, 'charity/add_club.html', {'form': form})
 
 
+@conditional_page(conditional.club_state)
 def club_detail(request, club_id):
     club = get_object_or_404(Club, id=club_id)
     context = {
@@ -158,6 +147,7 @@ def add_program(request):
         form = ProgramForm()
     return render(request, 'charity/add_program.html', {'form': form})
 
+@conditional_page(conditional.program_state)
 def program_detail(request, program_id):
     """Program details page"""
     program = get_object_or_404(Program, id=program_id)
@@ -174,20 +164,11 @@ def program_detail(request, program_id):
     return render(request, 'charity/program-details.html', context)
 
 def partner_schools(request):
-    schools_list = School.objects.all().order_by('name')
+    schools_list = School.objects.all()
     
-    # Pagination - 4 schools per page
-    paginator = Paginator(schools_list, 4)
-    page = request.GET.get('page')
-    
-    try:
-        schools = paginator.page(page)
-    except PageNotAnInteger:
-        # If page is not an integer, deliver first page
-        schools = paginator.page(1)
-    except EmptyPage:
-        # If page is out of range, deliver last page
-        schools = paginator.page(paginator.num_pages)
+    # Keyset pagination - 4 per page, old ?page=N links still work
+    paginator = KeysetPaginator(schools_list, 4, ('name', 'id'), count_key='partner_schools')
+    schools = paginator.page_from_request(request)
     
     context = {
         'schools': schools,
@@ -196,6 +177,7 @@ def partner_schools(request):
     return render(request, 'charity/partner_schools.html', context)
 
 
+@conditional_page(conditional.school_state)
 def school_detail(request, school_id):
     """School details page showing school info and associated clubs"""
     school = get_object_or_404(School, id=school_id)
@@ -211,44 +193,9 @@ def school_detail(request, school_id):
 # Home page views
 def home(request):
     """Main home page view"""
-    # Impact data
-    impact_sections = Impact.objects.filter(is_active=True).order_by('order', 'title')
-    impact_counters = ImpactCounter.objects.filter(is_active=True).order_by('order', 'title')
-
-    # Spotlight data
-    spotlight_categories = SpotlightCategory.objects.filter(is_active=True).order_by('order', 'name')
-    for category in spotlight_categories:
-        category.active_items = category.items.filter(is_active=True).order_by('order', '-achievement_score', 'title')
-    spotlight_stats = SpotlightStats.objects.filter(is_active=True).order_by('order', 'title')
-
     context = {
         'page_title': 'Home - YCBF Charity',
-        'youth_leaders': TeamMember.objects.all(),
-        'youth_projects': Project.objects.all(),
-        'testimonials': VoiceOfChange.objects.all(),
-        'mentors': Mentor.objects.all()[:6],  # Limit to 6 mentors for better display
-        # Aggregated sections for Home
-        'projects': Project.objects.all(),
-        'clubs': Club.objects.all(),
-        'categories': Category.objects.prefetch_related('programs').all(),
-        'schools': School.objects.all(),
-        'voices': VoiceOfChange.objects.all(),
-        'voices_of_change': VoiceOfChange.objects.all(),  # Add this for the testimonials section
-        'donations': Donation.objects.all(),
-        # Impact context
-        'impact': impact_sections,
-        'impact_counter': impact_counters,
-        # Spotlight context
-        'spotlight_categories': spotlight_categories,
-        'spotlight_stats': spotlight_stats,
-        # Blog (latest admin posts for News & Articles)
-'articles': Article.objects.filter(is_published=True).order_by('-date', '-created_at')[:6],
-        # Downloadable resources
-        'downloadable_resources': Resource.objects.all()[:6],  # Limit to 6 for home page
-        # Gallery
-'photos': Photo.objects.all()[:8],
-        # Opportunities (latest)
-        'opportunities': Opportunity.objects.filter(is_published=True).order_by('-posted_at')[:4],
+        **snapshots.get_home_snapshot(),
     }
     return render(request, 'charity/index.html', context)
 
@@ -256,33 +203,9 @@ def home(request):
 # Main pages
 def about(request):
     """About us page"""
-    # Spotlight metrics and donations to support dynamic sections
-    spotlight_stats = SpotlightStats.objects.filter(is_active=True).order_by('order', 'title')
-    
-    # Impact data
-    impact_sections = Impact.objects.filter(is_active=True).order_by('order', 'title')
-    impact_counters = ImpactCounter.objects.filter(is_active=True).order_by('order', 'title')
-    
     context = {
         'page_title': 'About Us - YCBF Charity',
-        'youth_leaders': TeamMember.objects.all(),
-        'testimonials': VoiceOfChange.objects.all(),
-        'youth_projects': Project.objects.all(),
-        'voices': VoiceOfChange.objects.all(),
-        'mentors': Mentor.objects.all()[:6],  # Add mentors to about page
-        # Add missing data for about page sections
-        'projects': Project.objects.all(),
-        'clubs': Club.objects.all(),
-        'categories': Category.objects.prefetch_related('programs').all(),
-        'schools': School.objects.all(),
-        # Downloadable resources
-        'downloadable_resources': Resource.objects.all(),
-        # Donations and Spotlight
-        'donations': Donation.objects.all(),
-        'spotlight_stats': spotlight_stats,
-        # Impact context
-        'impact': impact_sections,
-        'impact_counter': impact_counters,
+        **page_data.about_page_data(),
     }
     return render(request, 'charity/about.html', context)
 
@@ -351,21 +274,112 @@ def impact(request):
     }
     return render(request, 'charity/impact.html', context)
 
+# Site search
+def search(request):
+    """Ranked full-text search across projects, programs, clubs, schools, opportunities and articles"""
+    query = request.GET.get('q', '').strip()
+    results = None
+    if query:
+        paginator = Paginator(search_index.SearchResults(query), 10)
+        results = paginator.get_page(request.GET.get('page'))
+    context = {
+        'page_title': f'Search: {query} - YCBF Charity' if query else 'Search - YCBF Charity',
+        'query': query,
+        'page_query': urlencode({'q': query}),
+        'results': results,
+    }
+    return render(request, 'charity/search.html', context)
+
+def search_suggest(request):
+    """Type-ahead for the header search box, answered from the in-memory prefix index"""
+    query = request.GET.get('q', '').strip()[:100]
+    return JsonResponse({'query': query, 'results': suggest.suggestions(query)})
+
+def resized_media(request, width, height, path):
+    """Serve a signed, resized copy of an existing media image from the disk cache"""
+    try:
+        source = media_resize.source_file(width, height, path, request.GET.get('s', ''))
+    except media_resize.InvalidResize:
+        raise Http404('No such image')
+    fmt = media_resize.output_format(source, request.headers.get('Accept', ''))
+    name = media_resize.ensure_resized(source, width, height, fmt)
+    content_type = media_resize.OUTPUT_FORMATS[fmt][1]
+    if media_resize.accel_prefix():
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = media_resize.accel_prefix() + name
+    else:
+        response = FileResponse(open(media_resize.cache_root() / name, 'rb'), content_type=content_type)
+    response['Cache-Control'] = 'public, max-age=86400'
+    response['Vary'] = 'Accept'
+    return response
+
 # Opportunities pages (Admin managed)
+# (type, filter label, icon) for the opportunities board filter bar
+OPPORTUNITY_FILTERS = (
+    ('job', 'Jobs', 'fas fa-briefcase'),
+    ('scholarship', 'Scholarships', 'fas fa-graduation-cap'),
+    ('grant', 'Grants', 'fas fa-hand-holding-usd'),
+    ('internship', 'Internships', 'fas fa-user-graduate'),
+    ('volunteer', 'Volunteer', 'fas fa-hands-helping'),
+)
+OPPORTUNITY_STATUSES = (('', 'All'), ('open', 'Open'), ('closed', 'Closed'))
+
 def opportunities(request):
     """Opportunities listing page - Admin managed (jobs, scholarships, etc.)"""
-    opp_type = request.GET.get('type')
-    qs = Opportunity.objects.filter(is_published=True)
+    opp_type = request.GET.get('type', '')
+    if opp_type not in Opportunity.OpportunityType.values:
+        opp_type = ''
+    status = request.GET.get('status', '')
+    if status not in ('open', 'closed'):
+        status = ''
+
+    # Open/closed is decided in SQL; totals come from the cached facet counts
+    today = timezone.localdate()
+    opportunity_facets = facets.opportunity_facets(today)
+    qs = Opportunity.objects.published().defer('contact_email', 'updated_at')
     if opp_type:
         qs = qs.filter(opportunity_type=opp_type)
-    opportunities = qs.order_by('-posted_at')
+    if status == 'open':
+        qs = qs.open(today)
+    elif status == 'closed':
+        qs = qs.closed(today)
+    total = facets.counts_for(opportunity_facets, opp_type)[status or 'total']
+    paginator = CountedPaginator(qs.open_first(today), 10, count=total)
+    opportunities = paginator.get_page(request.GET.get('page'))
+
+    def query(**params):
+        return urlencode({name: value for name, value in params.items() if value})
+
+    type_filters = [
+        {
+            'label': label,
+            'icon': icon,
+            'count': facets.counts_for(opportunity_facets, value)[status or 'total'],
+            'query': query(type=value, status=status),
+            'active': value == opp_type,
+        }
+        for value, label, icon in (('', 'All', ''),) + OPPORTUNITY_FILTERS
+    ]
+    status_filters = [
+        {
+            'label': label,
+            'count': facets.counts_for(opportunity_facets, opp_type)[value or 'total'],
+            'query': query(type=opp_type, status=value),
+            'active': value == status,
+        }
+        for value, label in OPPORTUNITY_STATUSES
+    ]
     context = {
         'page_title': 'Opportunities - YCBF Charity',
         'opportunities': opportunities,
+        'type_filters': type_filters,
+        'status_filters': status_filters,
+        'page_query': query(type=opp_type, status=status),
     }
     return render(request, 'charity/opportunities.html', context)
 
 
+@conditional_page(conditional.opportunity_state)
 def opportunity_detail(request, opp_id: int):
     opp = get_object_or_404(Opportunity, id=opp_id, is_published=True)
     return render(request, 'charity/opportunity_detail.html', {
@@ -405,15 +419,26 @@ def blog_details(request, post_id):
 # Article pages (Member articles)
 def articles(request):
     """Article listing page - Member articles"""
-    articles = Article.objects.filter(is_published=True).order_by('-date', '-created_at')
+    articles_list = (
+        Article.objects.filter(is_published=True)
+        .only('id', 'title', 'image', 'date', 'created_at', 'excerpt', 'reading_time', 'author_name')
+    )
+
+    # Keyset pagination - 6 per page; the full content column is never loaded
+    paginator = KeysetPaginator(articles_list, 6, ('-date', '-created_at', '-id'), count_key='articles')
+    articles = paginator.page_from_request(request)
+    # The sidebar lists the newest three, which page one already holds
+    recent_articles = articles.object_list[:3] if not articles.has_previous() else articles_list.order_by('-date', '-created_at')[:3]
     context = {
         'page_title': 'Articles - YCBF Charity',
         'articles': articles,
+        'recent_articles': recent_articles,
         'is_member': _is_member(request.user),
         'is_authenticated': request.user.is_authenticated,
     }
     return render(request, 'charity/articles.html', context)
 
+@conditional_page(conditional.article_state)
 def article_details(request, post_id):
     """Article details - Member article"""
     article = get_object_or_404(Article, id=post_id, is_published=True)
@@ -477,9 +502,7 @@ def testimonial(request):
     """Testimonials page"""
     context = {
         'page_title': 'Testimonials - YCBF Charity',
-        'testimonials': VoiceOfChange.objects.all(),
-        'youth_leaders': TeamMember.objects.all(),
-        'youth_projects': Project.objects.all(),
+        **page_data.testimonial_page_data(),
     }
     return render(request, 'charity/testimonial.html', context)
 
@@ -532,26 +555,10 @@ def event_details(request, event_id):
 # Spotlight page
 def spotlight(request):
     """Spotlight page"""
-    # Filter active categories and their active items
-    spotlight_categories = SpotlightCategory.objects.filter(is_active=True).order_by('order', 'name')
-    
-    # Add active items to each category
-    for category in spotlight_categories:
-        category.active_items = category.items.filter(is_active=True).order_by('order', '-achievement_score', 'title')
-    
-    # Filter active statistics
-    spotlight_stats = SpotlightStats.objects.filter(is_active=True).order_by('order', 'title')
-    
-    # Debug: Check if data exists
-    print(f"Spotlight categories count: {spotlight_categories.count()}")
-    print(f"Spotlight stats count: {spotlight_stats.count()}")
-    for stat in spotlight_stats:
-        print(f"Stat: {stat.title} - {stat.value} - Active: {stat.is_active}")
-    
     context = {
         'page_title': 'Spotlight - YCBF Charity',
-        'spotlight_categories': spotlight_categories,
-        'spotlight_stats': spotlight_stats,
+        'spotlight_categories': page_data.spotlight_categories(),
+        'spotlight_stats': page_data.spotlight_stats(),
     }
     return render(request, 'charity/spotlight.html', context)
 
@@ -0,0 +1,35 @@
+"""Compile templates into the cached loader before a worker takes traffic.
+
+Called from ``post_worker_init`` in gunicorn.conf.py so that the first
+requests after each ``max_requests`` recycle don't pay the parse cost of
+``base.html``, ``index.html`` and the card partials.
+"""
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+
+def template_names(subdir: str = 'charity'):
+    """Yield loader names (e.g. ``charity/index.html``) for every template in ``subdir``."""
+    for base in settings.TEMPLATES[0]['DIRS']:
+        root = Path(base)
+        for path in sorted((root / subdir).rglob('*.html')):
+            yield path.relative_to(root).as_posix()
+
+
+def warm_templates(subdir: str = 'charity') -> list:
+    """Compile every template under ``subdir``; return ``(name, seconds)`` pairs, slowest first."""
+    engine = engines['django']
+    timings = []
+    for name in template_names(subdir):
+        started = time.perf_counter()
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            # Broken templates still fail loudly when a view renders them
+            continue
+        timings.append((name, time.perf_counter() - started))
+    timings.sort(key=lambda item: item[1], reverse=True)
+    return timings
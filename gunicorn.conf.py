@@ -20,3 +20,18 @@ max_requests_jitter = 100
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
+
+
+def post_worker_init(worker):
+    """Compile templates into the cached loader before this worker accepts requests."""
+    import time
+
+    from charity.warmup import warm_templates
+
+    started = time.perf_counter()
+    timings = warm_templates()
+    worker.log.info(
+        "Warmed %d templates in %.0f ms", len(timings), (time.perf_counter() - started) * 1000
+    )
+    for name, seconds in timings[:5]:
+        worker.log.info("  %s: %.1f ms", name, seconds * 1000)
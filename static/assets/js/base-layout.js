@@ -0,0 +1,255 @@
+// Header and mobile menu, notifications, header auto-hide, scroll-to-top fallback, WhatsApp button and dropdowns
+
+// Wait for the DOM to be fully loaded
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize variables
+    const mobileMenuToggle = document.getElementById('mobileMenuToggle');
+    const navbarCollapse = document.querySelector('.navbar-collapse');
+    const navbarBackdrop = document.querySelector('.navbar-backdrop');
+    const dropdownToggles = document.querySelectorAll('.dropdown-toggle');
+    // Side drawer elements
+    const sideDrawer = document.querySelector('.th-menu-area');
+    const mobileMenuCloseBtn = document.querySelector('.mobile-menu-close');
+
+    // Make sure elements exist before adding event listeners
+    if (mobileMenuToggle && sideDrawer && navbarBackdrop) {
+        // Open side drawer
+        function openSideMenu(e) {
+            if (e) { e.preventDefault(); e.stopPropagation(); }
+            // Ensure bootstrap collapse stays hidden on mobile
+            if (window.innerWidth <= 991.98 && navbarCollapse) {
+                navbarCollapse.classList.remove('show');
+            }
+            sideDrawer.classList.add('menu-active');
+            navbarBackdrop.classList.add('show');
+            document.body.classList.add('mobile-menu-open');
+            mobileMenuToggle.setAttribute('aria-expanded', 'true');
+        }
+
+        // Close side drawer
+        function closeMobileMenu() {
+            sideDrawer.classList.remove('menu-active');
+            navbarBackdrop.classList.remove('show');
+            document.body.classList.remove('mobile-menu-open');
+            mobileMenuToggle.setAttribute('aria-expanded', 'false');
+
+            // Close any open dropdowns inside the drawer
+            document.querySelectorAll('.th-menu-area .dropdown-menu').forEach(menu => {
+                menu.classList.remove('show');
+            });
+
+            dropdownToggles.forEach(toggle => {
+                toggle.setAttribute('aria-expanded', 'false');
+            });
+        }
+
+        // Toggle dropdown menus on mobile (navbar)
+        dropdownToggles.forEach(toggle => {
+            toggle.addEventListener('click', function(e) {
+                if (window.innerWidth <= 991.98) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    const dropdownMenu = this.nextElementSibling;
+                    const isExpanded = this.getAttribute('aria-expanded') === 'true';
+                    document.querySelectorAll('.dropdown-menu').forEach(menu => {
+                        if (menu !== dropdownMenu) menu.classList.remove('show');
+                    });
+                    if (dropdownMenu) {
+                        dropdownMenu.classList.toggle('show');
+                        this.setAttribute('aria-expanded', (!isExpanded).toString());
+                    }
+                }
+            });
+        });
+
+        // Drawer submenu toggling via caret button only (main link navigates)
+        document.querySelectorAll('.th-menu-area .drawer-caret').forEach(btn => {
+            btn.addEventListener('click', function(e) {
+                if (window.innerWidth <= 991.98) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    const li = this.closest('.menu-item-has-children');
+                    if (!li) return;
+                    const sub = li.querySelector('.sub-menu');
+                    if (!sub) return;
+                    const isOpen = sub.classList.contains('show');
+                    document.querySelectorAll('.th-menu-area .sub-menu.show').forEach(m => { if (m !== sub) m.classList.remove('show'); });
+                    if (!isOpen) {
+                        sub.classList.add('show');
+                        this.setAttribute('aria-expanded', 'true');
+                    } else {
+                        sub.classList.remove('show');
+                        this.setAttribute('aria-expanded', 'false');
+                    }
+                }
+            });
+        });
+
+        // Close menu when clicking outside (but NOT when clicking inside the side drawer)
+        document.addEventListener('click', function(e) {
+            if (window.innerWidth <= 991.98) {
+                const clickedInsideDrawer = e.target.closest('.th-menu-area');
+                const clickedToggle = e.target.closest('#mobileMenuToggle');
+                if (!clickedInsideDrawer && !clickedToggle) {
+                    closeMobileMenu();
+                }
+            }
+        });
+
+        // Event listeners
+        mobileMenuToggle.addEventListener('click', function(e){
+            if (window.innerWidth <= 991.98) { openSideMenu(e); }
+        });
+        if (mobileMenuCloseBtn) mobileMenuCloseBtn.addEventListener('click', closeMobileMenu);
+        navbarBackdrop.addEventListener('click', closeMobileMenu);
+
+        // Close menu when clicking on a nav link (for single page navigation)
+        document.querySelectorAll('.nav-link:not(.dropdown-toggle)').forEach(link => {
+            link.addEventListener('click', function() {
+                if (window.innerWidth <= 991.98) {
+                    closeMobileMenu();
+                }
+            });
+        });
+
+        // Close menu when window is resized to desktop view
+        let resizeTimer;
+        window.addEventListener('resize', function() {
+            clearTimeout(resizeTimer);
+            resizeTimer = setTimeout(function() {
+                if (window.innerWidth > 991.98) {
+                    closeMobileMenu();
+                } else {
+                    // keep bootstrap collapse hidden on mobile
+                    if (navbarCollapse) navbarCollapse.classList.remove('show');
+                }
+            }, 250);
+        });
+
+        // Robust fallback: toggle submenus inside the side drawer without relying on external plugins
+        // Uses capture phase and stops propagation to avoid outside-click closers and duplicate toggles
+        const drawerRoot = document.querySelector('.th-menu-area');
+        if (drawerRoot) {
+          drawerRoot.addEventListener('click', function(evt) {
+            const anchor = evt.target.closest('.th-mobile-menu .menu-item-has-children > a');
+            if (!anchor) return;
+            if (window.innerWidth > 991.98) return;
+            const submenu = anchor.nextElementSibling;
+            if (!submenu) return;
+
+            // Prevent navigation and prevent other handlers from closing the drawer
+            evt.preventDefault();
+            if (evt.stopImmediatePropagation) evt.stopImmediatePropagation();
+            evt.stopPropagation();
+
+            // Determine current state
+            const currentlyOpen = submenu.style.display === 'block' || submenu.classList.contains('th-open') || submenu.classList.contains('show');
+
+            // Close all other submenus
+            drawerRoot.querySelectorAll('.th-mobile-menu .sub-menu').forEach(m => {
+              if (m !== submenu) {
+                m.style.display = 'none';
+                m.classList.remove('th-open', 'show');
+                const a = m.previousElementSibling;
+                if (a && a.tagName === 'A') a.setAttribute('aria-expanded', 'false');
+              }
+            });
+
+            // Toggle the clicked submenu
+            const li = anchor.parentElement;
+            if (currentlyOpen) {
+              submenu.style.display = 'none';
+              submenu.classList.remove('th-open', 'show');
+              if (li) li.classList.remove('th-active');
+              anchor.setAttribute('aria-expanded', 'false');
+            } else {
+              submenu.style.display = 'block';
+              submenu.classList.add('th-open', 'show');
+              if (li) li.classList.add('th-active');
+              anchor.setAttribute('aria-expanded', 'true');
+            }
+          }, true); // capture phase
+        }
+    }
+});
+
+// Auto-dismiss and close behavior for notifications
+document.addEventListener('DOMContentLoaded', function() {
+  document.querySelectorAll('.ycbn-notify').forEach(function(el){
+    const closer = el.querySelector('.ycbn-notify-close');
+    const remove = () => { el.style.animation = 'none'; el.style.transition = 'opacity .25s ease, transform .25s ease'; el.style.opacity = '0'; el.style.transform = 'translateX(10px)'; setTimeout(()=> el.remove(), 260); };
+    if (closer) closer.addEventListener('click', remove);
+    setTimeout(remove, 5200); // auto hide after ~5s
+  });
+});
+
+// Header scroll hide/show functionality
+(function() {
+    const header = document.querySelector('.th-header');
+    let lastScrollTop = 0;
+    let scrollTimeout;
+    let ticking = false;
+
+    function handleScroll() {
+        const scrollTop = window.pageYOffset || document.documentElement.scrollTop;
+
+        // Always show header at the very top of the page
+        if (scrollTop < 50) {
+            header.classList.remove('header-hidden');
+        }
+        // Hide header when scrolling in any direction beyond top
+        else {
+            header.classList.add('header-hidden');
+        }
+
+        // Add slide-down animation when user stops scrolling
+        clearTimeout(scrollTimeout);
+        scrollTimeout = setTimeout(() => {
+            header.classList.remove('header-hidden');
+        }, 1000); // Show header after 1 second of no scrolling
+
+        lastScrollTop = scrollTop;
+        ticking = false;
+    }
+
+    // Throttle scroll events with requestAnimationFrame
+    window.addEventListener('scroll', function() {
+        if (!ticking) {
+            window.requestAnimationFrame(function() {
+                handleScroll();
+            });
+            ticking = true;
+        }
+    });
+
+    // Show header when mouse moves to top of screen
+    document.addEventListener('mousemove', function(e) {
+        if (e.clientY < 80) { // Height of the header
+            header.classList.remove('header-hidden');
+        }
+    });
+})();
+
+document.addEventListener('DOMContentLoaded', function() {
+  var scrollTopBtn = document.querySelector('.scroll-top');
+  if (scrollTopBtn && !scrollTopBtn.dataset.boundClick) {
+    scrollTopBtn.addEventListener('click', function() {
+      window.scrollTo({ top: 0, behavior: 'smooth' });
+    });
+    scrollTopBtn.dataset.boundClick = 'true';
+  }
+});
+
+// Ensure the button is always on top
+document.addEventListener('DOMContentLoaded', function() {
+    const whatsappButton = document.getElementById('whatsapp-button');
+    if (whatsappButton) {
+        whatsappButton.style.zIndex = '2147483647';
+    }
+
+    // Initialize mobile menu dropdowns
+    const dropdownElementList = [].slice.call(document.querySelectorAll('.dropdown-toggle'));
+    const dropdownList = dropdownElementList.map(function (dropdownToggleEl) {
+        return new bootstrap.Dropdown(dropdownToggleEl);
+    });
+});
@@ -0,0 +1,41 @@
+/**
+ * Header search type-ahead
+ * ========================
+ * Fills the search box's <datalist> from /search/suggest/ as the visitor types.
+ */
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-suggest-url]').forEach(initSearchSuggest);
+});
+
+function initSearchSuggest(input) {
+    const list = document.getElementById(input.getAttribute('list'));
+    if (!list) return;
+
+    let timer = null;
+    let lastQuery = '';
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(function() {
+            const query = input.value.trim();
+            if (query.length < 2 || query === lastQuery) return;
+            lastQuery = query;
+
+            fetch(input.dataset.suggestUrl + '?q=' + encodeURIComponent(query), {
+                headers: { 'Accept': 'application/json' }
+            })
+                .then(response => response.ok ? response.json() : { results: [] })
+                .then(data => {
+                    if (data.query !== input.value.trim()) return;
+                    list.replaceChildren(...data.results.map(result => {
+                        const option = document.createElement('option');
+                        option.value = result.title;
+                        option.label = result.kind.charAt(0).toUpperCase() + result.kind.slice(1);
+                        return option;
+                    }));
+                })
+                .catch(() => {});
+        }, 120);
+    });
+}
@@ -25,6 +25,8 @@ INSTALLED_APPS = [
 ]
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Above the session, CSRF and message middleware (see charity.middleware)
+    'charity.middleware.CachePolicyMiddleware',
 'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -32,14 +34,22 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Must stay below CsrfViewMiddleware (see charity.middleware)
+    'charity.middleware.AnonymousPageCacheMiddleware',
 ]
 ROOT_URLCONF = 'ycbn_charity.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Parsed templates are kept per worker; gunicorn.conf.py warms them at startup
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
 'django.template.context_processors.request',
@@ -64,6 +74,44 @@ except Exception:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+# Cache: shared between Gunicorn workers so model-driven invalidation reaches
+# every process. Redis when REDIS_URL is set, else a file-based cache on disk.
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('DJANGO_CACHE_DIR', str(BASE_DIR / '.django_cache')),
+        }
+    }
+# Home page snapshot lifetime (seconds); admin edits invalidate it earlier
+HOME_SNAPSHOT_TIMEOUT = int(os.getenv('HOME_SNAPSHOT_TIMEOUT', str(60 * 60 * 24)))
+# Anonymous full-page cache lifetime (seconds); model changes purge it earlier
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', str(60 * 10)))
+# Loopback nginx server that re-fetches pages into its micro-cache after saves (manage.py build_nginx_cache);
+# empty disables refreshing, e.g. http://127.0.0.1:8081
+NGINX_CACHE_REFRESH_URL = os.getenv('NGINX_CACHE_REFRESH_URL', '')
+# Mixed into detail-page ETags; change it on deploys that alter templates
+CONDITIONAL_GET_SALT = os.getenv('CONDITIONAL_GET_SALT', '')
+# How often (seconds) each worker asks the cache whether its search type-ahead index is stale
+SUGGEST_VERSION_CHECK_INTERVAL = float(os.getenv('SUGGEST_VERSION_CHECK_INTERVAL', '1'))
+# Uploaded images are capped at this many pixels on the long side
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', '1920'))
+# Widths (px) of the AVIF/WebP variants generated for each upload
+IMAGE_VARIANT_WIDTHS = tuple(int(w) for w in os.getenv('IMAGE_VARIANT_WIDTHS', '320,640,960,1280').split(','))
+# Background threads per worker that encode image variants
+IMAGE_VARIANT_THREADS = int(os.getenv('IMAGE_VARIANT_THREADS', '1'))
+# Disk cache for /media-resize/ output; nginx serves it from MEDIA_RESIZE_ACCEL_PREFIX when that is set
+MEDIA_RESIZE_ROOT = Path(os.getenv('MEDIA_RESIZE_ROOT', str(BASE_DIR / 'media_resize')))
+MEDIA_RESIZE_ACCEL_PREFIX = os.getenv('MEDIA_RESIZE_ACCEL_PREFIX', '')
+MEDIA_RESIZE_MAX_DIMENSION = int(os.getenv('MEDIA_RESIZE_MAX_DIMENSION', '2000'))
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -96,6 +144,22 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 # Collect static into STATIC_ROOT for production serving (e.g., by Nginx)
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Unreferenced theme files recorded by `manage.py optimize_static --write-prune-list` are left out of collectstatic
+STATICFILES_FINDERS = [
+    'charity.static_assets.PrunedFileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
+STATIC_PRUNE_LIST = Path(os.getenv('STATIC_PRUNE_LIST', str(BASE_DIR / 'static_prune.txt')))
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Processes used to precompress static files (defaults to one per CPU core)
+STATIC_COMPRESS_WORKERS = int(os.getenv('STATIC_COMPRESS_WORKERS', '0')) or None
+# Recompress collected PNG/JPEG files before fingerprinting and add .webp siblings (manifest storage only)
+STATIC_OPTIMIZE_IMAGES = os.getenv('STATIC_OPTIMIZE_IMAGES', 'true').lower() in ('1', 'true', 'yes')
+# Link the built CSS/JS bundles (manage.py build_bundles); off in development unless set
+BUNDLES_ENABLED = os.getenv('BUNDLES_ENABLED', str(not DEBUG)).lower() in ('1', 'true', 'yes')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -35,10 +35,15 @@ SECURE_HSTS_PRELOAD = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 USE_X_FORWARDED_HOST = True
 
-# Optional: WhiteNoise for static files (works without Nginx for static)
+# Static files: content-hashed names plus .gz/.br siblings, built by `manage.py build_static`
+STORAGES = {
+    **STORAGES,
+    'staticfiles': {'BACKEND': 'charity.storage.PrecompressedManifestStaticFilesStorage'},
+}
+
+# Optional: WhiteNoise for static files (works without Nginx for static; serves the same siblings)
 if os.environ.get("USE_WHITENOISE", "false").lower() in {"1", "true", "yes", "on"}:
     MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Database: use DATABASE_URL if provided, else fallback to default
 DATABASE_URL = os.environ.get("DATABASE_URL")